@@ -11,7 +11,7 @@ else:
     app_version = "1.2.0"  # Default 
 
 a = Analysis(
-    ['main.py', 'database.py', 'dict_help.py', 'duplicates.py','import_export.py','pdf_export_tool.py','settings.py','undo_commands.py'],
+    ['main.py', 'database.py', 'dict_help.py', 'duplicates.py','import_export.py','pdf_export_tool.py','settings.py','undo_commands.py','migrations.py','db_profiles.py','search.py','fuzzy_index.py','headword_model.py','search_worker.py','bulk_import.py','bulk_export.py','backup.py','match_keys.py','change_events.py','entry_cache.py','jobs.py','json_stream.py','parallel_import.py','compressed_io.py','lookup_file.py'],
     pathex=[],
     binaries=[],
     datas=[
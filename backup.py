@@ -0,0 +1,149 @@
+import os
+import sqlite3
+import logging
+import datetime
+from pathlib import Path
+
+BACKUP_DIR = "backups"
+TIMESTAMP_FORMAT = "%Y%m%d_%H%M%S"
+
+# Keep the newest `keep` backups, plus the newest backup of each of the last
+# `hourly` hours and of each of the last `daily` days.
+DEFAULT_RETENTION = {"keep": 10, "hourly": 24, "daily": 7}
+
+
+class BackupError(Exception):
+    pass
+
+
+def backup_dir(db_path):
+    """Backups live in a folder next to the database, not in the working directory."""
+    return os.path.join(os.path.dirname(os.path.abspath(db_path)), BACKUP_DIR)
+
+
+def backup_path(db_path, when=None):
+    when = when or datetime.datetime.now()
+    name = f"{os.path.basename(db_path)}_{when.strftime(TIMESTAMP_FORMAT)}.bak"
+    return os.path.join(backup_dir(db_path), name)
+
+
+def list_backups(db_path):
+    """Return [(datetime, path)] of this database's backups, newest first."""
+    folder = backup_dir(db_path)
+    prefix = os.path.basename(db_path) + "_"
+    backups = []
+    if not os.path.isdir(folder):
+        return backups
+    for name in os.listdir(folder):
+        if not (name.startswith(prefix) and name.endswith(".bak")):
+            continue
+        try:
+            when = datetime.datetime.strptime(name[len(prefix):-len(".bak")], TIMESTAMP_FORMAT)
+        except ValueError:
+            continue
+        backups.append((when, os.path.join(folder, name)))
+    backups.sort(reverse=True)
+    return backups
+
+
+def check_integrity(conn):
+    result = conn.execute("PRAGMA integrity_check").fetchall()
+    if result != [("ok",)]:
+        raise BackupError("; ".join(row[0] for row in result[:5]))
+
+
+def copy_database(source, target, pages=256, sleep=0.005, progress=None):
+    """Copy source into target with the online backup API, a few pages at a time."""
+    def report(status, remaining, total):
+        if progress:
+            progress(total - remaining, total)
+    source.backup(target, pages=pages, progress=report, sleep=sleep)
+
+
+def create_backup(db_path, target_path=None, pages=256, source=None, progress=None):
+    """Write a verified backup of db_path and return its path.
+
+    source is an open connection to db_path to copy from, by default a new
+    read-only one. progress(done, total) gets the copied pages and may raise
+    to abandon the backup.
+    """
+    target_path = target_path or backup_path(db_path)
+    os.makedirs(os.path.dirname(target_path), exist_ok=True)
+    part_path = target_path + ".part"
+    own_source = source is None
+    if own_source:
+        source = sqlite3.connect(Path(db_path).as_uri() + "?mode=ro", uri=True)
+    try:
+        # Hold one read transaction for the whole copy. In WAL mode the editor can
+        # keep committing meanwhile; without the snapshot every commit would make
+        # SQLite restart the copy, and steady editing could keep it from finishing.
+        source.execute("BEGIN")
+        source.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()
+        target = sqlite3.connect(part_path)
+        try:
+            copy_database(source, target, pages, progress=progress)
+            check_integrity(target)
+        finally:
+            target.close()
+        os.replace(part_path, target_path)
+    except BaseException:
+        if os.path.exists(part_path):
+            os.remove(part_path)
+        raise
+    finally:
+        if own_source:
+            source.close()
+        else:
+            source.rollback()
+    return target_path
+
+
+def backups_to_keep(backups, retention, now=None):
+    """Apply a retention policy to [(datetime, path)] (newest first) and return the paths to keep."""
+    now = now or datetime.datetime.now()
+    keep = {path for _, path in backups[:retention.get("keep", 0)]}
+    hourly, daily = set(), set()
+    for when, path in backups:
+        age = now - when
+        hour = when.replace(minute=0, second=0, microsecond=0)
+        day = when.date()
+        if age < datetime.timedelta(hours=retention.get("hourly", 0)) and hour not in hourly:
+            hourly.add(hour)
+            keep.add(path)
+        if age < datetime.timedelta(days=retention.get("daily", 0)) and day not in daily:
+            daily.add(day)
+            keep.add(path)
+    return keep
+
+
+def prune_backups(db_path, retention):
+    """Delete backups the retention policy no longer covers; returns the removed paths."""
+    backups = list_backups(db_path)
+    keep = backups_to_keep(backups, retention)
+    removed = []
+    for _, path in backups:
+        if path in keep:
+            continue
+        try:
+            os.remove(path)
+            removed.append(path)
+        except OSError:
+            logging.exception("Could not remove old backup %s", path)
+    return removed
+
+
+def restore_backup(backup_file, conn):
+    """Overwrite the database behind the open connection conn with backup_file.
+
+    The backup is verified first. Copying through conn (rather than replacing the
+    file) keeps the WAL and every other open connection consistent.
+    """
+    source = sqlite3.connect(Path(backup_file).as_uri() + "?mode=ro", uri=True)
+    try:
+        check_integrity(source)
+        if conn.in_transaction:
+            conn.commit()
+        copy_database(source, conn, pages=-1)
+    finally:
+        source.close()
+
@@ -0,0 +1,81 @@
+"""CSV import: the original row-at-a-time loop versus the batched EntryWriter.
+
+    python benchmarks/bench_csv_import.py --rows 1000000
+"""
+import argparse
+import csv
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+from synthetic import random_word, PARTS_OF_SPEECH
+from migrations import migrate
+from db_profiles import apply_profile
+from bulk_import import import_csv_file
+
+
+def write_csv(path, rows, seed, vocabulary=50000):
+    # Same shape as export_csv output; meanings use synthetic.py's skewed vocabulary.
+    rng = random.Random(seed)
+    words = [random_word(rng) for _ in range(vocabulary)]
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "headword", "variation", "part_of_speech", "notes", "meanings"])
+        for i in range(rows):
+            meanings = ";;".join(" ".join(words[int(vocabulary ** rng.random()) - 1] for _ in range(4))
+                                 for _ in range(2))
+            writer.writerow([i + 1, random_word(rng), random_word(rng), rng.choice(PARTS_OF_SPEECH), "", meanings])
+
+
+def original_import(conn, csvfile):
+    # The loop import_csv ran before the batched writer.
+    cursor = conn.cursor()
+    for row in csv.DictReader(csvfile):
+        cursor.execute(
+            "INSERT INTO Entry (headword, variation, part_of_speech, notes) VALUES (?, ?, ?, ?)",
+            (row["headword"].strip(), row["variation"].strip(), row["part_of_speech"].strip(), row["notes"].strip())
+        )
+        entry_id = cursor.lastrowid
+        for m in row["meanings"].split(";;"):
+            m = m.strip()
+            if m:
+                cursor.execute("INSERT INTO Senses (entry_id, meaning) VALUES (?, ?)", (entry_id, m))
+    conn.commit()
+
+
+def batched_import(conn, csvfile):
+    import_csv_file(conn, csvfile)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--skip-original", action="store_true", help="only time the batched import")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "import.csv")
+        print(f"Writing {args.rows} CSV rows...")
+        write_csv(csv_path, args.rows, args.seed)
+        methods = [("batched", batched_import)]
+        if not args.skip_original:
+            methods.insert(0, ("original", original_import))
+        for name, function in methods:
+            db_path = os.path.join(tmp, f"{name}.db")
+            conn = sqlite3.connect(db_path)
+            migrate(conn)
+            apply_profile(conn, "bulk_import")
+            start = time.perf_counter()
+            with open(csv_path, newline="", encoding="utf-8") as csvfile:
+                function(conn, csvfile)
+            elapsed = time.perf_counter() - start
+            count = conn.execute("SELECT COUNT(*) FROM Entry").fetchone()[0]
+            print(f"{name:10} {elapsed:8.1f} s {count / elapsed:12.0f} rows/s")
+            conn.close()
+
+
+if __name__ == "__main__":
+    main()
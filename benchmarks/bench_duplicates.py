@@ -0,0 +1,77 @@
+"""Duplicate merge: one query per group and per row versus the set-based remove_duplicates.
+
+    python benchmarks/bench_duplicates.py --entries 200000 --duplicates 0.2
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from synthetic import build_database
+from migrations import migrate
+from database import remove_duplicates
+from match_keys import entry_keys
+
+
+def add_duplicates(conn, fraction, seed):
+    # Re-import a share of the entries with case and whitespace variations, as a
+    # second CSV import of an overlapping word list would.
+    rng = random.Random(seed)
+    total = conn.execute("SELECT COUNT(*) FROM Entry").fetchone()[0]
+    rows = conn.execute("SELECT id, headword FROM Entry WHERE id IN (%s)" % ",".join(
+        str(i) for i in rng.sample(range(1, total + 1), int(total * fraction)))).fetchall()
+    for entry_id, headword in rows:
+        variant = rng.choice([headword.upper(), " " + headword, headword.capitalize() + " "])
+        new_id = conn.execute(
+            "INSERT INTO Entry (headword, variation, part_of_speech, notes, headword_key, variation_key, initial) "
+            "VALUES (?, '', '', '', ?, ?, ?)", (variant,) + entry_keys(variant, '')).lastrowid
+        conn.execute("INSERT INTO Senses (entry_id, meaning) VALUES (?, ?)", (new_id, f"duplicate of {entry_id}"))
+    conn.commit()
+
+
+def original_merge(conn):
+    # The loop DatabaseManager.merge_duplicates ran before.
+    cursor = conn.cursor()
+    cursor.execute(
+        "SELECT LOWER(TRIM(headword)) as norm_headword, COUNT(*) as cnt FROM Entry GROUP BY norm_headword HAVING cnt > 1"
+    )
+    for norm_headword, count in cursor.fetchall():
+        cursor.execute("SELECT id, headword FROM Entry WHERE LOWER(TRIM(headword)) = ? ORDER BY id ASC",
+                       (norm_headword,))
+        entries = cursor.fetchall()
+        master_id = entries[0][0]
+        for duplicate in entries[1:]:
+            cursor.execute("UPDATE Senses SET entry_id = ? WHERE entry_id = ?", (master_id, duplicate[0]))
+            cursor.execute("DELETE FROM Entry WHERE id = ?", (duplicate[0],))
+    conn.commit()
+
+
+def set_based_merge(conn):
+    return remove_duplicates(conn, keep_senses=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=200000)
+    parser.add_argument("--duplicates", type=float, default=0.2, help="share of entries imported twice")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, function in (("original", original_merge), ("set-based", set_based_merge)):
+            path = os.path.join(tmp, f"{name}.db")
+            conn = build_database(path, args.entries, seed=args.seed)
+            migrate(conn)
+            add_duplicates(conn, args.duplicates, args.seed + 1)
+            start = time.perf_counter()
+            result = function(conn)
+            elapsed = time.perf_counter() - start
+            entries = conn.execute("SELECT COUNT(*) FROM Entry").fetchone()[0]
+            senses = conn.execute("SELECT COUNT(*) FROM Senses").fetchone()[0]
+            print(f"{name:10} {elapsed:8.2f} s  entries left {entries}  senses {senses}  {result or ''}")
+            conn.close()
+
+
+if __name__ == "__main__":
+    main()
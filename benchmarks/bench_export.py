@@ -0,0 +1,84 @@
+"""Export throughput (MB/s) and peak Python memory: fetchall() exporters versus the streaming ones.
+
+    python benchmarks/bench_export.py --entries 500000
+"""
+import argparse
+import csv
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+from synthetic import build_database
+from migrations import migrate
+from bulk_export import export_csv_file, export_json_file
+
+ORIGINAL_QUERY = '''
+    SELECT Entry.*, GROUP_CONCAT(Senses.meaning, ';;') AS meanings
+    FROM Entry
+    LEFT JOIN Senses ON Entry.id = Senses.entry_id
+    GROUP BY Entry.id'''
+
+
+def original_csv(conn, f):
+    # What export_csv did before streaming.
+    cursor = conn.execute(ORIGINAL_QUERY)
+    entries = cursor.fetchall()
+    writer = csv.writer(f)
+    writer.writerow([d[0] for d in cursor.description])
+    for row in entries:
+        writer.writerow(row)
+
+
+def original_json(conn, f):
+    cursor = conn.execute(ORIGINAL_QUERY)
+    entries = cursor.fetchall()
+    headers = [d[0] for d in cursor.description]
+    data = []
+    for row in entries:
+        entry = dict(zip(headers, row))
+        entry["meanings"] = entry["meanings"].split(";;") if entry["meanings"] else []
+        data.append(entry)
+    json.dump(data, f, indent=4, ensure_ascii=False)
+
+
+def compact_json(conn, f):
+    export_json_file(conn, f, compact=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=500000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        print(f"Building {args.entries} entries...")
+        conn = build_database(path, args.entries, seed=args.seed)
+        migrate(conn)
+        out = os.path.join(tmp, "out")
+        print(f"{'method':18} {'seconds':>8} {'MB':>8} {'MB/s':>8} {'peak MB':>8}")
+        for name, function in (("original CSV", original_csv),
+                               ("streaming CSV", export_csv_file),
+                               ("original JSON", original_json),
+                               ("streaming JSON", export_json_file),
+                               ("compact JSON", compact_json)):
+            start = time.perf_counter()
+            with open(out, "w", newline="", encoding="utf-8") as f:
+                function(conn, f)
+            elapsed = time.perf_counter() - start
+            # Second, traced run for memory: tracemalloc would distort the timing.
+            tracemalloc.start()
+            with open(out, "w", newline="", encoding="utf-8") as f:
+                function(conn, f)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            size = os.path.getsize(out) / 1e6
+            print(f"{name:18} {elapsed:8.1f} {size:8.1f} {size / elapsed:8.1f} {peak / 1e6:8.1f}")
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
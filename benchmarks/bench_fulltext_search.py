@@ -0,0 +1,59 @@
+"""Meaning/All search: LIKE scans versus the EntrySearch FTS5 index.
+
+    python benchmarks/bench_fulltext_search.py --entries 1000000 --senses 2
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from synthetic import build_database
+from migrations import migrate
+from search import register_functions, _like_search, _fts_search
+
+
+def time_search(function, conn, terms, criterion):
+    start = time.perf_counter()
+    hits = 0
+    for term in terms:
+        hits += len(list(function(conn, term, criterion)))
+    return (time.perf_counter() - start) / len(terms), hits
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=1000000)
+    parser.add_argument("--senses", type=int, default=2, help="senses per entry")
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        print(f"Building {args.entries} entries / {args.entries * args.senses} senses...")
+        conn = build_database(path, args.entries, args.senses, args.seed)
+        register_functions(conn)
+        start = time.perf_counter()
+        migrate(conn)
+        print(f"Migration incl. FTS rebuild took {time.perf_counter() - start:.1f} s")
+
+        rng = random.Random(args.seed + 1)
+        ids = [rng.randint(1, args.entries) for _ in range(args.queries)]
+        terms = []
+        for entry_id in ids:
+            row = conn.execute("SELECT meaning FROM Senses WHERE entry_id=? LIMIT 1", (entry_id,)).fetchone()
+            if row:
+                terms.append(row[0].split()[0])
+
+        print(f"{'criterion':10} {'LIKE':>12} {'FTS5':>12} {'speedup':>9}")
+        for criterion in ("meaning", "all"):
+            like_time, _ = time_search(_like_search, conn, terms, criterion)
+            fts_time, _ = time_search(_fts_search, conn, terms, criterion)
+            print(f"{criterion:10} {like_time * 1000:10.1f}ms {fts_time * 1000:10.1f}ms "
+                  f"{like_time / fts_time:8.0f}x")
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
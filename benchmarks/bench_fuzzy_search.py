@@ -0,0 +1,64 @@
+"""Fuzzy headword search: the old per-row difflib loop versus FuzzyIndex.
+
+    python benchmarks/bench_fuzzy_search.py --entries 100000
+"""
+import argparse
+import difflib
+import os
+import random
+import tempfile
+import time
+
+from synthetic import build_database
+from migrations import migrate
+from fuzzy_index import FuzzyIndex
+
+
+def difflib_search(rows, term):
+    return [(headword, entry_id) for entry_id, headword in rows
+            if difflib.get_close_matches(term, [(headword or "").lower()], cutoff=0.6)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=10)
+    parser.add_argument("--distance", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        conn = build_database(path, args.entries, seed=args.seed)
+        migrate(conn)
+        index = FuzzyIndex(max_distance=args.distance)
+        start = time.perf_counter()
+        index.build(conn)
+        print(f"Index build for {args.entries} entries: {time.perf_counter() - start:.1f} s")
+
+        rng = random.Random(args.seed + 1)
+        terms = []
+        for _ in range(args.queries):
+            headword = conn.execute("SELECT headword FROM Entry WHERE id=?",
+                                    (rng.randint(1, args.entries),)).fetchone()[0]
+            position = rng.randrange(len(headword))
+            terms.append(headword[:position] + headword[position + 1:])
+
+        start = time.perf_counter()
+        for term in terms:
+            rows = conn.execute("SELECT id, headword FROM Entry").fetchall()
+            difflib_search(rows, term)
+        old = (time.perf_counter() - start) / len(terms)
+
+        start = time.perf_counter()
+        for term in terms:
+            index.search(term, "headword")
+        new = (time.perf_counter() - start) / len(terms)
+        conn.close()
+
+    print(f"difflib loop: {old * 1000:9.1f} ms/query")
+    print(f"FuzzyIndex:   {new * 1000:9.1f} ms/query  ({old / new:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""JSON import time and peak Python memory: json.load of the whole file versus the streaming reader.
+
+    python benchmarks/bench_json_import.py --entries 500000
+"""
+import argparse
+import json
+import os
+import sqlite3
+import tempfile
+import time
+import tracemalloc
+
+from synthetic import build_database
+from migrations import migrate
+from db_profiles import apply_profile
+from bulk_export import export_json_file
+from bulk_import import EntryWriter, import_json_file
+
+
+def original_import(conn, path):
+    # What import_json did before streaming: load, validate everything, then insert.
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    required_keys = {"headword", "variation", "part_of_speech", "notes", "meanings"}
+    for idx, item in enumerate(data):
+        if not isinstance(item, dict) or required_keys - set(item) or not isinstance(item["meanings"], list):
+            raise ValueError(f"Entry {idx} is invalid")
+    writer = EntryWriter(conn)
+    for idx, item in enumerate(data):
+        writer.add(idx, item["headword"].strip(), item["variation"].strip(), item["part_of_speech"].strip(),
+                   item["notes"].strip(), [str(m).strip() for m in item["meanings"] if str(m).strip()])
+    writer.commit()
+
+
+def streaming_import(conn, path):
+    with open(path, "rb") as f:
+        import_json_file(conn, f)
+
+
+def fresh_database(path):
+    if os.path.exists(path):
+        os.remove(path)
+    conn = sqlite3.connect(path)
+    migrate(conn)
+    apply_profile(conn, "bulk_import")
+    return conn
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=500000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = build_database(os.path.join(tmp, "source.db"), args.entries, seed=args.seed)
+        migrate(source)
+        json_path = os.path.join(tmp, "export.json")
+        with open(json_path, "w", encoding="utf-8") as f:
+            export_json_file(source, f)
+        source.close()
+        size = os.path.getsize(json_path) / 1e6
+        print(f"{args.entries} entries, {size:.1f} MB of JSON")
+        print(f"{'method':12} {'seconds':>8} {'entries/s':>10} {'peak MB':>8}")
+        db_path = os.path.join(tmp, "import.db")
+        for name, function in (("original", original_import), ("streaming", streaming_import)):
+            conn = fresh_database(db_path)
+            start = time.perf_counter()
+            function(conn, json_path)
+            elapsed = time.perf_counter() - start
+            conn.close()
+            # Second, traced run for memory: tracemalloc would distort the timing.
+            conn = fresh_database(db_path)
+            tracemalloc.start()
+            function(conn, json_path)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            conn.close()
+            print(f"{name:12} {elapsed:8.1f} {args.entries / elapsed:10.0f} {peak / 1e6:8.1f}")
+
+
+if __name__ == "__main__":
+    main()
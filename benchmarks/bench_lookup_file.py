@@ -0,0 +1,98 @@
+"""Headword lookups: SQLite point queries on the .db versus the memory-mapped lookup file.
+
+    python benchmarks/bench_lookup_file.py --entries 500000
+"""
+import argparse
+import json
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+from synthetic import build_database
+from migrations import migrate
+from match_keys import match_key
+from lookup_file import LookupFile, export_lookup_file
+
+# What a lookup tool would run against the editable database.
+SQLITE_LOOKUP = '''
+    SELECT Entry.id, Entry.headword, Entry.variation, Entry.part_of_speech, Entry.notes,
+           (SELECT json_group_array(meaning)
+            FROM (SELECT meaning FROM Senses WHERE entry_id = Entry.id ORDER BY id))
+    FROM Entry WHERE headword_key = ? ORDER BY id'''
+
+SQLITE_PREFIX = '''
+    SELECT headword_key, id FROM Entry
+    WHERE headword_key >= ?1 AND headword_key < ?1 || char(1114111)
+    ORDER BY headword_key, id LIMIT ?2'''
+
+
+def sqlite_lookup(conn, headword):
+    return [{"id": entry_id, "headword": headword, "variation": variation, "part_of_speech": part_of_speech,
+             "notes": notes, "senses": json.loads(senses)}
+            for entry_id, headword, variation, part_of_speech, notes, senses
+            in conn.execute(SQLITE_LOOKUP, (match_key(headword),))]
+
+
+def timed(function, terms):
+    start = time.perf_counter()
+    for term in terms:
+        function(term)
+    return (time.perf_counter() - start) / len(terms)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=500000)
+    parser.add_argument("--queries", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "bench.db")
+        conn = build_database(db_path, args.entries, seed=args.seed)
+        migrate(conn)
+        lookup_path = os.path.join(tmp, "bench.dmlk")
+        start = time.perf_counter()
+        with open(lookup_path, "wb") as f:
+            export_lookup_file(conn, f)
+        print(f"Lookup file for {args.entries} entries written in {time.perf_counter() - start:.1f} s")
+        print(f"Sizes: database {os.path.getsize(db_path) / 1e6:.1f} MB, "
+              f"lookup file {os.path.getsize(lookup_path) / 1e6:.1f} MB")
+        conn.close()
+
+        rng = random.Random(args.seed + 1)
+        conn = sqlite3.connect(db_path)
+        headwords = [row[0] for row in conn.execute("SELECT headword FROM Entry")]
+        terms = [rng.choice(headwords) for _ in range(args.queries)]
+        # A quarter of the lookups miss.
+        terms[::4] = [term + "q" for term in terms[::4]]
+        prefixes = [term[:3] for term in terms[:args.queries // 10]]
+
+        start = time.perf_counter()
+        conn = sqlite3.connect(db_path)
+        conn.execute("SELECT 1 FROM Entry LIMIT 1").fetchone()
+        sqlite_open = time.perf_counter() - start
+        start = time.perf_counter()
+        lookup = LookupFile(lookup_path)
+        lookup_open = time.perf_counter() - start
+
+        results = [
+            ("sqlite lookup", sqlite_open, timed(lambda term: sqlite_lookup(conn, term), terms)),
+            ("file lookup", lookup_open, timed(lookup.lookup, terms)),
+            ("file find", lookup_open, timed(lookup.find, terms)),
+            ("sqlite prefix", sqlite_open, timed(
+                lambda prefix: conn.execute(SQLITE_PREFIX, (match_key(prefix), 20)).fetchall(), prefixes)),
+            ("file prefix", lookup_open, timed(lambda prefix: list(lookup.prefix(prefix, 20)), prefixes)),
+        ]
+        lookup.close()
+        conn.close()
+
+    print(f"{'method':14} {'open ms':>8} {'us/query':>9} {'queries/s':>10}")
+    for name, opened, seconds in results:
+        print(f"{name:14} {opened * 1000:8.2f} {seconds * 1e6:9.1f} {1 / seconds:10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""CSV import rows per second: the single-process import versus the process pool at 1, 2, 4 and 8 workers.
+
+    python benchmarks/bench_parallel_import.py --rows 1000000
+"""
+import argparse
+import os
+import sqlite3
+import tempfile
+import time
+
+from bench_csv_import import write_csv
+from migrations import migrate
+from db_profiles import apply_profile
+from bulk_import import import_csv_file
+from parallel_import import import_csv_parallel
+
+
+def fresh_database(path):
+    if os.path.exists(path):
+        os.remove(path)
+    conn = sqlite3.connect(path)
+    migrate(conn)
+    apply_profile(conn, "bulk_import")
+    return conn
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "import.csv")
+        print(f"Writing {args.rows} CSV rows...")
+        write_csv(csv_path, args.rows, args.seed)
+        print(f"{os.cpu_count()} CPUs, {os.path.getsize(csv_path) / 1e6:.1f} MB of CSV")
+        db_path = os.path.join(tmp, "import.db")
+        runs = [("single", None)] + [(f"{workers} workers", workers) for workers in args.workers]
+        for name, workers in runs:
+            conn = fresh_database(db_path)
+            start = time.perf_counter()
+            if workers is None:
+                with open(csv_path, newline="", encoding="utf-8") as csvfile:
+                    import_csv_file(conn, csvfile)
+            else:
+                with open(csv_path, "rb") as csvfile:
+                    import_csv_parallel(conn, csvfile, workers=workers)
+            elapsed = time.perf_counter() - start
+            count = conn.execute("SELECT COUNT(*) FROM Entry").fetchone()[0]
+            print(f"{name:10} {elapsed:8.1f} s {count / elapsed:12.0f} rows/s")
+            conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""Lookup timings on a synthetic dictionary before and after the schema migrations.
+
+    python benchmarks/bench_schema_indexes.py --entries 500000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from synthetic import build_database
+from migrations import migrate
+from match_keys import match_key, strip_diacritics_setting
+
+
+def time_queries(conn, ids, headwords):
+    timings = {}
+    start = time.perf_counter()
+    for entry_id in ids:
+        conn.execute("SELECT meaning FROM Senses WHERE entry_id=?", (entry_id,)).fetchall()
+    timings["senses by entry_id"] = (time.perf_counter() - start) / len(ids)
+
+    # The duplicate and exact-match lookup as the app runs it: on LOWER(TRIM(headword))
+    # before the migrations, on the headword_key column they add after.
+    keyed = any(row[1] == "headword_key" for row in conn.execute("PRAGMA table_info(Entry)"))
+    strip_diacritics = strip_diacritics_setting(conn)
+    start = time.perf_counter()
+    for headword in headwords:
+        if keyed:
+            conn.execute(
+                "SELECT id FROM Entry WHERE headword_key = ?", (match_key(headword, strip_diacritics),)
+            ).fetchall()
+        else:
+            conn.execute(
+                "SELECT id FROM Entry WHERE LOWER(TRIM(headword)) = ?", (headword.strip().lower(),)
+            ).fetchall()
+    timings["normalized headword"] = (time.perf_counter() - start) / len(headwords)
+
+    start = time.perf_counter()
+    conn.execute("SELECT id, headword FROM Entry ORDER BY headword LIMIT 200").fetchall()
+    timings["first page ORDER BY headword"] = time.perf_counter() - start
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=500000)
+    parser.add_argument("--senses", type=int, default=2, help="senses per entry")
+    parser.add_argument("--lookups", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        print(f"Building {args.entries} entries...")
+        conn = build_database(path, args.entries, args.senses, args.seed)
+        rng = random.Random(args.seed + 1)
+        ids = [rng.randint(1, args.entries) for _ in range(args.lookups)]
+        headwords = [row[0] for row in conn.execute(
+            "SELECT headword FROM Entry WHERE id IN (%s)" % ",".join("?" * len(ids)), ids)]
+
+        before = time_queries(conn, ids, headwords)
+        start = time.perf_counter()
+        migrate(conn)
+        migrate_time = time.perf_counter() - start
+        after = time_queries(conn, ids, headwords)
+        conn.close()
+
+    print(f"Migration took {migrate_time:.2f} s")
+    print(f"{'query':32} {'before':>12} {'after':>12} {'speedup':>9}")
+    for name in before:
+        speedup = before[name] / after[name] if after[name] else float("inf")
+        print(f"{name:32} {before[name] * 1000:10.3f}ms {after[name] * 1000:10.3f}ms {speedup:8.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Headword "contains" search: LIKE/casefold scan versus the EntryTrigram index.
+
+    python benchmarks/bench_substring_search.py --entries 1000000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from synthetic import build_database
+from migrations import migrate, ensure_trigram_index
+from search import register_functions, _like_search, _trigram_search
+
+
+def original_like(conn, term, criterion):
+    # The query search_filter ran before the trigram index existed.
+    return conn.execute(f"SELECT id, headword FROM Entry WHERE LOWER({criterion}) LIKE ?",
+                        ('%' + term + '%',)).fetchall()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=1000000)
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--length", type=int, default=4, help="search term length")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        print(f"Building {args.entries} headwords...")
+        conn = build_database(path, args.entries, senses_per_entry=1, seed=args.seed)
+        register_functions(conn)
+        start = time.perf_counter()
+        migrate(conn)
+        print(f"Migration took {time.perf_counter() - start:.1f} s")
+        start = time.perf_counter()
+        ensure_trigram_index(conn.cursor())
+        conn.commit()
+        print(f"Trigram index build took {time.perf_counter() - start:.1f} s")
+
+        rng = random.Random(args.seed + 1)
+        terms = []
+        while len(terms) < args.queries:
+            headword = conn.execute("SELECT headword FROM Entry WHERE id=?",
+                                    (rng.randint(1, args.entries),)).fetchone()[0]
+            if len(headword) >= args.length:
+                offset = rng.randint(0, len(headword) - args.length)
+                terms.append(headword[offset:offset + args.length])
+
+        print(f"{'method':22} {'per query':>12} {'hits':>8}")
+        for name, function in (("LOWER() LIKE", original_like),
+                               ("casefold() instr", _like_search),
+                               ("trigram MATCH", _trigram_search)):
+            hits = 0
+            start = time.perf_counter()
+            for term in terms:
+                hits += len(list(function(conn, term, "headword")))
+            elapsed = (time.perf_counter() - start) / len(terms)
+            print(f"{name:22} {elapsed * 1000:10.1f}ms {hits:8}")
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""Synthetic dictionary builder shared by the benchmark scripts."""
+import os
+import random
+import sqlite3
+import string
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from migrations import MIGRATIONS
+
+PARTS_OF_SPEECH = ["n.", "v.", "adj.", "adv."]
+
+
+def random_word(rng, low=3, high=12):
+    return "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(low, high)))
+
+
+def build_database(path, entries, senses_per_entry=2, seed=1, vocabulary=50000):
+    """Create a pre-migration (schema version 0) dictionary at path and return its connection.
+
+    Headwords are random strings; meanings draw words from a fixed vocabulary
+    with a skewed distribution, like real definitions do.
+    """
+    rng = random.Random(seed)
+    words = [random_word(rng) for _ in range(vocabulary)]
+    conn = sqlite3.connect(path)
+    MIGRATIONS[0][2](conn.cursor())
+    conn.executemany(
+        "INSERT INTO Entry (id, headword, variation, part_of_speech, notes) VALUES (?, ?, ?, ?, ?)",
+        ((i, random_word(rng), random_word(rng), rng.choice(PARTS_OF_SPEECH), "")
+         for i in range(1, entries + 1))
+    )
+    conn.executemany(
+        "INSERT INTO Senses (entry_id, meaning) VALUES (?, ?)",
+        ((rng.randint(1, entries),
+          " ".join(words[int(vocabulary ** rng.random()) - 1] for _ in range(4)))
+         for _ in range(entries * senses_per_entry))
+    )
+    conn.commit()
+    return conn
@@ -0,0 +1,164 @@
+import csv
+import json
+
+from bulk_import import MEANING_SEPARATOR, JSONL_FORMAT, JSONL_VERSION, JSONL_FIELDS, DELTA_FORMAT, DELTA_VERSION
+
+EXPORT_FIELDS = ("id", "headword", "variation", "part_of_speech", "notes", "meanings")
+
+# One row per entry, meanings in the order they were added. The correlated
+# subquery is served by idx_senses_entry_id, so rows stream out in Entry id
+# order without SQLite materialising a grouped join first.
+EXPORT_QUERY = f'''
+    SELECT Entry.id, Entry.headword, Entry.variation, Entry.part_of_speech, Entry.notes,
+           (SELECT group_concat(meaning, '{MEANING_SEPARATOR}')
+            FROM (SELECT meaning FROM Senses WHERE entry_id = Entry.id ORDER BY id))
+    FROM Entry ORDER BY Entry.id'''
+
+# Same rows with the senses as a JSON array built by SQLite, so meanings that
+# contain MEANING_SEPARATOR survive and their order is explicit.
+JSONL_QUERY = '''
+    SELECT Entry.id, Entry.headword, Entry.variation, Entry.part_of_speech, Entry.notes,
+           (SELECT json_group_array(meaning)
+            FROM (SELECT meaning FROM Senses WHERE entry_id = Entry.id ORDER BY id))
+    FROM Entry ORDER BY Entry.id'''
+
+
+# Entries changed after one change sequence number up to another, in the
+# order of their last change; deleted entries come back with NULL fields.
+DELTA_QUERY = '''
+    SELECT EntryChanges.entry_id, Entry.headword, Entry.variation, Entry.part_of_speech, Entry.notes,
+           (SELECT json_group_array(meaning)
+            FROM (SELECT meaning FROM Senses WHERE entry_id = Entry.id ORDER BY id)),
+           EntryChanges.deleted
+    FROM EntryChanges LEFT JOIN Entry ON Entry.id = EntryChanges.entry_id
+    WHERE EntryChanges.seq > ?1 AND EntryChanges.seq <= ?2
+    ORDER BY EntryChanges.seq'''
+
+
+class ExportCancelled(Exception):
+    pass
+
+
+class JsonArrayWriter:
+    """Write a JSON array one element at a time.
+
+    With an indent the output matches json.dump(items, f, indent=indent);
+    without one it is written in the most compact form.
+    """
+
+    def __init__(self, f, indent=4):
+        self.f = f
+        self.indent = indent
+        self.count = 0
+        if indent is None:
+            self._encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+        else:
+            self._encoder = json.JSONEncoder(ensure_ascii=False, indent=indent)
+            self._pad = " " * indent
+
+    def write(self, item):
+        text = self._encoder.encode(item)
+        if self.indent is None:
+            self.f.write(("[" if self.count == 0 else ",") + text)
+        else:
+            self.f.write(("[\n" if self.count == 0 else ",\n") + self._pad + text.replace("\n", "\n" + self._pad))
+        self.count += 1
+
+    def close(self):
+        if self.count == 0:
+            self.f.write("[]")
+        elif self.indent is None:
+            self.f.write("]")
+        else:
+            self.f.write("\n]")
+
+
+def iter_export_rows(conn, progress=None, chunk_size=2000, query=EXPORT_QUERY, params=(), total=None):
+    """Yield export rows in chunks of chunk_size; progress(done, total) runs after each chunk.
+
+    total defaults to the number of entries.
+    """
+    if total is None:
+        total = conn.execute("SELECT COUNT(*) FROM Entry").fetchone()[0]
+    cursor = conn.execute(query, params)
+    done = 0
+    while True:
+        rows = cursor.fetchmany(chunk_size)
+        if not rows:
+            break
+        yield from rows
+        done += len(rows)
+        if progress:
+            progress(done, total)
+    cursor.close()
+
+
+def export_csv_file(conn, f, progress=None, chunk_size=2000):
+    """Write every entry to the open text file f as CSV and return the entry count."""
+    writer = csv.writer(f)
+    writer.writerow(EXPORT_FIELDS)
+    count = 0
+    for row in iter_export_rows(conn, progress, chunk_size):
+        writer.writerow(row)
+        count += 1
+    return count
+
+
+def export_json_file(conn, f, progress=None, chunk_size=2000, compact=False):
+    """Write every entry to the open text file f as a JSON array and return the entry count."""
+    writer = JsonArrayWriter(f, indent=None if compact else 4)
+    for row in iter_export_rows(conn, progress, chunk_size):
+        item = dict(zip(EXPORT_FIELDS, row))
+        item["meanings"] = item["meanings"].split(MEANING_SEPARATOR) if item["meanings"] else []
+        writer.write(item)
+    writer.close()
+    return writer.count
+
+
+def entry_json(encoder, entry_id, headword, variation, part_of_speech, notes, senses):
+    """One entry as a JSON object in JSONL_FIELDS order; senses is the JSON array JSONL_QUERY builds."""
+    entry = encoder.encode({"id": entry_id, "headword": headword, "variation": variation,
+                            "part_of_speech": part_of_speech, "notes": notes})
+    # senses is already JSON; splice it in rather than decoding and encoding it again.
+    return f'{entry[:-1]},"senses":{senses}}}'
+
+
+def export_jsonl_file(conn, f, progress=None, chunk_size=2000):
+    """Write every entry to the open text file f as JSON Lines and return the entry count.
+
+    The first line is a header with the format name, version and fields; each
+    following line is one entry. Lines stand on their own, so the file can be
+    split on newlines and appended to.
+    """
+    encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+    f.write(encoder.encode({"format": JSONL_FORMAT, "version": JSONL_VERSION, "fields": JSONL_FIELDS}) + "\n")
+    count = 0
+    for row in iter_export_rows(conn, progress, chunk_size, JSONL_QUERY):
+        f.write(entry_json(encoder, *row) + "\n")
+        count += 1
+    return count
+
+
+def export_delta_file(conn, f, progress=None, chunk_size=2000, since=0, until=None):
+    """Write the entries changed after change number since, up to until, to the open text file f.
+
+    The format is JSON Lines: a header with the format, version and the
+    change range, then one line per changed entry in change order. Entries
+    that still exist are written as in export_jsonl_file; deleted ones as a
+    tombstone, {"id": ..., "deleted": true}. until defaults to the last
+    change; a delta from since 0 holds every entry. Returns the line count.
+    """
+    if until is None:
+        until = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM EntryChanges").fetchone()[0]
+    total = conn.execute("SELECT COUNT(*) FROM EntryChanges WHERE seq > ? AND seq <= ?", (since, until)).fetchone()[0]
+    encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+    f.write(encoder.encode({"format": DELTA_FORMAT, "version": DELTA_VERSION, "since": since, "until": until,
+                            "fields": JSONL_FIELDS}) + "\n")
+    count = 0
+    for row in iter_export_rows(conn, progress, chunk_size, DELTA_QUERY, (since, until), total):
+        if row[6]:
+            f.write(encoder.encode({"id": row[0], "deleted": True}) + "\n")
+        else:
+            f.write(entry_json(encoder, *row[:6]) + "\n")
+        count += 1
+    return count
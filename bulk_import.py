@@ -0,0 +1,597 @@
+import csv
+import json
+import time
+import sqlite3
+import logging
+
+from migrations import SEARCH_INDEX_ROW, RECORD_CHANGES, suspend_triggers, restore_triggers
+from match_keys import entry_keys, strip_diacritics_setting
+from json_stream import iter_json_array
+
+IMPORT_FIELDS = ("headword", "variation", "part_of_speech", "notes", "meanings")
+MEANING_SEPARATOR = ";;"
+
+# JSON Lines exports start with a header line naming the format and its version;
+# every following line is one entry whose "senses" keep their order.
+JSONL_FORMAT = "uri-dictmaker-entries"
+JSONL_VERSION = 1
+JSONL_FIELDS = ("id", "headword", "variation", "part_of_speech", "notes", "senses")
+# Delta files have the same lines, plus {"id": ..., "deleted": true} for deleted entries.
+DELTA_FORMAT = "uri-dictmaker-delta"
+DELTA_VERSION = 1
+
+# What an import does with a row whose headword key matches an existing entry.
+IMPORT_APPEND = "append"        # add it as a new entry anyway
+IMPORT_SKIP = "skip"            # leave the existing entry alone
+IMPORT_REPLACE = "replace"      # overwrite the existing entry's fields and senses
+IMPORT_MERGE = "merge"          # add its senses the existing entry does not have yet
+IMPORT_POLICIES = (IMPORT_APPEND, IMPORT_SKIP, IMPORT_REPLACE, IMPORT_MERGE)
+
+# Per-row index triggers that EntryWriter replaces with one statement per chunk.
+_INSERT_TRIGGERS = ("EntrySearch_entry_insert", "EntrySearch_sense_insert", "EntryTrigram_insert",
+                    "Initials_insert", "Stats_entry_insert", "Stats_sense_insert",
+                    "EntryChanges_entry_insert", "EntryChanges_sense_insert")
+
+
+class ImportCancelled(Exception):
+    pass
+
+
+class ImportReport:
+    def __init__(self, positions="rows"):
+        self.rows = 0
+        self.entries = 0
+        self.senses = 0
+        self.policy = IMPORT_APPEND
+        self.merged = 0          # rows whose senses went to an existing entry
+        self.replaced = 0        # existing entries overwritten by a row
+        self.skipped = 0         # rows left out because their headword exists
+        self.deleted = 0         # entries a delta deleted
+        self.errors = []         # (position, message)
+        self.positions = positions     # what error positions count: "rows", "lines" or "bytes"
+        self.started = time.perf_counter()
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    @property
+    def rows_per_second(self):
+        elapsed = self.elapsed
+        return self.rows / elapsed if elapsed > 0 else 0.0
+
+    def add_error(self, row_number, message):
+        self.errors.append((row_number, str(message)))
+
+
+class EntryWriter:
+    """Batched writer for imported entries.
+
+    Entry ids are assigned up front, so a whole chunk of entries and their
+    senses goes to SQLite in two executemany() calls instead of one round trip
+    per row, and the search indexes, initial counts and statistics are filled
+    for the chunk's id range in a few statements while their per-row insert
+    triggers are dropped (inside the transaction, so a rollback restores them).
+    Every chunk runs inside a savepoint of one outer transaction: a chunk that
+    fails is rolled back and replayed row by row to find the bad rows, and
+    commit() or rollback() decide the fate of the whole import.
+    """
+
+    def __init__(self, conn, report=None, chunk_size=5000):
+        self.conn = conn
+        self.report = report or ImportReport()
+        self.chunk_size = chunk_size
+        self._entries = []
+        self._senses = []
+        self._row_numbers = []
+        if conn.in_transaction:
+            conn.commit()
+        conn.execute("BEGIN IMMEDIATE")
+        self._next_id = conn.execute("SELECT COALESCE(MAX(id), 0) + 1 FROM Entry").fetchone()[0]
+        self._strip_diacritics = strip_diacritics_setting(conn)
+        self._suspended = suspend_triggers(conn.cursor(), _INSERT_TRIGGERS)
+        suspended = {name for name, _ in self._suspended}
+        self._index_search = "EntrySearch_entry_insert" in suspended
+        self._index_trigram = "EntryTrigram_insert" in suspended
+        self._count_initials = "Initials_insert" in suspended
+        self._count_stats = "Stats_entry_insert" in suspended
+        self._track_changes = "EntryChanges_entry_insert" in suspended
+
+    def add(self, row_number, headword, variation, part_of_speech, notes, meanings, keys=None):
+        """Queue one entry; returns True when a chunk was written.
+
+        keys are the entry's match keys if the caller computed them already.
+        """
+        entry_id = self._next_id
+        self._next_id += 1
+        if keys is None:
+            keys = entry_keys(headword, variation, self._strip_diacritics)
+        self._entries.append((entry_id, headword, variation, part_of_speech, notes) + keys)
+        self._senses.extend((entry_id, meaning) for meaning in meanings)
+        self._row_numbers.append(row_number)
+        if len(self._entries) >= self.chunk_size:
+            self.flush()
+            return True
+        return False
+
+    def _write(self, entries, senses):
+        self.conn.executemany(
+            "INSERT INTO Entry (id, headword, variation, part_of_speech, notes, headword_key, variation_key, initial) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            entries
+        )
+        self.conn.executemany("INSERT INTO Senses (entry_id, meaning) VALUES (?, ?)", senses)
+        # Ids are handed out in increasing order, so the chunk is one id range.
+        id_range = (entries[0][0], entries[-1][0])
+        if self._index_search:
+            self.conn.execute(f'''
+                INSERT INTO EntrySearch (rowid, headword, variation, part_of_speech, notes, meanings)
+                {SEARCH_INDEX_ROW} WHERE Entry.id BETWEEN ? AND ?''', id_range)
+        if self._index_trigram:
+            self.conn.execute('''
+                INSERT INTO EntryTrigram (rowid, headword, variation, part_of_speech)
+                SELECT id, headword, variation, part_of_speech FROM Entry WHERE id BETWEEN ? AND ?''',
+                id_range)
+        if self._count_initials:
+            self.conn.execute('''
+                INSERT INTO Initials (initial, count)
+                SELECT initial, COUNT(*) FROM Entry WHERE id BETWEEN ? AND ? AND initial IS NOT NULL
+                GROUP BY initial
+                ON CONFLICT (initial) DO UPDATE SET count = count + excluded.count''', id_range)
+        if self._count_stats:
+            self._count_chunk(id_range, len(entries), len(senses))
+        if self._track_changes:
+            self.conn.execute(RECORD_CHANGES.format(ids="SELECT id FROM Entry WHERE id BETWEEN ? AND ?"), id_range)
+
+    def _count_chunk(self, id_range, entries, senses):
+        self.conn.execute("UPDATE Stats SET value = value + ? WHERE name = 'entries'", (entries,))
+        self.conn.execute("UPDATE Stats SET value = value + ? WHERE name = 'senses'", (senses,))
+        self.conn.execute('''
+            INSERT INTO PosCounts (part_of_speech, count)
+            SELECT COALESCE(part_of_speech, ''), COUNT(*) FROM Entry WHERE id BETWEEN ? AND ?
+            GROUP BY 1
+            ON CONFLICT (part_of_speech) DO UPDATE SET count = count + excluded.count''', id_range)
+        # A key forms a new duplicate group if the chunk takes it from fewer than
+        # two entries to two or more.
+        self.conn.execute('''
+            UPDATE Stats SET value = value + (
+                SELECT COUNT(*) FROM (
+                    SELECT DISTINCT headword_key AS chunk_key FROM Entry
+                    WHERE id BETWEEN ?1 AND ?2 AND headword_key IS NOT NULL)
+                WHERE (SELECT COUNT(*) FROM (SELECT 1 FROM Entry WHERE headword_key = chunk_key LIMIT 2)) = 2
+                  AND (SELECT COUNT(*) FROM (SELECT 1 FROM Entry WHERE headword_key = chunk_key AND id < ?1 LIMIT 2)) < 2)
+            WHERE name = 'duplicate_groups' ''', id_range)
+
+    def flush(self):
+        if not self._entries:
+            return
+        entries, senses, row_numbers = self._entries, self._senses, self._row_numbers
+        self._entries, self._senses, self._row_numbers = [], [], []
+        self.conn.execute("SAVEPOINT import_chunk")
+        try:
+            self._write(entries, senses)
+            self.conn.execute("RELEASE import_chunk")
+        except sqlite3.Error:
+            self.conn.execute("ROLLBACK TO import_chunk")
+            self.conn.execute("RELEASE import_chunk")
+            self._write_one_by_one(entries, senses, row_numbers)
+            return
+        self.report.entries += len(entries)
+        self.report.senses += len(senses)
+
+    def _write_one_by_one(self, entries, senses, row_numbers):
+        senses_by_entry = {}
+        for entry_id, meaning in senses:
+            senses_by_entry.setdefault(entry_id, []).append((entry_id, meaning))
+        for entry, row_number in zip(entries, row_numbers):
+            entry_senses = senses_by_entry.get(entry[0], [])
+            self.conn.execute("SAVEPOINT import_row")
+            try:
+                self._write([entry], entry_senses)
+                self.conn.execute("RELEASE import_row")
+            except sqlite3.Error as e:
+                self.conn.execute("ROLLBACK TO import_row")
+                self.conn.execute("RELEASE import_row")
+                self.report.add_error(row_number, e)
+                continue
+            self.report.entries += 1
+            self.report.senses += len(entry_senses)
+
+    def commit(self):
+        self.flush()
+        restore_triggers(self.conn.cursor(), self._suspended)
+        self.conn.commit()
+
+    def rollback(self):
+        self._entries, self._senses, self._row_numbers = [], [], []
+        self.conn.rollback()
+
+
+class UpsertWriter:
+    """Import writer that resolves rows against the entries already in the database.
+
+    Rows are staged in temp tables one chunk at a time. flush() matches the
+    chunk to existing entries by headword key in one UPDATE, applies the policy
+    to the matched rows with a few set-based statements, sends the others
+    through an EntryWriter and empties the staging tables again, all in the
+    EntryWriter's transaction, so memory stays flat however large the file.
+    Rows are only matched against entries that existed before the import
+    (ids below the first one the import hands out), so duplicates within the
+    file are added as they are; a headword key shared by several existing
+    entries resolves to the oldest, the one a duplicate merge keeps.
+    """
+
+    def __init__(self, conn, report, chunk_size=5000, policy=IMPORT_MERGE):
+        self.conn = conn
+        self.report = report
+        self.report.policy = policy
+        self.chunk_size = chunk_size
+        self.policy = policy
+        self.writer = EntryWriter(conn, report, chunk_size)
+        self._first_new_id = self.writer._next_id
+        self._rows = []
+        self._senses = []
+        self._seq = 0
+        conn.execute("DROP TABLE IF EXISTS temp.import_rows")
+        conn.execute("DROP TABLE IF EXISTS temp.import_senses")
+        conn.execute("DROP TABLE IF EXISTS temp.import_replaced")
+        conn.execute('''CREATE TEMP TABLE import_rows (
+            seq INTEGER PRIMARY KEY, row_number INTEGER, headword TEXT, variation TEXT,
+            part_of_speech TEXT, notes TEXT, headword_key TEXT, variation_key TEXT, initial TEXT,
+            existing_id INTEGER)''')
+        conn.execute("CREATE TEMP TABLE import_senses (seq INTEGER NOT NULL, meaning TEXT NOT NULL)")
+        conn.execute("CREATE INDEX temp.idx_import_senses_seq ON import_senses (seq)")
+        # Entries replaced by an earlier chunk: a later row for them counts as skipped.
+        conn.execute("CREATE TEMP TABLE import_replaced (id INTEGER PRIMARY KEY)")
+
+    def add(self, row_number, headword, variation, part_of_speech, notes, meanings, keys=None):
+        """Stage one row; returns True when a chunk was written."""
+        if keys is None:
+            keys = entry_keys(headword, variation, self.writer._strip_diacritics)
+        self._seq += 1
+        self._rows.append((self._seq, row_number, headword, variation, part_of_speech, notes) + keys)
+        self._senses.extend((self._seq, meaning) for meaning in meanings)
+        if len(self._rows) >= self.chunk_size:
+            self.flush()
+            return True
+        return False
+
+    def flush(self):
+        if not self._rows:
+            return
+        rows, senses = self._rows, self._senses
+        self._rows, self._senses = [], []
+        self.conn.executemany(
+            "INSERT INTO temp.import_rows (seq, row_number, headword, variation, part_of_speech, notes, "
+            "headword_key, variation_key, initial) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        self.conn.executemany("INSERT INTO temp.import_senses (seq, meaning) VALUES (?, ?)", senses)
+        self._resolve()
+        new = {seq for seq, in self.conn.execute("SELECT seq FROM temp.import_rows WHERE existing_id IS NULL")}
+        self.conn.execute("DELETE FROM temp.import_rows")
+        self.conn.execute("DELETE FROM temp.import_senses")
+        meanings = {}
+        for seq, meaning in senses:
+            if seq in new:
+                meanings.setdefault(seq, []).append(meaning)
+        for row in rows:
+            if row[0] in new:
+                self.writer.add(*row[1:6], meanings.get(row[0], []), row[6:9])
+
+    def _resolve(self):
+        cursor = self.conn.cursor()
+        cursor.execute('''
+            UPDATE temp.import_rows SET existing_id =
+                (SELECT MIN(id) FROM Entry WHERE headword_key = import_rows.headword_key AND id < ?)
+            WHERE headword_key IS NOT NULL''', (self._first_new_id,))
+        matched, = cursor.execute(
+            "SELECT COUNT(*) FROM temp.import_rows WHERE existing_id IS NOT NULL").fetchone()
+        if not matched:
+            return
+        if self.policy == IMPORT_SKIP:
+            self.report.skipped += matched
+            return
+        if self.policy == IMPORT_MERGE:
+            # Each meaning an entry lacks is added once, in the order it first appears.
+            cursor.execute('''
+                INSERT INTO Senses (entry_id, meaning)
+                SELECT entry_id, meaning FROM (
+                    SELECT r.existing_id AS entry_id, s.meaning, MIN(s.rowid) AS first
+                    FROM temp.import_senses AS s JOIN temp.import_rows AS r ON r.seq = s.seq
+                    WHERE r.existing_id IS NOT NULL AND NOT EXISTS (
+                        SELECT 1 FROM Senses WHERE entry_id = r.existing_id AND meaning = s.meaning)
+                    GROUP BY r.existing_id, s.meaning)
+                ORDER BY first''')
+            senses = cursor.rowcount
+            self.report.merged += matched
+        else:
+            # The last row matching an entry replaces it; earlier ones are skipped.
+            # A later chunk replaces it again, so over the file the last row wins.
+            winners = '''SELECT MAX(seq) FROM temp.import_rows
+                         WHERE existing_id IS NOT NULL GROUP BY existing_id'''
+            cursor.execute(f'''
+                UPDATE Entry SET headword = r.headword, variation = r.variation,
+                    part_of_speech = r.part_of_speech, notes = r.notes, headword_key = r.headword_key,
+                    variation_key = r.variation_key, initial = r.initial
+                FROM temp.import_rows AS r
+                WHERE r.seq IN ({winners}) AND Entry.id = r.existing_id''')
+            # Senses an earlier chunk put there were counted in the report already.
+            self.report.senses -= cursor.execute('''
+                SELECT COUNT(*) FROM Senses
+                WHERE entry_id IN (SELECT existing_id FROM temp.import_rows JOIN temp.import_replaced
+                                   ON import_replaced.id = existing_id)''').fetchone()[0]
+            cursor.execute('''
+                DELETE FROM Senses
+                WHERE entry_id IN (SELECT existing_id FROM temp.import_rows WHERE existing_id IS NOT NULL)''')
+            cursor.execute(f'''
+                INSERT INTO Senses (entry_id, meaning)
+                SELECT r.existing_id, s.meaning
+                FROM temp.import_senses AS s JOIN temp.import_rows AS r ON r.seq = s.seq
+                WHERE r.seq IN ({winners})
+                ORDER BY s.rowid''')
+            senses = cursor.rowcount
+            cursor.execute('''
+                INSERT OR IGNORE INTO temp.import_replaced (id)
+                SELECT existing_id FROM temp.import_rows WHERE existing_id IS NOT NULL''')
+            replaced = cursor.rowcount
+            self.report.replaced += replaced
+            self.report.skipped += matched - replaced
+        self.report.senses += senses
+        # The sense insert triggers are suspended while the EntryWriter is open.
+        touched = "SELECT DISTINCT existing_id FROM temp.import_rows WHERE existing_id IS NOT NULL"
+        if self.writer._index_search:
+            cursor.execute(f"DELETE FROM EntrySearch WHERE rowid IN ({touched})")
+            cursor.execute(f'''
+                INSERT INTO EntrySearch (rowid, headword, variation, part_of_speech, notes, meanings)
+                {SEARCH_INDEX_ROW} WHERE Entry.id IN ({touched})''')
+        if self.writer._count_stats:
+            cursor.execute("UPDATE Stats SET value = value + ? WHERE name = 'senses'", (senses,))
+        if self.writer._track_changes:
+            cursor.execute(RECORD_CHANGES.format(ids=touched))
+
+    def commit(self):
+        self.flush()
+        self.writer.commit()
+        self._drop()
+
+    def rollback(self):
+        self.writer.rollback()
+        self._drop()
+
+    def _drop(self):
+        self.conn.execute("DROP TABLE IF EXISTS temp.import_rows")
+        self.conn.execute("DROP TABLE IF EXISTS temp.import_senses")
+        self.conn.execute("DROP TABLE IF EXISTS temp.import_replaced")
+
+
+def import_writer(conn, report, chunk_size=5000, policy=IMPORT_APPEND):
+    """The writer import_rows and the parallel import use for policy."""
+    if policy == IMPORT_APPEND:
+        return EntryWriter(conn, report, chunk_size)
+    return UpsertWriter(conn, report, chunk_size, policy)
+
+
+def split_meanings(value):
+    return [m.strip() for m in value.split(MEANING_SEPARATOR) if m.strip()]
+
+
+def iter_csv_rows(csvfile, report):
+    """Yield (line number, headword, variation, part_of_speech, notes, meanings) per CSV row.
+
+    Rows that cannot be parsed are recorded in report.errors and skipped.
+    """
+    reader = csv.reader(csvfile)
+    header = [h.strip() for h in next(reader, None) or []]
+    missing = set(IMPORT_FIELDS) - set(header)
+    if missing:
+        raise ValueError(f"Invalid CSV: missing columns {sorted(missing)}")
+    positions = [header.index(name) for name in IMPORT_FIELDS]
+    width = len(header)
+    while True:
+        try:
+            row = next(reader)
+        except StopIteration:
+            return
+        except csv.Error as e:
+            report.rows += 1
+            report.add_error(reader.line_num, e)
+            continue
+        if not row:
+            continue
+        report.rows += 1
+        if len(row) < width:
+            report.add_error(reader.line_num, f"expected {width} fields, found {len(row)}")
+            continue
+        if len(row) > width and any(value.strip() for value in row[width:]):
+            report.add_error(reader.line_num, f"expected {width} fields, found {len(row)}")
+            continue
+        headword, variation, pos, notes, meanings = (row[i].strip() for i in positions)
+        yield reader.line_num, headword, variation, pos, notes, split_meanings(meanings)
+
+
+def import_rows(conn, rows, report, progress=None, chunk_size=5000, policy=IMPORT_APPEND):
+    """Write rows from one of the iter_*_rows readers and return report.
+
+    policy is one of IMPORT_POLICIES and says what happens to rows whose
+    headword already exists. progress(report) is called after every written
+    chunk and may raise ImportCancelled, in which case the whole import is
+    rolled back.
+    """
+    writer = import_writer(conn, report, chunk_size, policy)
+    try:
+        for row in rows:
+            if writer.add(*row) and progress:
+                progress(report)
+        writer.commit()
+    except BaseException:
+        writer.rollback()
+        raise
+    if report.errors:
+        logging.warning("Import skipped %d entries", len(report.errors))
+    return report
+
+
+def import_csv_file(conn, csvfile, progress=None, chunk_size=5000, policy=IMPORT_APPEND):
+    """Import an open CSV file into conn and return an ImportReport; see import_rows for progress and policy."""
+    report = ImportReport()
+    return import_rows(conn, iter_csv_rows(csvfile, report), report, progress, chunk_size, policy)
+
+
+def entry_from_item(item, senses_key="meanings"):
+    """Check a decoded JSON entry and return (headword, variation, part_of_speech, notes, meanings).
+
+    Raises ValueError with the reason the item cannot be imported.
+    """
+    if not isinstance(item, dict):
+        raise ValueError("item is not an object")
+    missing = set(IMPORT_FIELDS[:-1] + (senses_key,)) - set(item)
+    if missing:
+        raise ValueError(f"missing keys {sorted(missing)}")
+    meanings = item[senses_key]
+    if not isinstance(meanings, list):
+        raise ValueError(f"'{senses_key}' must be a list")
+    fields = ["" if item[name] is None else item[name] for name in IMPORT_FIELDS[:-1]]
+    if not all(isinstance(value, str) for value in fields):
+        raise ValueError("headword, variation, part_of_speech and notes must be strings")
+    return tuple(value.strip() for value in fields) + ([str(m).strip() for m in meanings if str(m).strip()],)
+
+
+def iter_json_rows(f, report):
+    """Yield (byte offset, headword, variation, part_of_speech, notes, meanings) per item of a JSON export.
+
+    f is the file opened in binary mode. Items that are not valid entries are
+    recorded in report.errors under their byte offset and skipped; malformed
+    JSON raises json_stream.JsonStreamError.
+    """
+    for offset, item in iter_json_array(f):
+        report.rows += 1
+        try:
+            yield (offset,) + entry_from_item(item)
+        except ValueError as e:
+            report.add_error(offset, e)
+
+
+def import_json_file(conn, f, progress=None, chunk_size=5000, policy=IMPORT_APPEND):
+    """Import a JSON array of entries from the binary file f into conn and return an ImportReport.
+
+    The file is decoded one item at a time, so memory does not grow with its
+    size. Invalid items are skipped and reported by byte offset.
+    """
+    report = ImportReport(positions="bytes")
+    return import_rows(conn, iter_json_rows(f, report), report, progress, chunk_size, policy)
+
+
+def read_jsonl_header(f, format=JSONL_FORMAT, max_version=JSONL_VERSION):
+    """Read and check the header line of a JSON Lines export opened in binary mode; returns it."""
+    try:
+        header = json.loads(f.readline())
+    except ValueError:
+        header = None
+    if not isinstance(header, dict) or header.get("format") != format:
+        raise ValueError(f"Invalid JSON Lines file: the first line is not a {format} header")
+    version = header.get("version")
+    if not isinstance(version, int) or version > max_version:
+        raise ValueError(f"Unsupported JSON Lines version: {version}")
+    return header
+
+
+def iter_jsonl_rows(f, report):
+    """Yield (line number, headword, variation, part_of_speech, notes, meanings) per entry of a JSON Lines export.
+
+    f is the file opened in binary mode. Lines that are not valid JSON or not
+    valid entries are recorded in report.errors and skipped; every line stands
+    on its own, so one bad line does not affect the rest.
+    """
+    read_jsonl_header(f)
+    for line_number, line in enumerate(f, 2):
+        if not line.strip():
+            continue
+        report.rows += 1
+        try:
+            yield (line_number,) + entry_from_item(json.loads(line), "senses")
+        except ValueError as e:
+            report.add_error(line_number, e)
+
+
+def import_jsonl_file(conn, f, progress=None, chunk_size=5000, policy=IMPORT_APPEND):
+    """Import a JSON Lines export from the binary file f into conn and return an ImportReport."""
+    report = ImportReport(positions="lines")
+    return import_rows(conn, iter_jsonl_rows(f, report), report, progress, chunk_size, policy)
+
+
+def iter_delta_rows(f, report):
+    """Yield (line number, entry id, row) per line of a delta file opened in binary mode.
+
+    row is (headword, variation, part_of_speech, notes, meanings), or None
+    for a deleted entry. Invalid lines are recorded in report.errors and skipped.
+    """
+    read_jsonl_header(f, DELTA_FORMAT, DELTA_VERSION)
+    for line_number, line in enumerate(f, 2):
+        if not line.strip():
+            continue
+        report.rows += 1
+        try:
+            item = json.loads(line)
+            entry_id = item.get("id") if isinstance(item, dict) else None
+            if not isinstance(entry_id, int) or isinstance(entry_id, bool) or entry_id < 1:
+                raise ValueError("'id' must be a positive integer")
+            yield line_number, entry_id, None if item.get("deleted") else entry_from_item(item, "senses")
+        except ValueError as e:
+            report.add_error(line_number, e)
+
+
+def _apply_delta_chunk(conn, entries, senses, deleted, report):
+    ids = [(entry[0],) for entry in entries] + deleted
+    conn.executemany("DELETE FROM Senses WHERE entry_id = ?", ids)
+    # rowcount leaves out rows the triggers changed.
+    report.deleted += conn.executemany("DELETE FROM Entry WHERE id = ?", deleted).rowcount
+    conn.executemany(
+        "INSERT INTO Entry (id, headword, variation, part_of_speech, notes, headword_key, variation_key, initial) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+        "ON CONFLICT (id) DO UPDATE SET headword = excluded.headword, variation = excluded.variation, "
+        "part_of_speech = excluded.part_of_speech, notes = excluded.notes, headword_key = excluded.headword_key, "
+        "variation_key = excluded.variation_key, initial = excluded.initial",
+        entries
+    )
+    conn.executemany("INSERT INTO Senses (entry_id, meaning) VALUES (?, ?)", senses)
+    report.entries += len(entries)
+    report.senses += len(senses)
+
+
+def apply_delta_file(conn, f, progress=None, chunk_size=2000):
+    """Apply a delta file from export_delta_file, opened in binary mode, and return an ImportReport.
+
+    Entries are matched by id: changed entries replace the entry with their
+    id or are added under it, tombstones delete it. That makes a delta fit
+    for copies of the dictionary it was exported from, and applying it twice
+    changes nothing. The file is read line by line and applied in chunks in
+    one transaction, with the regular triggers keeping the indexes current;
+    progress(report) runs after each chunk and may raise to roll back.
+    """
+    report = ImportReport(positions="lines")
+    strip_diacritics = strip_diacritics_setting(conn)
+    if conn.in_transaction:
+        conn.commit()
+    conn.execute("BEGIN IMMEDIATE")
+    entries, senses, deleted = [], [], []
+    try:
+        for _, entry_id, row in iter_delta_rows(f, report):
+            if row is None:
+                deleted.append((entry_id,))
+            else:
+                headword, variation, part_of_speech, notes, meanings = row
+                entries.append((entry_id, headword, variation, part_of_speech, notes)
+                               + entry_keys(headword, variation, strip_diacritics))
+                senses.extend((entry_id, meaning) for meaning in meanings)
+            if len(entries) + len(deleted) >= chunk_size:
+                _apply_delta_chunk(conn, entries, senses, deleted, report)
+                entries, senses, deleted = [], [], []
+                if progress:
+                    progress(report)
+        _apply_delta_chunk(conn, entries, senses, deleted, report)
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    if report.errors:
+        logging.warning("Delta skipped %d lines", len(report.errors))
+    return report
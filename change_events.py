@@ -0,0 +1,15 @@
+from PyQt5.QtCore import QObject, pyqtSignal
+
+
+class ChangeEvents(QObject):
+    """Signals the data layer emits once writes to Entry and Senses are committed.
+
+    inserted, updated and deleted carry lists of Entry ids, so views can patch
+    themselves instead of reloading. reset means too much changed to list
+    (imports, merges, another database was opened) and listeners should reload.
+    """
+
+    inserted = pyqtSignal(list)
+    updated = pyqtSignal(list)
+    deleted = pyqtSignal(list)
+    reset = pyqtSignal()
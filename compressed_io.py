@@ -0,0 +1,176 @@
+import io
+import os
+import gzip
+import lzma
+import queue
+import threading
+
+# File extensions that select a codec, as in "dictionary.csv.gz".
+COMPRESSED_EXTENSIONS = (".gz", ".xz")
+DEFAULT_LEVEL = 6              # gzip compresslevel or xz preset, 0-9
+CHUNK_SIZE = 1 << 20
+# Chunks buffered between the codec thread and the reader or writer.
+_QUEUE_CHUNKS = 4
+
+
+def compression_for(path):
+    """".gz", ".xz" or None, from the extension of path."""
+    extension = os.path.splitext(path)[1].lower()
+    return extension if extension in COMPRESSED_EXTENSIONS else None
+
+
+class _PipeReader(io.RawIOBase):
+    """Reads a decompressing file through a background thread.
+
+    zlib and lzma release the GIL while they work, so the thread decompresses
+    the next chunks while the caller parses the current one.
+    """
+
+    def __init__(self, source, raw, chunk_size=CHUNK_SIZE):
+        super().__init__()
+        self.source = source
+        self.raw = raw
+        self._chunks = queue.Queue(_QUEUE_CHUNKS)
+        self._chunk = b""
+        self._pos = 0
+        self._eof = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(chunk_size,), daemon=True)
+        self._thread.start()
+
+    def _run(self, chunk_size):
+        try:
+            while not self._stop.is_set():
+                data = self.source.read(chunk_size)
+                self._put(data)
+                if not data:
+                    return
+        except Exception as e:
+            self._put(e)
+
+    def _put(self, item):
+        while not self._stop.is_set():
+            try:
+                self._chunks.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        while self._pos >= len(self._chunk):
+            if self._eof:
+                return 0
+            item = self._chunks.get()
+            if isinstance(item, Exception):
+                self._eof = True
+                raise item
+            if not item:
+                self._eof = True
+                return 0
+            self._chunk, self._pos = item, 0
+        n = min(len(b), len(self._chunk) - self._pos)
+        b[:n] = self._chunk[self._pos:self._pos + n]
+        self._pos += n
+        return n
+
+    def close(self):
+        if not self.closed:
+            self._stop.set()
+            self._thread.join()
+            try:
+                self.source.close()
+            finally:
+                self.raw.close()
+        super().close()
+
+
+class _PipeWriter(io.RawIOBase):
+    """Writes to a compressing file through a background thread; see _PipeReader."""
+
+    def __init__(self, target, raw):
+        super().__init__()
+        self.target = target
+        self.raw = raw
+        self._chunks = queue.Queue(_QUEUE_CHUNKS)
+        self._error = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            data = self._chunks.get()
+            if data is None:
+                return
+            if self._error is None:
+                try:
+                    self.target.write(data)
+                except Exception as e:
+                    # Keep taking chunks so the writer never blocks; write() raises it.
+                    self._error = e
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        if self._error is not None:
+            raise self._error
+        self._chunks.put(bytes(b))
+        return len(b)
+
+    def close(self):
+        if self.closed:
+            return
+        self._chunks.put(None)
+        self._thread.join()
+        try:
+            self.target.close()
+        finally:
+            self.raw.close()
+            super().close()
+        if self._error is not None:
+            raise self._error
+
+
+def open_input(path):
+    """Open path for binary reading, decompressing .gz and .xz files on the fly.
+
+    Returns (file, raw): raw is the file on disk, whose tell() says how much
+    of path was read, for progress. Decompression runs on its own thread one
+    to four chunks ahead of the reader.
+    """
+    raw = open(path, "rb")
+    compression = compression_for(path)
+    if compression is None:
+        return raw, raw
+    try:
+        if compression == ".gz":
+            source = gzip.GzipFile(fileobj=raw, mode="rb")
+        else:
+            source = lzma.LZMAFile(raw, "rb")
+    except BaseException:
+        raw.close()
+        raise
+    return io.BufferedReader(_PipeReader(source, raw), CHUNK_SIZE), raw
+
+
+def open_output(path, compression=None, level=DEFAULT_LEVEL):
+    """Open path for binary writing, compressed with compression (".gz", ".xz" or None)
+    at level 0-9 on a background thread.
+    """
+    raw = open(path, "wb")
+    if compression is None:
+        return raw
+    level = max(0, min(9, int(level)))
+    try:
+        if compression == ".gz":
+            # No file name in the header: path is usually a temporary name.
+            target = gzip.GzipFile(filename="", mode="wb", fileobj=raw, compresslevel=level)
+        else:
+            target = lzma.LZMAFile(raw, "wb", preset=level)
+    except BaseException:
+        raw.close()
+        raise
+    return io.BufferedWriter(_PipeWriter(target, raw), CHUNK_SIZE)
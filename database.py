@@ -1,15 +1,139 @@
-import sqlite3, os, json, datetime, logging
-from shutil import copyfile
-from PyQt5.QtWidgets import QMessageBox, QFileDialog, QInputDialog
-
 import os
 import json
 import sqlite3
-import datetime
 import logging
-from shutil import copyfile
 from PyQt5.QtCore import QCoreApplication
-from PyQt5.QtWidgets import QMessageBox, QInputDialog, QFileDialog
+from PyQt5.QtWidgets import QMessageBox, QFileDialog
+from migrations import (migrate, MigrationError, ensure_trigram_index, drop_trigram_index,
+                        suspend_triggers, restore_triggers, rebuild_counts, SEARCH_INDEX_ROW)
+from search import register_functions, has_table
+from fuzzy_index import FuzzyIndex
+from change_events import ChangeEvents
+from db_profiles import PROFILES, DEFAULT_PROFILE, apply_profile, IdleCheckpointer
+from settings import load_settings, save_settings
+from match_keys import entry_keys, strip_diacritics_setting, backfill_keys, STRIP_DIACRITICS
+from backup import (DEFAULT_RETENTION, backup_dir, create_backup, prune_backups,
+                    restore_backup)
+from jobs import Job, JobQueue, PRIORITY_HIGH, PRIORITY_NORMAL, PRIORITY_LOW
+
+# Entries with the same normalized headword (see match_keys) are duplicates;
+# grouping on it is served by idx_entry_headword_key.
+DUPLICATE_KEY = "headword_key"
+
+# Per-row index triggers that remove_duplicates replaces with set-based statements.
+_DUPLICATE_TRIGGERS = ("EntrySearch_sense_update", "EntrySearch_sense_delete",
+                       "EntrySearch_entry_delete", "EntryTrigram_delete", "Initials_delete",
+                       "Stats_entry_delete", "Stats_sense_delete")
+
+
+def list_duplicates(conn):
+    """Return (headword, count) for every group of entries sharing DUPLICATE_KEY."""
+    # With MIN(id) in the select list SQLite takes the bare headword from that
+    # same row, i.e. the entry a merge would keep.
+    rows = conn.execute(f'''
+        SELECT headword, COUNT(*), MIN(id) FROM Entry
+        WHERE {DUPLICATE_KEY} IS NOT NULL
+        GROUP BY {DUPLICATE_KEY} HAVING COUNT(*) > 1
+        ORDER BY {DUPLICATE_KEY}''')
+    return [(headword, count) for headword, count, _ in rows]
+
+
+def _collect_duplicates(cursor):
+    # Every entry whose key was seen before, mapped to the oldest entry with that key.
+    cursor.execute("DROP TABLE IF EXISTS temp.duplicate_ids")
+    cursor.execute(
+        "CREATE TEMP TABLE duplicate_ids (id INTEGER PRIMARY KEY, master_id INTEGER NOT NULL)"
+    )
+    cursor.execute(f'''
+        INSERT INTO temp.duplicate_ids (id, master_id)
+        SELECT id, master_id FROM (
+            SELECT id, MIN(id) OVER (PARTITION BY {DUPLICATE_KEY}) AS master_id
+            FROM Entry WHERE {DUPLICATE_KEY} IS NOT NULL
+        ) WHERE id != master_id''')
+    cursor.execute("SELECT COUNT(*), COUNT(DISTINCT master_id) FROM temp.duplicate_ids")
+    return cursor.fetchone()
+
+
+def remove_duplicates(conn, keep_senses, progress=None):
+    """Keep the oldest entry of every duplicate group and drop the rest, in one transaction.
+
+    With keep_senses the senses of the dropped entries move to the kept one.
+    Returns a summary dict with the number of duplicate groups, removed
+    entries and moved or deleted senses.
+    """
+    cursor = conn.cursor()
+    steps = 4
+    summary = {"groups": 0, "entries": 0, "senses": 0}
+    if conn.in_transaction:
+        conn.commit()
+    try:
+        cursor.execute("BEGIN IMMEDIATE")
+        summary["entries"], summary["groups"] = _collect_duplicates(cursor)
+        suspended = suspend_triggers(cursor, _DUPLICATE_TRIGGERS)
+        suspended_names = {name for name, _ in suspended}
+        if progress:
+            progress(1, steps)
+        if "EntryTrigram_delete" in suspended_names:
+            cursor.execute('''
+                INSERT INTO EntryTrigram (EntryTrigram, rowid, headword, variation, part_of_speech)
+                SELECT 'delete', id, headword, variation, part_of_speech FROM Entry
+                WHERE id IN (SELECT id FROM temp.duplicate_ids)''')
+        if keep_senses:
+            cursor.execute('''
+                UPDATE Senses SET entry_id =
+                    (SELECT master_id FROM temp.duplicate_ids WHERE id = Senses.entry_id)
+                WHERE entry_id IN (SELECT id FROM temp.duplicate_ids)''')
+        else:
+            cursor.execute(
+                "DELETE FROM Senses WHERE entry_id IN (SELECT id FROM temp.duplicate_ids)"
+            )
+        summary["senses"] = cursor.rowcount
+        if progress:
+            progress(2, steps)
+        if "Initials_delete" in suspended_names:
+            cursor.execute('''
+                UPDATE Initials SET count = Initials.count - removed.entries
+                FROM (SELECT Entry.initial, COUNT(*) AS entries FROM temp.duplicate_ids
+                      JOIN Entry ON Entry.id = duplicate_ids.id GROUP BY Entry.initial) AS removed
+                WHERE Initials.initial = removed.initial''')
+            cursor.execute("DELETE FROM Initials WHERE count <= 0")
+        if "Stats_entry_delete" in suspended_names:
+            # Every group collected above disappears: only its oldest entry is left.
+            cursor.execute(
+                "UPDATE Stats SET value = value - ? WHERE name = 'entries'", (summary["entries"],))
+            cursor.execute(
+                "UPDATE Stats SET value = value - ? WHERE name = 'duplicate_groups'", (summary["groups"],))
+            cursor.execute('''
+                UPDATE PosCounts SET count = PosCounts.count - removed.entries
+                FROM (SELECT COALESCE(Entry.part_of_speech, '') AS part_of_speech, COUNT(*) AS entries
+                      FROM temp.duplicate_ids JOIN Entry ON Entry.id = duplicate_ids.id GROUP BY 1) AS removed
+                WHERE PosCounts.part_of_speech = removed.part_of_speech''')
+            cursor.execute("DELETE FROM PosCounts WHERE count <= 0")
+        if not keep_senses and "Stats_sense_delete" in suspended_names:
+            cursor.execute(
+                "UPDATE Stats SET value = value - ? WHERE name = 'senses'", (summary["senses"],))
+        cursor.execute("DELETE FROM Entry WHERE id IN (SELECT id FROM temp.duplicate_ids)")
+        if "EntrySearch_entry_delete" in suspended_names:
+            cursor.execute("DELETE FROM EntrySearch WHERE rowid IN (SELECT id FROM temp.duplicate_ids)")
+            if keep_senses:
+                cursor.execute(
+                    "DELETE FROM EntrySearch WHERE rowid IN (SELECT master_id FROM temp.duplicate_ids)"
+                )
+                cursor.execute(f'''
+                    INSERT INTO EntrySearch (rowid, headword, variation, part_of_speech, notes, meanings)
+                    {SEARCH_INDEX_ROW} WHERE Entry.id IN (SELECT master_id FROM temp.duplicate_ids)''')
+        restore_triggers(cursor, suspended)
+        if progress:
+            progress(3, steps)
+        conn.commit()
+    except BaseException:
+        # Also taken when progress raises to cancel the job.
+        conn.rollback()
+        raise
+    finally:
+        cursor.execute("DROP TABLE IF EXISTS temp.duplicate_ids")
+    return summary
+
 
 class DatabaseManager:
     def __init__(self, status_callback):
@@ -17,11 +141,28 @@ class DatabaseManager:
         self.cursor = None
         self.last_loaded_db = "last_loaded_db.json"
         self.status_callback = status_callback
+        self.db_path = None
+        self.profile_name = DEFAULT_PROFILE
+        self.checkpointer = None
+        self.fuzzy_index = FuzzyIndex(max_distance=load_settings().get("fuzzy_max_distance", 2))
+        self.backup_job = None
+        self.backed_up_version = None     # data_version at the last backup
+        self.events = ChangeEvents()
+        self.data_version = 0     # bumped by every entries_* hook, i.e. after every write
+        self.jobs = JobQueue()
 
     def connect_db(self, db_name):
+        self.close_db()
         try:
             self.conn = sqlite3.connect(db_name)
             self.cursor = self.conn.cursor()
+            register_functions(self.conn)
+            self.db_path = os.path.abspath(db_name)
+            self.backed_up_version = None
+            self.profile_name = self.load_profile_name(self.db_path)
+            apply_profile(self.conn, self.profile_name)
+            self.checkpointer = IdleCheckpointer(self.db_path)
+            self.checkpointer.start()
         except Exception as e:
             QMessageBox.critical(
                 None, 
@@ -32,6 +173,175 @@ class DatabaseManager:
             return False
         return True
 
+    def close_db(self):
+        # Callers refuse to switch while a write job runs (see DictionaryApp.check_not_writing);
+        # exports and backups of the closing database are cancelled rather than waited for.
+        self.jobs.cancel_all()
+        self.jobs.wait()
+        if self.checkpointer:
+            self.checkpointer.stop()
+            self.checkpointer = None
+        if self.conn:
+            try:
+                self.conn.close()
+            except sqlite3.Error:
+                logging.exception("Failed to close database")
+        self.conn = None
+        self.cursor = None
+
+    def load_profile_name(self, db_path):
+        name = load_settings().get("db_profiles", {}).get(db_path, DEFAULT_PROFILE)
+        return name if name in PROFILES else DEFAULT_PROFILE
+
+    def set_profile(self, name):
+        if name not in PROFILES or not self.conn:
+            return
+        settings = load_settings()
+        settings.setdefault("db_profiles", {})[self.db_path] = name
+        save_settings(settings)
+        self.profile_name = name
+        apply_profile(self.conn, name)
+
+    def set_fuzzy_distance(self, max_distance):
+        self.fuzzy_index = FuzzyIndex(max_distance=max_distance)
+        if self.db_path:
+            self.fuzzy_index.build_async(self.db_path)
+
+    def start_job(self, name, function, write=False, priority=PRIORITY_NORMAL, profile=None):
+        """Queue function(conn, job) on self.jobs for the open database and return the Job.
+
+        Pending edits are committed first, since the job sees the database
+        through its own connection. Write jobs call entries_reset once they
+        succeed.
+        """
+        if self.conn.in_transaction:
+            self.conn.commit()
+        job = Job(name, function, write, priority, profile)
+        if write:
+            job.succeeded.connect(lambda result: self.entries_reset())
+        return self.jobs.submit(job, self.db_path)
+
+    def writing(self):
+        """Whether a write job is queued or running; edits would wait for its lock meanwhile."""
+        return self.jobs.has_write_job()
+
+    # Writers call one of the entries_* hooks after committing; they keep the
+    # fuzzy index current and publish the change on self.events.
+
+    def entries_inserted(self, entry_ids):
+        self.data_version += 1
+        if self.conn:
+            self.fuzzy_index.refresh_entries(self.conn, entry_ids)
+        self.events.inserted.emit(list(entry_ids))
+
+    def entries_changed(self, entry_ids):
+        self.data_version += 1
+        if self.conn:
+            self.fuzzy_index.refresh_entries(self.conn, entry_ids)
+        self.events.updated.emit(list(entry_ids))
+
+    def entries_deleted(self, entry_ids):
+        self.data_version += 1
+        self.fuzzy_index.remove_entries(entry_ids)
+        self.events.deleted.emit(list(entry_ids))
+
+    def entries_reset(self):
+        """Called after bulk writes (imports, merges) that touch too many rows to track."""
+        self.data_version += 1
+        if self.db_path:
+            self.fuzzy_index.build_async(self.db_path)
+        self.events.reset.emit()
+
+    def insert_entry(self, data, entry_id=None):
+        """Insert an entry and its meanings without committing; returns the entry id.
+
+        data uses the keys save_entry builds: headword, variation, pos, notes
+        and meanings. Every write to Entry goes through insert_entry or
+        update_entry so the match keys stay in step with the text.
+        """
+        self.cursor.execute(
+            "INSERT INTO Entry (id, headword, variation, part_of_speech, notes, headword_key, variation_key, initial) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (entry_id, data['headword'], data['variation'], data['pos'], data['notes'])
+            + entry_keys(data['headword'], data['variation'], strip_diacritics_setting(self.conn))
+        )
+        entry_id = self.cursor.lastrowid
+        self.cursor.executemany(
+            "INSERT INTO Senses (entry_id, meaning) VALUES (?, ?)",
+            [(entry_id, meaning) for meaning in data['meanings']]
+        )
+        return entry_id
+
+    def update_entry(self, entry_id, data):
+        """Replace an entry's fields and meanings without committing."""
+        self.cursor.execute(
+            "UPDATE Entry SET headword=?, variation=?, part_of_speech=?, notes=?, "
+            "headword_key=?, variation_key=?, initial=? WHERE id=?",
+            (data['headword'], data['variation'], data['pos'], data['notes'])
+            + entry_keys(data['headword'], data['variation'], strip_diacritics_setting(self.conn))
+            + (entry_id,)
+        )
+        self.cursor.execute("DELETE FROM Senses WHERE entry_id=?", (entry_id,))
+        self.cursor.executemany(
+            "INSERT INTO Senses (entry_id, meaning) VALUES (?, ?)",
+            [(entry_id, meaning) for meaning in data['meanings']]
+        )
+
+    def statistics(self):
+        """Return the Stats counters as a dict plus [(part of speech, entry count)], largest first."""
+        self.cursor.execute("SELECT name, value FROM Stats")
+        counts = dict(self.cursor.fetchall())
+        self.cursor.execute("SELECT part_of_speech, count FROM PosCounts ORDER BY count DESC, part_of_speech")
+        return counts, self.cursor.fetchall()
+
+    def recompute_statistics(self):
+        """Queue a write job that rebuilds Stats, PosCounts and Initials, in case they drifted."""
+        def run(conn, job):
+            conn.execute("BEGIN")
+            rebuild_counts(conn.cursor())
+            conn.commit()
+        return self.start_job("recompute statistics", run, write=True)
+
+    def initial_counts(self):
+        """Return (initial, entry count) for every headword initial, in code point order."""
+        self.cursor.execute("SELECT initial, count FROM Initials ORDER BY initial")
+        return self.cursor.fetchall()
+
+    def strips_diacritics(self):
+        return bool(self.conn) and strip_diacritics_setting(self.conn)
+
+    def set_strip_diacritics(self, enabled):
+        """Queue a write job that switches diacritic stripping and rebuilds every match key."""
+        def run(conn, job):
+            cursor = conn.cursor()
+            cursor.execute("BEGIN")
+            cursor.execute(
+                "INSERT OR REPLACE INTO Meta (key, value) VALUES (?, ?)",
+                (STRIP_DIACRITICS, "1" if enabled else "0")
+            )
+            backfill_keys(cursor, enabled)
+            conn.commit()
+        return self.start_job("match keys", run, write=True)
+
+    def has_substring_index(self):
+        return bool(self.conn) and has_table(self.conn, "EntryTrigram")
+
+    def set_substring_index(self, enabled):
+        """Queue a write job that builds or drops the optional trigram index.
+
+        The job's result is whether the index exists afterwards.
+        """
+        def run(conn, job):
+            cursor = conn.cursor()
+            cursor.execute("BEGIN")
+            if enabled:
+                ensure_trigram_index(cursor)
+            else:
+                drop_trigram_index(cursor)
+            conn.commit()
+            return has_table(conn, "EntryTrigram")
+        return self.start_job("substring index", run, write=True)
+
     def check_db_structure(self):
         try:
             self.cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='Entry'")
@@ -48,6 +358,24 @@ class DatabaseManager:
             )
             return False
 
+    def upgrade_schema(self, parent=None):
+        try:
+            applied = migrate(self.conn)
+        except (sqlite3.Error, MigrationError) as e:
+            QMessageBox.critical(
+                parent,
+                QCoreApplication.translate("DatabaseManager", "Database Error"),
+                QCoreApplication.translate("DatabaseManager", "Database upgrade failed: {error_message}")
+                    .format(error_message=e)
+            )
+            return False
+        if applied:
+            self.status_callback(
+                QCoreApplication.translate("DatabaseManager", "Database upgraded to schema version {version}")
+                    .format(version=applied[-1])
+            )
+        return True
+
     def save_last_db(self, db_name):
         with open(self.last_loaded_db, "w") as f:
             json.dump({"db_name": db_name}, f)
@@ -94,18 +422,8 @@ class DatabaseManager:
 
         try:
             if self.connect_db(db_name):
-                self.cursor.execute('''CREATE TABLE Entry (
-                    id INTEGER PRIMARY KEY,
-                    headword TEXT,
-                    variation TEXT,
-                    part_of_speech TEXT,
-                    notes TEXT)''')
-                self.cursor.execute('''CREATE TABLE Senses (
-                    id INTEGER PRIMARY KEY,
-                    entry_id INTEGER,
-                    meaning TEXT,
-                    FOREIGN KEY(entry_id) REFERENCES Entry(id))''')
-                self.conn.commit()
+                migrate(self.conn)
+                self.entries_reset()
                 self.save_last_db(db_name)
                 self.status_callback(
                     QCoreApplication.translate("DatabaseManager", "Created new database: {database}")
@@ -119,8 +437,7 @@ class DatabaseManager:
                 QCoreApplication.translate("DatabaseManager", "Failed to create database: {error_message}")
                     .format(error_message=e)
             )
-            if self.conn:
-                self.conn.close()
+            self.close_db()
         return None
 
     def load_database(self, parent, db_name=None):
@@ -140,8 +457,12 @@ class DatabaseManager:
                             QCoreApplication.translate("DatabaseManager", "Invalid"),
                             QCoreApplication.translate("DatabaseManager", "Not a valid dictionary database!")
                         )
-                        self.conn.close()
+                        self.close_db()
+                        return None
+                    if not self.upgrade_schema(parent):
+                        self.close_db()
                         return None
+                    self.entries_reset()
                     self.save_last_db(db_name)
                     self.status_callback(
                         QCoreApplication.translate("DatabaseManager", "Loaded: {database}")
@@ -155,73 +476,119 @@ class DatabaseManager:
                     QCoreApplication.translate("DatabaseManager", "Load failed: {error_message}")
                         .format(error_message=e)
                 )
-                if self.conn:
-                    self.conn.close()
+                self.close_db()
         return None
 
-    def backup_database(self):
-        if self.conn is None:
-            return
-        db_name = self.load_last_db()
-        if not db_name or not os.path.exists(db_name):
-            return
-        backup_dir = "backups"
-        if not os.path.exists(backup_dir):
-            os.makedirs(backup_dir)
-        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        backup_path = os.path.join(backup_dir, f"{os.path.basename(db_name)}_{timestamp}.bak")
-        try:
-            copyfile(db_name, backup_path)
-            logging.info(f"Database backed up to {backup_path}")
-        except Exception as e:
-            logging.exception("Database backup failed")
+    def backup_retention(self):
+        retention = dict(DEFAULT_RETENTION)
+        retention.update(load_settings().get("backup_retention", {}))
+        return retention
 
-    def merge_duplicates(self):
-        self.cursor.execute(
-            "SELECT LOWER(TRIM(headword)) as norm_headword, COUNT(*) as cnt FROM Entry GROUP BY norm_headword HAVING cnt > 1"
+    def backup_database(self, force=False):
+        """Queue a low-priority backup of the open database; returns the Job or None.
+
+        Scheduled backups are skipped when nothing was written since the last one.
+        """
+        if self.conn is None or self.db_path is None:
+            return None
+        if self.backup_job is not None:
+            return None
+        # data_version, unlike the editor connection's total_changes, also moves
+        # for writes made by jobs on the queue's own connection.
+        if not force and self.data_version == self.backed_up_version:
+            return None
+        self.backed_up_version = self.data_version
+        db_path, retention = self.db_path, self.backup_retention()
+
+        def run(conn, job):
+            path = create_backup(db_path, source=conn, progress=job.report)
+            removed = prune_backups(db_path, retention)
+            logging.info("Database backed up to %s (%d old backups removed)", path, len(removed))
+            return path
+
+        job = self.start_job("backup", run, priority=PRIORITY_LOW)
+        job.succeeded.connect(lambda path: self.status_callback(
+            QCoreApplication.translate("DatabaseManager", "Backup saved: {name}")
+                .format(name=os.path.basename(path))
+        ))
+        job.failed.connect(lambda message: self.status_callback(
+            QCoreApplication.translate("DatabaseManager", "Backup failed: {error_message}")
+                .format(error_message=message)
+        ))
+        job.finished.connect(lambda: setattr(self, "backup_job", None))
+        self.backup_job = job
+        return job
+
+    def restore_database(self, parent):
+        """Let the user pick a backup and queue a write job that copies it over the open
+        database, after backing up the current state; returns the Job or None.
+        """
+        if self.conn is None:
+            return None
+        backup_file, _ = QFileDialog.getOpenFileName(
+            parent,
+            QCoreApplication.translate("DatabaseManager", "Restore Backup"),
+            backup_dir(self.db_path),
+            QCoreApplication.translate("DatabaseManager", "Backup files (*.bak);;All files (*.*)")
         )
-        duplicates = self.cursor.fetchall()
-        for norm_headword, count in duplicates:
-            self.cursor.execute(
-                "SELECT id, headword FROM Entry WHERE LOWER(TRIM(headword)) = ? ORDER BY id ASC",
-                (norm_headword,)
+        if not backup_file:
+            return None
+        reply = QMessageBox.question(
+            parent,
+            QCoreApplication.translate("DatabaseManager", "Confirm Restore"),
+            QCoreApplication.translate(
+                "DatabaseManager",
+                "Replace the current dictionary with {name}? A backup of the current state is made first."
+            ).format(name=os.path.basename(backup_file)),
+            QMessageBox.Yes | QMessageBox.No,
+            QMessageBox.No
+        )
+        if reply != QMessageBox.Yes:
+            return None
+        # Exports, backups and searches of the state being replaced are pointless now.
+        self.jobs.cancel_all()
+        self.jobs.wait()
+        db_path = self.db_path
+
+        def run(conn, job):
+            create_backup(db_path, source=conn, progress=job.report)
+            restore_backup(backup_file, conn)
+            # The backup may predate the current schema.
+            return migrate(conn)
+
+        def on_succeeded(applied):
+            self.backed_up_version = self.data_version
+            self.status_callback(
+                QCoreApplication.translate("DatabaseManager", "Restored: {name}")
+                    .format(name=os.path.basename(backup_file))
             )
-            entries = self.cursor.fetchall()
-            if entries:
-                master_id = entries[0][0]
-                for duplicate in entries[1:]:
-                    duplicate_id = duplicate[0]
-                    self.cursor.execute(
-                        "UPDATE Senses SET entry_id = ? WHERE entry_id = ?",
-                        (master_id, duplicate_id)
-                    )
-                    self.cursor.execute(
-                        "DELETE FROM Entry WHERE id = ?",
-                        (duplicate_id,)
-                    )
-        self.conn.commit()
 
-    def delete_duplicates(self):
-        self.cursor.execute(
-            "SELECT LOWER(TRIM(headword)) as norm_headword, COUNT(*) as cnt FROM Entry GROUP BY norm_headword HAVING cnt > 1"
-        )
-        duplicates = self.cursor.fetchall()
-        for norm_headword, count in duplicates:
-            self.cursor.execute(
-                "SELECT id, headword FROM Entry WHERE LOWER(TRIM(headword)) = ? ORDER BY id ASC",
-                (norm_headword,)
+        def on_failed(message):
+            QMessageBox.critical(
+                parent,
+                QCoreApplication.translate("DatabaseManager", "Error"),
+                QCoreApplication.translate("DatabaseManager", "Restore failed: {error_message}")
+                    .format(error_message=message)
             )
-            entries = self.cursor.fetchall()
-            if entries:
-                master_id = entries[0][0]
-                for duplicate in entries[1:]:
-                    duplicate_id = duplicate[0]
-                    self.cursor.execute(
-                        "DELETE FROM Senses WHERE entry_id = ?",
-                        (duplicate_id,)
-                    )
-                    self.cursor.execute(
-                        "DELETE FROM Entry WHERE id = ?",
-                        (duplicate_id,)
-                    )
-        self.conn.commit()
+
+        job = self.start_job("restore backup", run, write=True, priority=PRIORITY_HIGH)
+        job.succeeded.connect(on_succeeded)
+        job.failed.connect(on_failed)
+        return job
+
+    def find_duplicates(self):
+        """Queue a read job whose result is list_duplicates(); it jumps ahead of exports and backups."""
+        return self.start_job("find duplicates", lambda conn, job: list_duplicates(conn),
+                              priority=PRIORITY_HIGH)
+
+    def merge_duplicates(self):
+        """Queue a write job that moves the senses of every duplicate onto the oldest entry with
+        the same key and drops the rest; its result is the summary of remove_duplicates.
+        """
+        return self.start_job("merge duplicates",
+                              lambda conn, job: remove_duplicates(conn, True, job.report), write=True)
+
+    def delete_duplicates(self):
+        """Queue a write job that keeps only the oldest entry of every duplicate group."""
+        return self.start_job("delete duplicates",
+                              lambda conn, job: remove_duplicates(conn, False, job.report), write=True)
@@ -0,0 +1,127 @@
+import sqlite3
+import threading
+import logging
+from contextlib import contextmanager
+
+# Connection tuning applied by DatabaseManager.connect_db. Both profiles keep the
+# database in WAL mode so readers never block on the editor's commits; the bulk
+# profile trades memory for speed and defers checkpoints until the import is done.
+PROFILES = {
+    "editing": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -16000,          # KiB, i.e. ~16 MB of page cache
+        "temp_store": "MEMORY",
+        "mmap_size": 256 * 1024 * 1024,
+        "busy_timeout": 5000,
+        "wal_autocheckpoint": 1000,
+    },
+    "bulk_import": {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "cache_size": -256000,
+        "temp_store": "MEMORY",
+        "mmap_size": 1024 * 1024 * 1024,
+        "busy_timeout": 30000,
+        "wal_autocheckpoint": 0,
+    },
+}
+
+DEFAULT_PROFILE = "editing"
+
+
+_PRAGMAS = ("journal_mode", "synchronous", "cache_size", "temp_store", "mmap_size", "busy_timeout",
+            "wal_autocheckpoint")
+
+
+def _apply_settings(conn, settings):
+    # journal_mode and synchronous cannot change inside an open transaction;
+    # they are picked up again the next time the profile is applied.
+    if not conn.in_transaction:
+        journal_mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+        if journal_mode.upper() != str(settings["journal_mode"]).upper():
+            conn.execute(f"PRAGMA journal_mode = {settings['journal_mode']}")
+        conn.execute(f"PRAGMA synchronous = {settings['synchronous']}")
+    for pragma in _PRAGMAS[2:]:
+        conn.execute(f"PRAGMA {pragma} = {settings[pragma]}")
+
+
+def apply_profile(conn, name):
+    _apply_settings(conn, PROFILES.get(name, PROFILES[DEFAULT_PROFILE]))
+
+
+def current_settings(conn):
+    """The connection's values of the pragmas a profile sets, to hand back to using_profile."""
+    return {pragma: conn.execute(f"PRAGMA {pragma}").fetchone()[0] for pragma in _PRAGMAS}
+
+
+@contextmanager
+def using_profile(conn, name, restore=None):
+    """Apply profile name for the duration of a block, then switch to the profile
+    restore, or by default back to the settings conn had before.
+    """
+    previous = current_settings(conn) if restore is None else PROFILES.get(restore, PROFILES[DEFAULT_PROFILE])
+    apply_profile(conn, name)
+    try:
+        yield
+    finally:
+        _apply_settings(conn, previous)
+        if (PROFILES[name]["wal_autocheckpoint"] == 0 and previous["wal_autocheckpoint"] != 0
+                and not conn.in_transaction):
+            conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+
+
+class IdleCheckpointer:
+    """Checkpoints the WAL from a background thread once writes have gone quiet.
+
+    The thread keeps its own connection and watches PRAGMA data_version, which
+    changes whenever another connection commits, so no write path has to notify it.
+    """
+
+    def __init__(self, db_path, idle_seconds=10, poll_seconds=2, mode="PASSIVE"):
+        self.db_path = db_path
+        self.idle_seconds = idle_seconds
+        self.poll_seconds = poll_seconds
+        self.mode = mode
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="wal-checkpoint", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.poll_seconds + 1)
+            self._thread = None
+
+    def _run(self):
+        try:
+            conn = sqlite3.connect(self.db_path)
+            conn.execute("PRAGMA busy_timeout = 1000")
+        except sqlite3.Error:
+            logging.exception("Checkpoint thread could not open %s", self.db_path)
+            return
+        last_version = conn.execute("PRAGMA data_version").fetchone()[0]
+        quiet_for = 0
+        dirty = False
+        try:
+            while not self._stop.wait(self.poll_seconds):
+                version = conn.execute("PRAGMA data_version").fetchone()[0]
+                if version != last_version:
+                    last_version = version
+                    dirty = True
+                    quiet_for = 0
+                    continue
+                quiet_for += self.poll_seconds
+                if dirty and quiet_for >= self.idle_seconds:
+                    busy, wal_pages, moved = conn.execute(
+                        f"PRAGMA wal_checkpoint({self.mode})").fetchone()
+                    logging.debug("WAL checkpoint: busy=%s wal=%s moved=%s", busy, wal_pages, moved)
+                    dirty = bool(busy)
+        except sqlite3.Error:
+            logging.exception("WAL checkpoint failed")
+        finally:
+            conn.close()
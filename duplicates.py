@@ -1,4 +1,5 @@
-from PyQt5.QtWidgets import QDialog, QVBoxLayout, QTextEdit, QPushButton, QMessageBox, QHBoxLayout
+from PyQt5.QtCore import Qt
+from PyQt5.QtWidgets import QDialog, QVBoxLayout, QTextEdit, QPushButton, QMessageBox, QHBoxLayout, QProgressDialog
 
 class DuplicatesWindow(QDialog):
     def __init__(self, duplicates_text, parent=None):
@@ -28,6 +29,29 @@ class DuplicatesWindow(QDialog):
 
         layout.addLayout(buttons_layout)
 
+    def run_job(self, job, label, done_title, done_message, failed_message):
+        """Follow a duplicates job from db_manager with a progress dialog and report its summary."""
+        progress = QProgressDialog(label, self.tr("Cancel"), 0, 1, self)
+        progress.setWindowModality(Qt.WindowModal)
+        progress.setMinimumDuration(0)
+        progress.setValue(0)
+        progress.canceled.connect(job.cancel)
+
+        def update(step, steps, text):
+            progress.setMaximum(steps)
+            progress.setValue(step)
+
+        def on_succeeded(summary):
+            QMessageBox.information(self, done_title, done_message.format(**summary))
+            self.close()
+
+        job.progress.connect(update)
+        job.finished.connect(progress.close)
+        job.succeeded.connect(on_succeeded)
+        job.failed.connect(lambda message: QMessageBox.critical(
+            self, self.tr("Error"), failed_message.format(error_message=message)
+        ))
+
     def merge_duplicates(self):
         reply = QMessageBox.question(
             self,
@@ -38,22 +62,14 @@ class DuplicatesWindow(QDialog):
         )
         if reply == QMessageBox.Yes:
             if hasattr(self.parent(), 'db_manager'):
-                try:
-                    self.parent().db_manager.merge_duplicates()
-                    if hasattr(self.parent(), 'populate_headwords'):
-                        self.parent().populate_headwords()
-                    QMessageBox.information(
-                        self,
-                        self.tr("Merge Completed"),
-                        self.tr("Duplicate entries have been merged successfully.")
-                    )
-                    self.close()
-                except Exception as e:
-                    QMessageBox.critical(
-                        self,
-                        self.tr("Error"),
-                        self.tr("An error occurred while merging duplicates:\n{error_message}").format(error_message=e)
-                    )
+                self.run_job(
+                    self.parent().db_manager.merge_duplicates(),
+                    self.tr("Merging duplicates..."),
+                    self.tr("Merge Completed"),
+                    self.tr("Duplicate entries have been merged successfully.") + "\n\n" +
+                    self.tr("{entries} duplicate entries were merged into {groups} headwords and {senses} senses were moved."),
+                    self.tr("An error occurred while merging duplicates:\n{error_message}")
+                )
             else:
                 QMessageBox.critical(
                     self,
@@ -71,22 +87,14 @@ class DuplicatesWindow(QDialog):
         )
         if reply == QMessageBox.Yes:
             if hasattr(self.parent(), 'db_manager'):
-                try:
-                    self.parent().db_manager.delete_duplicates()
-                    if hasattr(self.parent(), 'populate_headwords'):
-                        self.parent().populate_headwords()
-                    QMessageBox.information(
-                        self,
-                        self.tr("Deletion Completed"),
-                        self.tr("Duplicate entries have been deleted successfully.")
-                    )
-                    self.close()
-                except Exception as e:
-                    QMessageBox.critical(
-                        self,
-                        self.tr("Error"),
-                        self.tr("An error occurred while deleting duplicates:\n{error_message}").format(error_message=e)
-                    )
+                self.run_job(
+                    self.parent().db_manager.delete_duplicates(),
+                    self.tr("Deleting duplicates..."),
+                    self.tr("Deletion Completed"),
+                    self.tr("Duplicate entries have been deleted successfully.") + "\n\n" +
+                    self.tr("{entries} duplicate entries of {groups} headwords were deleted along with {senses} senses."),
+                    self.tr("An error occurred while deleting duplicates:\n{error_message}")
+                )
             else:
                 QMessageBox.critical(
                     self,
@@ -0,0 +1,118 @@
+import json
+import sqlite3
+import logging
+from collections import OrderedDict
+from pathlib import Path
+from PyQt5.QtCore import QObject, pyqtSignal, pyqtSlot
+
+# One row per entry with its meanings as a JSON array, in the order they were added.
+ENTRY_QUERY = '''
+    SELECT Entry.id, Entry.headword, Entry.variation, Entry.part_of_speech, Entry.notes,
+           (SELECT json_group_array(meaning)
+            FROM (SELECT meaning FROM Senses WHERE entry_id = Entry.id ORDER BY id))
+    FROM Entry WHERE Entry.id IN ({ids})'''
+
+# Stay well below SQLite's limit on host parameters.
+_IDS_PER_QUERY = 500
+
+
+def load_entries(conn, entry_ids):
+    """Return {entry_id: data} for the given ids, one query per 500 ids.
+
+    data uses the keys save_entry builds: headword, variation, pos, notes and
+    meanings. Ids that do not exist are left out.
+    """
+    entry_ids = list(entry_ids)
+    entries = {}
+    for start in range(0, len(entry_ids), _IDS_PER_QUERY):
+        chunk = entry_ids[start:start + _IDS_PER_QUERY]
+        rows = conn.execute(ENTRY_QUERY.format(ids=",".join("?" * len(chunk))), chunk)
+        for entry_id, headword, variation, pos, notes, meanings in rows:
+            entries[entry_id] = {
+                'headword': headword,
+                'variation': variation,
+                'pos': pos,
+                'notes': notes,
+                'meanings': json.loads(meanings),
+            }
+    return entries
+
+
+class EntryCache:
+    """LRU cache of loaded entries, bounded to max_entries.
+
+    The owner discards ids when the change events report a write and clears
+    the cache on a reset, so cached entries always match the database.
+    """
+
+    def __init__(self, max_entries=2000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+
+    def __contains__(self, entry_id):
+        return entry_id in self._entries
+
+    def get(self, entry_id):
+        data = self._entries.get(entry_id)
+        if data is not None:
+            self._entries.move_to_end(entry_id)
+        return data
+
+    def update(self, entries):
+        for entry_id, data in entries.items():
+            self._entries[entry_id] = data
+            self._entries.move_to_end(entry_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def discard(self, entry_ids):
+        for entry_id in entry_ids:
+            self._entries.pop(entry_id, None)
+
+    def clear(self):
+        self._entries.clear()
+
+
+class PrefetchRequest:
+    def __init__(self, db_path, data_version, entry_ids):
+        self.db_path = db_path
+        self.data_version = data_version     # DatabaseManager.data_version when requested
+        self.entry_ids = entry_ids
+
+
+class PrefetchWorker(QObject):
+    """Loads entries near the selection on its own thread and read connection.
+
+    Results carry the data version of their request; the receiver drops them
+    if a write happened since, as they may predate it.
+    """
+
+    loaded = pyqtSignal(int, object)      # data version, {entry_id: data}
+
+    def __init__(self):
+        super().__init__()
+        self._conn = None
+        self._db_path = None
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _connection(self, db_path):
+        if self._conn is None or self._db_path != db_path:
+            self.close()
+            # check_same_thread=False only so close() can run once the thread has stopped.
+            self._conn = sqlite3.connect(Path(db_path).as_uri() + "?mode=ro", uri=True,
+                                         check_same_thread=False)
+            self._db_path = db_path
+        return self._conn
+
+    @pyqtSlot(object)
+    def run(self, request):
+        try:
+            entries = load_entries(self._connection(request.db_path), request.entry_ids)
+        except sqlite3.Error:
+            logging.exception("Prefetching entries failed")
+            return
+        self.loaded.emit(request.data_version, entries)
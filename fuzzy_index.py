@@ -0,0 +1,298 @@
+import re
+import sqlite3
+import logging
+import threading
+import unicodedata
+
+# Postings are entry_id << 2 | field, with fields headword=0, variation=1,
+# part_of_speech=2 and meaning=3.
+FIELDS_BY_CRITERION = {
+    "all": (0, 1, 2, 3),
+    "headword": (0,),
+    "variation": (1,),
+    "part_of_speech": (2,),
+    "meaning": (3,),
+}
+
+_WORD_RE = re.compile(r"\w+")
+# Meaning words shorter than this are too common to be useful fuzzy targets.
+MIN_MEANING_WORD = 3
+
+
+def normalize(text):
+    return " ".join(unicodedata.normalize("NFKC", text or "").casefold().split())
+
+
+def edit_distance(a, b, limit):
+    """Optimal-string-alignment distance between a and b, or limit + 1 once it exceeds limit."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        row_min = i
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (previous2 is not None and j > 1 and a[i - 1] == b[j - 2]
+                    and a[i - 2] == b[j - 1]):
+                value = min(value, previous2[j - 2] + 1)
+            current[j] = value
+            row_min = min(row_min, value)
+        if row_min > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+class FuzzyIndex:
+    """SymSpell-style deletion index over headwords, variations, parts of speech and meaning words.
+
+    Every indexed term is stored under all strings obtained by deleting up to
+    max_distance characters from its first prefix_length characters. A query
+    generates the same deletions of itself, so candidates come from a handful
+    of dict lookups instead of a pass over every row; the candidates are then
+    verified with a real edit distance.
+    """
+
+    def __init__(self, max_distance=2, prefix_length=6):
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+        self._lock = threading.RLock()
+        self._ready = threading.Event()
+        self._ready.set()
+        self._pending = None
+        self._generation = 0     # of the latest build_async(); older builds are discarded
+        self._clear()
+
+    def _clear(self):
+        self._postings = {}      # term -> set of postings
+        self._deletes = {}       # deletion -> term, or set of terms when shared
+        self._entry_terms = {}   # entry_id -> [(term, posting)]
+        self._headwords = {}     # entry_id -> headword, for ranking ties
+
+    def _deletions(self, term, depth=None):
+        key = term[:self.prefix_length]
+        found = {key}
+        frontier = found
+        for _ in range(self.max_distance if depth is None else depth):
+            frontier = {word[:i] + word[i + 1:]
+                        for word in frontier if len(word) > 1
+                        for i in range(len(word))}
+            found |= frontier
+        return found
+
+    def _add_term(self, term, posting):
+        postings = self._postings.get(term)
+        if postings is not None:
+            postings.add(posting)
+            return
+        self._postings[term] = {posting}
+        deletes = self._deletes
+        for deletion in self._deletions(term):
+            existing = deletes.get(deletion)
+            if existing is None:
+                deletes[deletion] = term
+            elif existing.__class__ is set:
+                existing.add(term)
+            elif existing != term:
+                deletes[deletion] = {existing, term}
+
+    def _remove_term(self, term, posting):
+        postings = self._postings.get(term)
+        if postings is None:
+            return
+        postings.discard(posting)
+        if postings:
+            return
+        del self._postings[term]
+        for deletion in self._deletions(term):
+            existing = self._deletes.get(deletion)
+            if isinstance(existing, set):
+                existing.discard(term)
+                if len(existing) == 1:
+                    self._deletes[deletion] = existing.pop()
+            elif existing == term:
+                del self._deletes[deletion]
+
+    def _index_entry(self, entry_id, headword, variation, part_of_speech, meanings):
+        terms = []
+        for field, value in ((0, headword), (1, variation), (2, part_of_speech)):
+            term = normalize(value)
+            if term:
+                terms.append((term, entry_id << 2 | field))
+        words = {w for meaning in meanings for w in _WORD_RE.findall(normalize(meaning))}
+        for word in words:
+            if len(word) < MIN_MEANING_WORD:
+                continue
+            terms.append((word, entry_id << 2 | 3))
+        for term, posting in terms:
+            self._add_term(term, posting)
+        self._entry_terms[entry_id] = terms
+        self._headwords[entry_id] = headword or ""
+
+    def _unindex_entry(self, entry_id):
+        for term, posting in self._entry_terms.pop(entry_id, ()):
+            self._remove_term(term, posting)
+        self._headwords.pop(entry_id, None)
+
+    def _load_entries(self, conn, entry_ids=None):
+        where = ""
+        params = ()
+        if entry_ids is not None:
+            where = "WHERE Entry.id IN (%s)" % ",".join("?" * len(entry_ids))
+            params = tuple(entry_ids)
+        cursor = conn.execute(f'''
+            SELECT Entry.id, Entry.headword, Entry.variation, Entry.part_of_speech, Senses.meaning
+            FROM Entry LEFT JOIN Senses ON Senses.entry_id = Entry.id
+            {where} ORDER BY Entry.id''', params)
+        current = None
+        meanings = []
+        for entry_id, headword, variation, part_of_speech, meaning in cursor:
+            if current is None or current[0] != entry_id:
+                if current is not None:
+                    self._index_entry(*current, meanings)
+                current = (entry_id, headword, variation, part_of_speech)
+                meanings = []
+            if meaning:
+                meanings.append(meaning)
+        if current is not None:
+            self._index_entry(*current, meanings)
+
+    def build(self, conn):
+        with self._lock:
+            self._clear()
+            self._load_entries(conn)
+
+    def is_ready(self):
+        return self._ready.is_set()
+
+    def build_async(self, db_path):
+        """Rebuild from db_path on a background thread; search() waits for it.
+
+        A call while an earlier build is still running supersedes it: only the
+        latest build is swapped in, and the updates queued since the first of
+        them are replayed on top of it.
+        """
+        with self._lock:
+            self._generation += 1
+            self._ready.clear()
+            if self._pending is None:
+                self._pending = set()
+            generation = self._generation
+        threading.Thread(target=self._build_from_path, args=(db_path, generation),
+                         name="fuzzy-index", daemon=True).start()
+
+    def _build_from_path(self, db_path, generation):
+        try:
+            conn = sqlite3.connect(db_path)
+            try:
+                fresh = FuzzyIndex(self.max_distance, self.prefix_length)
+                fresh.build(conn)
+                with self._lock:
+                    if generation != self._generation:
+                        return
+                    self._postings = fresh._postings
+                    self._deletes = fresh._deletes
+                    self._entry_terms = fresh._entry_terms
+                    self._headwords = fresh._headwords
+                    pending, self._pending = self._pending, None
+                    if pending:
+                        self.refresh_entries(conn, pending)
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            logging.exception("Building the fuzzy index failed")
+        finally:
+            with self._lock:
+                if generation == self._generation:
+                    self._pending = None
+                    self._ready.set()
+
+    def refresh_entries(self, conn, entry_ids):
+        """Re-read the given entries from conn; ids that no longer exist are dropped."""
+        entry_ids = list(entry_ids)
+        if not entry_ids:
+            return
+        with self._lock:
+            if self._pending is not None:
+                self._pending.update(entry_ids)
+                return
+            for entry_id in entry_ids:
+                self._unindex_entry(entry_id)
+            for start in range(0, len(entry_ids), 500):
+                self._load_entries(conn, entry_ids[start:start + 500])
+
+    def remove_entries(self, entry_ids):
+        with self._lock:
+            if self._pending is not None:
+                self._pending.update(entry_ids)
+                return
+            for entry_id in entry_ids:
+                self._unindex_entry(entry_id)
+
+    def _candidate_terms(self, term, max_distance):
+        candidates = set()
+        for deletion in self._deletions(term, max_distance):
+            found = self._deletes.get(deletion)
+            if found is None:
+                continue
+            if isinstance(found, set):
+                candidates |= found
+            else:
+                candidates.add(found)
+        return candidates
+
+    def _match_word(self, word, fields, max_distance):
+        best = {}
+        for candidate in self._candidate_terms(word, max_distance):
+            distance = edit_distance(word, candidate, max_distance)
+            if distance > max_distance:
+                continue
+            for posting in self._postings.get(candidate, ()):
+                if posting & 3 in fields:
+                    entry_id = posting >> 2
+                    if distance < best.get(entry_id, max_distance + 1):
+                        best[entry_id] = distance
+        return best
+
+    def search(self, term, criterion="all", max_distance=None, limit=200):
+        """Return up to limit (entry_id, headword, distance) tuples, closest first.
+
+        Whole field values are matched for headword, variation and part of
+        speech; for meanings every word of the term has to match some word of
+        the entry's meanings and the distances are summed.
+        """
+        term = normalize(term)
+        if not term:
+            return []
+        if max_distance is None:
+            max_distance = self.max_distance
+        # Short terms would match almost anything at the full distance.
+        max_distance = min(max_distance, self.max_distance, max(1, len(term) // 3))
+        fields = FIELDS_BY_CRITERION.get(criterion, FIELDS_BY_CRITERION["all"])
+        self._ready.wait()
+        with self._lock:
+            best = {}
+            field_codes = set(fields) - {3}
+            if field_codes:
+                best = self._match_word(term, field_codes, max_distance)
+            if 3 in fields:
+                words = [w for w in _WORD_RE.findall(term) if len(w) >= MIN_MEANING_WORD]
+                meaning_hits = None
+                for word in words:
+                    word_limit = min(max_distance, max(1, len(word) // 3))
+                    hits = self._match_word(word, {3}, word_limit)
+                    if meaning_hits is None:
+                        meaning_hits = hits
+                    else:
+                        meaning_hits = {entry_id: meaning_hits[entry_id] + distance
+                                        for entry_id, distance in hits.items()
+                                        if entry_id in meaning_hits}
+                for entry_id, distance in (meaning_hits or {}).items():
+                    if distance < best.get(entry_id, distance + 1):
+                        best[entry_id] = distance
+            ranked = sorted(best.items(), key=lambda item: (item[1], self._headwords.get(item[0], "")))
+            return [(entry_id, self._headwords.get(entry_id, ""), distance)
+                    for entry_id, distance in ranked[:limit]]
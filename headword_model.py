@@ -0,0 +1,226 @@
+import bisect
+
+from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex
+
+
+def _sort_key(row):
+    # The (headword, id) order of the query, with NULL headwords first as in SQLite.
+    entry_id, headword = row[0], row[1]
+    return (headword is not None, headword or "", entry_id)
+
+
+class HeadwordListModel(QAbstractListModel):
+    """Headword list backed directly by SQLite.
+
+    In query mode rows are pulled a page at a time with keyset pagination on
+    (headword, id), which idx_entry_headword serves without sorting, so the
+    view only ever holds the pages the user has scrolled through. Search
+    results are shown in list mode via set_rows().
+
+    update_ids() and remove_ids() patch the rows in place after writes, so the
+    view keeps its scroll position and selection; in query mode each changed
+    row is found and placed by bisection.
+    """
+
+    BATCH_SIZE = 500
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._conn = None
+        self._rows = []          # (entry_id, headword, tooltip)
+        self._where = ""
+        self._params = ()
+        self._last_key = None
+        self._exhausted = True
+        self._query_mode = False
+        self._headwords = {}     # entry_id -> headword of the loaded rows, in query mode
+        self._keys = []          # _sort_key of each row, in query mode
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= len(self._rows):
+            return None
+        entry_id, headword, tooltip = self._rows[index.row()]
+        if role == Qt.DisplayRole:
+            return headword
+        if role == Qt.UserRole:
+            return entry_id
+        if role == Qt.ToolTipRole:
+            return tooltip
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self._exhausted
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self._exhausted or self._conn is None:
+            return
+        conditions = [self._where] if self._where else []
+        conditions.append("(headword, id) > (?, ?)")
+        rows = self._conn.execute(
+            f"SELECT id, headword FROM Entry WHERE {' AND '.join(conditions)} "
+            f"ORDER BY headword, id LIMIT {self.BATCH_SIZE}",
+            tuple(self._params) + self._last_key
+        ).fetchall()
+        if len(rows) < self.BATCH_SIZE:
+            self._exhausted = True
+        if not rows:
+            return
+        self._last_key = (rows[-1][1], rows[-1][0])
+        first = len(self._rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+        self._rows.extend((entry_id, headword, None) for entry_id, headword in rows)
+        self._keys.extend(_sort_key(row) for row in rows)
+        self._headwords.update(rows)
+        self.endInsertRows()
+
+    def set_query(self, conn, where="", params=()):
+        """Show every Entry row matching the optional where clause, in headword order."""
+        self.beginResetModel()
+        self._conn = conn
+        self._where = where
+        self._params = params
+        self._query_mode = True
+        # Keyset pagination cannot step over NULL headwords, which sort first;
+        # they are rare (only written by other tools), so load them up front.
+        self._rows = []
+        if conn is not None:
+            conditions = [where] if where else []
+            conditions.append("headword IS NULL")
+            self._rows = [(entry_id, headword, None) for entry_id, headword in conn.execute(
+                f"SELECT id, headword FROM Entry WHERE {' AND '.join(conditions)} ORDER BY id",
+                tuple(params))]
+        self._headwords = {entry_id: headword for entry_id, headword, _ in self._rows}
+        self._keys = [_sort_key(row) for row in self._rows]
+        self._last_key = ("", -1)
+        self._exhausted = conn is None
+        self.endResetModel()
+        self.fetchMore()
+
+    def set_rows(self, rows):
+        """Show a fixed list of (entry_id, headword, tooltip) rows, e.g. search results."""
+        self.beginResetModel()
+        self._rows = list(rows)
+        self._exhausted = True
+        self._query_mode = False
+        self._headwords = {}
+        self._keys = []
+        self.endResetModel()
+
+    def clear(self):
+        self.set_rows([])
+
+    def append_rows(self, rows):
+        """Add rows to the end of a result list as they arrive."""
+        if not rows:
+            return
+        first = len(self._rows)
+        self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+        self._rows.extend(rows)
+        self.endInsertRows()
+
+    def _query_row(self, entry_id):
+        # Position of a loaded row in query mode, or None.
+        if entry_id not in self._headwords:
+            return None
+        key = _sort_key((entry_id, self._headwords[entry_id]))
+        row = bisect.bisect_left(self._keys, key)
+        if row < len(self._rows) and self._rows[row][0] == entry_id:
+            return row
+        return None
+
+    def _remove_row(self, row):
+        self.beginRemoveRows(QModelIndex(), row, row)
+        entry_id = self._rows.pop(row)[0]
+        del self._keys[row]
+        self._headwords.pop(entry_id, None)
+        self.endRemoveRows()
+
+    def remove_ids(self, entry_ids):
+        if self._query_mode:
+            for entry_id in entry_ids:
+                row = self._query_row(entry_id)
+                if row is not None:
+                    self._remove_row(row)
+            return
+        entry_ids = set(entry_ids)
+        # Walk backwards so earlier row numbers stay valid while removing.
+        row = len(self._rows) - 1
+        while row >= 0:
+            if self._rows[row][0] not in entry_ids:
+                row -= 1
+                continue
+            end = row
+            while row - 1 >= 0 and self._rows[row - 1][0] in entry_ids:
+                row -= 1
+            self.beginRemoveRows(QModelIndex(), row, end)
+            del self._rows[row:end + 1]
+            self.endRemoveRows()
+            row -= 1
+
+    def update_ids(self, entry_ids):
+        """Reflect inserted or changed entries without reloading.
+
+        In query mode a changed row moves to its new sorted position, or leaves
+        if it no longer matches the query; new rows are placed only if they sort
+        within the pages already loaded, since later ones arrive with fetchMore().
+        Entries that no longer exist are removed.
+        In list mode (search results) only the headwords of listed rows change.
+        """
+        if self._conn is None or not entry_ids:
+            return
+        entry_ids = list(entry_ids)
+        conditions = [f"id IN ({','.join('?' * len(entry_ids))})"]
+        params = tuple(entry_ids)
+        if self._query_mode and self._where:
+            conditions.append(f"({self._where})")
+            params += tuple(self._params)
+        current = dict(self._conn.execute(
+            f"SELECT id, headword FROM Entry WHERE {' AND '.join(conditions)}", params))
+        if not self._query_mode:
+            for row, (entry_id, _, tooltip) in enumerate(self._rows):
+                if entry_id in current:
+                    self._rows[row] = (entry_id, current[entry_id], tooltip)
+                    index = self.index(row)
+                    self.dataChanged.emit(index, index, [Qt.DisplayRole])
+            return
+        last_key = _sort_key((self._last_key[1], self._last_key[0]))
+        for entry_id in entry_ids:
+            old_row = self._query_row(entry_id)
+            if entry_id not in current:
+                if old_row is not None:
+                    self._remove_row(old_row)
+                continue
+            row = (entry_id, current[entry_id], None)
+            key = _sort_key(row)
+            if not self._exhausted and key > last_key:
+                # Now sorts past the loaded pages; fetchMore() brings it back.
+                if old_row is not None:
+                    self._remove_row(old_row)
+                continue
+            if old_row is None:
+                position = bisect.bisect_left(self._keys, key)
+                self.beginInsertRows(QModelIndex(), position, position)
+                self._rows.insert(position, row)
+                self._keys.insert(position, key)
+                self._headwords[entry_id] = row[1]
+                self.endInsertRows()
+                continue
+            # Move the row rather than remove and insert it, so the view's
+            # selection and current index follow it.
+            del self._rows[old_row]
+            del self._keys[old_row]
+            position = bisect.bisect_left(self._keys, key)
+            self._rows.insert(old_row, row)
+            self._keys.insert(old_row, key)
+            self._headwords[entry_id] = row[1]
+            if position != old_row:
+                destination = position + 1 if position > old_row else position
+                self.beginMoveRows(QModelIndex(), old_row, old_row, QModelIndex(), destination)
+                self._rows.insert(position, self._rows.pop(old_row))
+                self._keys.insert(position, self._keys.pop(old_row))
+                self.endMoveRows()
+            index = self.index(position)
+            self.dataChanged.emit(index, index, [Qt.DisplayRole])
@@ -1,89 +1,252 @@
-import json, csv, os, logging
-from PyQt5.QtCore import QCoreApplication
-from PyQt5.QtWidgets import QMessageBox, QFileDialog
+import io, os, time, logging
+from functools import partial
+from PyQt5.QtCore import Qt, QCoreApplication
+from PyQt5.QtWidgets import QMessageBox, QFileDialog, QProgressDialog, QInputDialog
+
+from bulk_import import (import_csv_file, import_json_file, import_jsonl_file, IMPORT_POLICIES, IMPORT_APPEND,
+                         IMPORT_SKIP, IMPORT_REPLACE, IMPORT_MERGE, apply_delta_file)
+from bulk_export import export_csv_file, export_json_file, export_jsonl_file, export_delta_file
+from migrations import last_change
+from lookup_file import export_lookup_file, LOOKUP_EXTENSION
+from parallel_import import import_csv_parallel, import_jsonl_parallel, default_workers, PARALLEL_MIN_BYTES
+from compressed_io import open_input, open_output, compression_for, DEFAULT_LEVEL
+from settings import load_settings, save_settings
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def export_job(path, export_function, compression_level=DEFAULT_LEVEL, binary=False, **options):
+    """Return a read job function that runs an exporter from bulk_export into path.
+
+    The file is written next to the target as path + ".part" and only renamed
+    into place once the export is complete, so cancelling never leaves a
+    truncated file behind. A path ending in .gz or .xz is compressed at
+    compression_level. Binary exporters get the plain file, uncompressed,
+    instead of a text stream. The job's result is (entries, seconds, bytes).
+    """
+    def run(conn, job):
+        start = time.perf_counter()
+        part_path = path + ".part"
+        try:
+            if binary:
+                f = open(part_path, "wb")
+            else:
+                f = io.TextIOWrapper(open_output(part_path, compression_for(path), compression_level),
+                                     newline='', encoding='utf-8')
+            with f:
+                count = export_function(conn, f, job.report, **options)
+            os.replace(part_path, path)
+        except BaseException:
+            _remove(part_path)
+            raise
+        return count, time.perf_counter() - start, os.path.getsize(path)
+    return run
+
+
+def import_workers(path):
+    """Parser processes for importing path: the "import_workers" setting, or one per
+    spare core; 1, meaning no worker processes, for files too small to gain from them.
+    """
+    if os.path.getsize(path) < PARALLEL_MIN_BYTES:
+        return 1
+    return load_settings().get("import_workers") or default_workers()
+
+
+def csv_import_job(path, workers=1, policy=IMPORT_APPEND):
+    """Return a write job function that imports the CSV file at path; its result is the ImportReport.
+
+    With more than one worker the rows are parsed by that many processes.
+    .gz and .xz files are decompressed on the fly.
+    """
+    def run(conn, job):
+        total_bytes = max(os.path.getsize(path), 1)
+        csvfile, raw = open_input(path)
+        if workers <= 1:
+            csvfile = io.TextIOWrapper(csvfile, newline='', encoding='utf-8')
+        with csvfile:
+            def report_progress(report):
+                done = raw.tell() / total_bytes
+                rate = report.rows_per_second
+                eta = report.elapsed * (1 - done) / done if done > 0 else 0
+                job.report(int(done * 1000), 1000, QCoreApplication.translate(
+                    "ImportExportManager",
+                    "Imported {rows} rows ({rate} rows/s), about {eta} s left"
+                ).format(rows=report.rows, rate=int(rate), eta=int(eta)))
+
+            if workers > 1:
+                return import_csv_parallel(conn, csvfile, report_progress, workers, policy=policy)
+            return import_csv_file(conn, csvfile, report_progress, policy=policy)
+    return run
+
+
+def json_import_job(path, import_function=import_json_file, **options):
+    """Return a write job function that imports the JSON or, with import_jsonl_file, the
+    JSON Lines file at path, decompressing .gz and .xz files; its result is the ImportReport.
+
+    Other importers of binary files with the same signature work too, e.g.
+    apply_delta_file; options go to import_function.
+    """
+    def run(conn, job):
+        total_bytes = max(os.path.getsize(path), 1)
+        f, raw = open_input(path)
+        with f:
+            def report_progress(report):
+                done = raw.tell() / total_bytes
+                job.report(int(done * 1000), 1000, QCoreApplication.translate(
+                    "ImportExportManager", "Imported {rows} entries ({rate} entries/s)"
+                ).format(rows=report.rows, rate=int(report.rows_per_second)))
+
+            return import_function(conn, f, report_progress, **options)
+    return run
+
 
 class ImportExportManager:
     def __init__(self, db_manager, status_callback):
         self.db_manager = db_manager
         self.status_callback = status_callback
+        self.export_job = None
 
     def export_csv(self, parent):
         path, _ = QFileDialog.getSaveFileName(
             parent, 
             QCoreApplication.translate("ImportExportManager", "Export CSV"),
-            QCoreApplication.translate("ImportExportManager", "untitled.csv")
+            QCoreApplication.translate("ImportExportManager", "untitled.csv"),
+            QCoreApplication.translate(
+                "ImportExportManager", "CSV files (*.csv);;Compressed CSV files (*.csv.gz *.csv.xz);;All files (*.*)")
         )
         if not path:
             return
-        try:
-            self.db_manager.cursor.execute('''
-                SELECT Entry.*, GROUP_CONCAT(Senses.meaning, ';;') AS meanings 
-                FROM Entry 
-                LEFT JOIN Senses ON Entry.id = Senses.entry_id 
-                GROUP BY Entry.id
-            ''')
-            entries = self.db_manager.cursor.fetchall()
-            headers = [description[0] for description in self.db_manager.cursor.description]
-            with open(path, "w", newline='', encoding='utf-8') as csvfile:
-                writer = csv.writer(csvfile)
-                writer.writerow(headers)
-                for row in entries:
-                    writer.writerow(row)
-            self.status_callback(QCoreApplication.translate("ImportExportManager", "CSV exported successfully"))
-        except Exception as e:
-            QMessageBox.critical(
-                parent,
-                QCoreApplication.translate("ImportExportManager", "Error"),
-                QCoreApplication.translate("ImportExportManager", "CSV export failed: {error_message}").format(error_message=e)
-            )
+        self.start_export(
+            parent, path, export_csv_file,
+            QCoreApplication.translate("ImportExportManager", "Exporting CSV..."),
+            QCoreApplication.translate("ImportExportManager", "CSV exported successfully"),
+            QCoreApplication.translate("ImportExportManager", "CSV export failed: {error_message}")
+        )
 
     def export_json(self, parent):
         path, _ = QFileDialog.getSaveFileName(
             parent, 
             QCoreApplication.translate("ImportExportManager", "Export JSON"),
-            QCoreApplication.translate("ImportExportManager", "untitled.json")
+            QCoreApplication.translate("ImportExportManager", "untitled.json"),
+            QCoreApplication.translate(
+                "ImportExportManager", "JSON files (*.json);;Compressed JSON files (*.json.gz *.json.xz);;All files (*.*)")
         )
         if not path:
             return
-        try:
-            self.db_manager.cursor.execute('''
-                SELECT Entry.*, GROUP_CONCAT(Senses.meaning, ';;') AS meanings 
-                FROM Entry 
-                LEFT JOIN Senses ON Entry.id = Senses.entry_id 
-                GROUP BY Entry.id
-            ''')
-            entries = self.db_manager.cursor.fetchall()
-            headers = [description[0] for description in self.db_manager.cursor.description]
-            data = []
-            for row in entries:
-                entry_dict = dict(zip(headers, row))
-                entry_dict['meanings'] = entry_dict['meanings'].split(';;') if entry_dict['meanings'] else []
-                data.append(entry_dict)
-            with open(path, "w", encoding='utf-8') as f:
-                json.dump(data, f, indent=4, ensure_ascii=False)
-            self.status_callback(QCoreApplication.translate("ImportExportManager", "JSON exported successfully"))
-        except Exception as e:
-            QMessageBox.critical(
-                parent,
-                QCoreApplication.translate("ImportExportManager", "Error"),
-                QCoreApplication.translate("ImportExportManager", "JSON export failed: {error_message}").format(error_message=e)
-            )
+        self.start_export(
+            parent, path, export_json_file,
+            QCoreApplication.translate("ImportExportManager", "Exporting JSON..."),
+            QCoreApplication.translate("ImportExportManager", "JSON exported successfully"),
+            QCoreApplication.translate("ImportExportManager", "JSON export failed: {error_message}"),
+            compact=load_settings().get("json_export_compact", False)
+        )
 
-    def import_csv(self, parent):
-        path, _ = QFileDialog.getOpenFileName(
+    def export_jsonl(self, parent):
+        path, _ = QFileDialog.getSaveFileName(
             parent,
-            QCoreApplication.translate("ImportExportManager", "Import CSV"),
-            QCoreApplication.translate("ImportExportManager", "CSV files (*.csv);;All files (*.*)")
+            QCoreApplication.translate("ImportExportManager", "Export JSON Lines"),
+            QCoreApplication.translate("ImportExportManager", "untitled.jsonl"),
+            QCoreApplication.translate(
+                "ImportExportManager",
+                "JSON Lines files (*.jsonl);;Compressed JSON Lines files (*.jsonl.gz *.jsonl.xz);;All files (*.*)")
+        )
+        if not path:
+            return
+        self.start_export(
+            parent, path, export_jsonl_file,
+            QCoreApplication.translate("ImportExportManager", "Exporting JSON Lines..."),
+            QCoreApplication.translate("ImportExportManager", "JSON Lines exported successfully"),
+            QCoreApplication.translate("ImportExportManager", "JSON Lines export failed: {error_message}")
+        )
+
+    def export_lookup(self, parent):
+        path, _ = QFileDialog.getSaveFileName(
+            parent,
+            QCoreApplication.translate("ImportExportManager", "Export Lookup File"),
+            QCoreApplication.translate("ImportExportManager", "untitled") + LOOKUP_EXTENSION,
+            QCoreApplication.translate("ImportExportManager", "Lookup files (*{extension});;All files (*.*)")
+            .format(extension=LOOKUP_EXTENSION)
+        )
+        if not path:
+            return
+        self.start_export(
+            parent, path, export_lookup_file,
+            QCoreApplication.translate("ImportExportManager", "Exporting lookup file..."),
+            QCoreApplication.translate("ImportExportManager", "Lookup file exported successfully"),
+            QCoreApplication.translate("ImportExportManager", "Lookup file export failed: {error_message}"),
+            binary=True
+        )
+
+    def export_delta(self, parent):
+        """Export the entries changed since a change number, by default since the last delta export."""
+        if not self.check_database(parent):
+            return
+        db_path = self.db_manager.db_path
+        settings = load_settings()
+        self.db_manager.conn.commit()
+        until = last_change(self.db_manager.conn)
+        since, ok = QInputDialog.getInt(
+            parent,
+            QCoreApplication.translate("ImportExportManager", "Export Delta"),
+            QCoreApplication.translate(
+                "ImportExportManager",
+                "Export the entries changed after change number (0 exports everything; latest change: {until}):"
+            ).format(until=until),
+            min(settings.get("delta_exports", {}).get(db_path, 0), until), 0, until
+        )
+        if not ok:
+            return
+        path, _ = QFileDialog.getSaveFileName(
+            parent,
+            QCoreApplication.translate("ImportExportManager", "Export Delta"),
+            QCoreApplication.translate("ImportExportManager", "changes-{since}-{until}.jsonl")
+            .format(since=since, until=until),
+            QCoreApplication.translate(
+                "ImportExportManager",
+                "JSON Lines files (*.jsonl);;Compressed JSON Lines files (*.jsonl.gz *.jsonl.xz);;All files (*.*)")
         )
         if not path:
             return
+        job = self.start_export(
+            parent, path, export_delta_file,
+            QCoreApplication.translate("ImportExportManager", "Exporting changes..."),
+            QCoreApplication.translate("ImportExportManager", "Changes {since} to {until} exported successfully")
+            .format(since=since, until=until),
+            QCoreApplication.translate("ImportExportManager", "Delta export failed: {error_message}"),
+            since=since, until=until
+        )
+        if job is None:
+            return
 
+        def on_succeeded(result):
+            settings = load_settings()
+            settings.setdefault("delta_exports", {})[db_path] = until
+            save_settings(settings)
+
+        job.succeeded.connect(on_succeeded)
+
+    def apply_delta(self, parent):
+        path, _ = QFileDialog.getOpenFileName(
+            parent,
+            QCoreApplication.translate("ImportExportManager", "Apply Delta"),
+            "",
+            QCoreApplication.translate(
+                "ImportExportManager", "JSON Lines files (*.jsonl *.jsonl.gz *.jsonl.xz);;All files (*.*)")
+        )
+        if not path or not self.check_database(parent):
+            return
         reply = QMessageBox.question(
             parent,
-            QCoreApplication.translate("ImportExportManager", "Confirm Import"),
+            QCoreApplication.translate("ImportExportManager", "Apply Delta"),
             QCoreApplication.translate(
                 "ImportExportManager",
-                "Do you wish to import data from external file? This may create duplicates of your existing headwords."
+                "Apply the changes in this file? Entries with the same ids are replaced or deleted, "
+                "so only apply it to a copy of the dictionary it was exported from."
             ),
             QMessageBox.Yes | QMessageBox.No,
             QMessageBox.No
@@ -91,53 +254,204 @@ class ImportExportManager:
         if reply != QMessageBox.Yes:
             return
 
-        try:
-            with open(path, newline='', encoding='utf-8') as csvfile:
-                reader = csv.DictReader(csvfile)
-             
-                clean_fields = [h.strip() for h in reader.fieldnames or [] if h and h.strip()]
-                required = {'headword', 'variation', 'part_of_speech', 'notes', 'meanings'}
-                missing = required - set(clean_fields)
-                if missing:
-                    raise ValueError(f"Invalid CSV: missing columns {sorted(missing)}")
-
-                for row in reader:
-                   
-                    headword = row.get('headword', '').strip()
-                    variation = row.get('variation', '').strip()
-                    pos       = row.get('part_of_speech', '').strip()
-                    notes     = row.get('notes', '').strip()
-                    meanings  = row.get('meanings', '').strip()
-
-                  
-                    self.db_manager.cursor.execute(
-                        "INSERT INTO Entry (headword, variation, part_of_speech, notes) VALUES (?, ?, ?, ?)",
-                        (headword, variation, pos, notes)
-                    )
-                    entry_id = self.db_manager.cursor.lastrowid
-
-                
-                    if meanings:
-                        for m in meanings.split(';;'):
-                            m = m.strip()
-                            if m:
-                                self.db_manager.cursor.execute(
-                                    "INSERT INTO Senses (entry_id, meaning) VALUES (?, ?)",
-                                    (entry_id, m)
-                                )
-
-                self.db_manager.conn.commit()
-            self.status_callback(QCoreApplication.translate("ImportExportManager", "CSV imported successfully"))
-
-        except Exception as e:
+        def on_succeeded(report):
+            self.status_callback(QCoreApplication.translate(
+                "ImportExportManager",
+                "Delta applied: {entries} entries updated, {deleted} deleted"
+            ).format(entries=report.entries, deleted=report.deleted))
+            if report.errors:
+                self.show_import_errors(parent, report)
+
+        job = self.start_import(
+            parent, json_import_job(path, apply_delta_file),
+            QCoreApplication.translate("ImportExportManager", "Applying changes..."),
+            QCoreApplication.translate("ImportExportManager", "Delta cancelled"),
+            QCoreApplication.translate("ImportExportManager", "Applying the delta failed: {error_message}")
+        )
+        job.succeeded.connect(on_succeeded)
+
+    def check_database(self, parent):
+        if not self.db_manager.db_path:
+            QMessageBox.warning(
+                parent,
+                QCoreApplication.translate("ImportExportManager", "Error"),
+                QCoreApplication.translate("ImportExportManager", "No database loaded.")
+            )
+            return False
+        return True
+
+    def start_export(self, parent, path, export_function, label, done_message, failed_message, **options):
+        if self.export_job is not None:
+            self.status_callback(QCoreApplication.translate("ImportExportManager", "An export is already running"))
+            return
+        if not self.check_database(parent):
+            return
+
+        progress = QProgressDialog(label, QCoreApplication.translate("ImportExportManager", "Cancel"), 0, 1000, parent)
+        progress.setWindowModality(Qt.NonModal)
+        progress.setMinimumDuration(500)
+        level = load_settings().get("compression_level", DEFAULT_LEVEL)
+        job = self.db_manager.start_job("export", export_job(path, export_function, level, **options))
+        progress.canceled.connect(job.cancel)
+
+        def on_progress(done, total, text):
+            progress.setValue(int(done * 1000 / total) if total else 1000)
+
+        def on_succeeded(result):
+            count, seconds, size = result
+            logging.info("Exported %d entries (%.1f MB) in %.1f s", count, size / 1e6, seconds)
+            self.status_callback(done_message)
+
+        def on_failed(message):
             QMessageBox.critical(
                 parent,
                 QCoreApplication.translate("ImportExportManager", "Error"),
+                failed_message.format(error_message=message)
+            )
+
+        def on_finished():
+            progress.close()
+            self.export_job = None
+
+        job.progress.connect(on_progress)
+        job.succeeded.connect(on_succeeded)
+        job.cancelled.connect(lambda: self.status_callback(
+            QCoreApplication.translate("ImportExportManager", "Export cancelled")))
+        job.failed.connect(on_failed)
+        job.finished.connect(on_finished)
+        self.export_job = job
+        return job
+
+    def confirm_import(self, parent):
+        """Ask how to treat rows whose headword already exists; returns one of
+        IMPORT_POLICIES, or None if the import was cancelled.
+        """
+        labels = {
+            IMPORT_APPEND: QCoreApplication.translate("ImportExportManager", "Add them as new entries"),
+            IMPORT_SKIP: QCoreApplication.translate("ImportExportManager", "Skip them"),
+            IMPORT_REPLACE: QCoreApplication.translate("ImportExportManager", "Replace the existing entry"),
+            IMPORT_MERGE: QCoreApplication.translate("ImportExportManager", "Merge their senses into the existing entry"),
+        }
+        settings = load_settings()
+        policy = settings.get("import_policy", IMPORT_APPEND)
+        items = [labels[name] for name in IMPORT_POLICIES]
+        item, ok = QInputDialog.getItem(
+            parent,
+            QCoreApplication.translate("ImportExportManager", "Confirm Import"),
+            QCoreApplication.translate(
+                "ImportExportManager",
+                "Do you wish to import data from external file?\n\n"
+                "Rows whose headword already exists in the dictionary:"
+            ),
+            items,
+            IMPORT_POLICIES.index(policy) if policy in IMPORT_POLICIES else 0,
+            False
+        )
+        if not ok:
+            return None
+        policy = IMPORT_POLICIES[items.index(item)]
+        settings["import_policy"] = policy
+        save_settings(settings)
+        return policy
+
+    def import_finished(self, parent, report, message):
+        self.status_callback(message)
+        if report.policy != IMPORT_APPEND:
+            QMessageBox.information(
+                parent,
+                QCoreApplication.translate("ImportExportManager", "Import Finished"),
                 QCoreApplication.translate(
                     "ImportExportManager",
-                    "CSV import failed: {error_message}"
-                ).format(error_message=e)
+                    "New entries: {entries}\nMerged into existing entries: {merged}\n"
+                    "Replaced existing entries: {replaced}\nSkipped: {skipped}"
+                ).format(entries=report.entries, merged=report.merged,
+                         replaced=report.replaced, skipped=report.skipped)
             )
+        if report.errors:
+            self.show_import_errors(parent, report)
+
+    def start_import(self, parent, function, label, cancelled_message, failed_message):
+        """Run an import as a write job behind a window-modal progress dialog and return the Job.
+
+        The dialog keeps the user from editing meanwhile, but the window still
+        repaints and the import can be cancelled, which rolls it back.
+        """
+        progress = QProgressDialog(label, QCoreApplication.translate("ImportExportManager", "Cancel"), 0, 1000, parent)
+        progress.setWindowModality(Qt.WindowModal)
+        progress.setMinimumDuration(0)
+        progress.setValue(0)
+        job = self.db_manager.start_job("import", function, write=True, profile="bulk_import")
+        progress.canceled.connect(job.cancel)
+
+        def on_progress(done, total, text):
+            if text:
+                progress.setLabelText(text)
+            progress.setValue(int(done * 1000 / total) if total else 1000)
+
+        job.progress.connect(on_progress)
+        job.finished.connect(progress.close)
+        job.cancelled.connect(lambda: self.status_callback(cancelled_message))
+        job.failed.connect(lambda message: QMessageBox.critical(
+            parent,
+            QCoreApplication.translate("ImportExportManager", "Error"),
+            failed_message.format(error_message=message)
+        ))
+        return job
+
+    def import_csv(self, parent):
+        path, _ = QFileDialog.getOpenFileName(
+            parent,
+            QCoreApplication.translate("ImportExportManager", "Import CSV"),
+            "",
+            QCoreApplication.translate("ImportExportManager", "CSV files (*.csv *.csv.gz *.csv.xz);;All files (*.*)")
+        )
+        if not path or not self.check_database(parent):
+            return
+        policy = self.confirm_import(parent)
+        if policy is None:
+            return
+
+        def on_succeeded(report):
+            self.import_finished(parent, report, QCoreApplication.translate(
+                "ImportExportManager",
+                "CSV imported: {entries} entries in {seconds:.1f} s"
+            ).format(entries=report.entries, seconds=report.elapsed))
+
+        job = self.start_import(
+            parent, csv_import_job(path, import_workers(path), policy),
+            QCoreApplication.translate("ImportExportManager", "Importing CSV..."),
+            QCoreApplication.translate("ImportExportManager", "CSV import cancelled"),
+            QCoreApplication.translate("ImportExportManager", "CSV import failed: {error_message}")
+        )
+        job.succeeded.connect(on_succeeded)
+
+    def jsonl_import_function(self, path):
+        workers = import_workers(path)
+        if workers > 1:
+            return partial(import_jsonl_parallel, workers=workers)
+        return import_jsonl_file
+
+    def show_import_errors(self, parent, report, limit=20):
+        if report.positions == "bytes":
+            line = QCoreApplication.translate("ImportExportManager", "Byte {offset}: {error}")
+        elif report.positions == "lines":
+            line = QCoreApplication.translate("ImportExportManager", "Line {line}: {error}")
+        else:
+            line = QCoreApplication.translate("ImportExportManager", "Row {row}: {error}")
+        lines = [line.format(row=position, line=position, offset=position, error=error)
+                 for position, error in report.errors[:limit]]
+        if len(report.errors) > limit:
+            lines.append(QCoreApplication.translate(
+                "ImportExportManager", "... and {count} more"
+            ).format(count=len(report.errors) - limit))
+        QMessageBox.warning(
+            parent,
+            QCoreApplication.translate("ImportExportManager", "Import Warnings"),
+            QCoreApplication.translate(
+                "ImportExportManager",
+                "{count} rows could not be imported and were skipped:\n\n{details}"
+            ).format(count=len(report.errors), details="\n".join(lines))
+        )
 
 
 
@@ -145,70 +459,51 @@ class ImportExportManager:
         path, _ = QFileDialog.getOpenFileName(
             parent,
             QCoreApplication.translate("ImportExportManager", "Import JSON"),
-            QCoreApplication.translate("ImportExportManager", "JSON files (*.json);;All files (*.*)")
+            "",
+            QCoreApplication.translate("ImportExportManager", "JSON files (*.json *.json.gz *.json.xz);;All files (*.*)")
         )
-        if not path:
+        if not path or not self.check_database(parent):
+            return
+        policy = self.confirm_import(parent)
+        if policy is None:
             return
 
-        reply = QMessageBox.question(
+        def on_succeeded(report):
+            self.import_finished(
+                parent, report, QCoreApplication.translate("ImportExportManager", "JSON imported successfully"))
+
+        job = self.start_import(
+            parent, json_import_job(path, policy=policy),
+            QCoreApplication.translate("ImportExportManager", "Importing JSON..."),
+            QCoreApplication.translate("ImportExportManager", "JSON import cancelled"),
+            QCoreApplication.translate("ImportExportManager", "JSON import failed: {error_message}")
+        )
+        job.succeeded.connect(on_succeeded)
+
+    def import_jsonl(self, parent):
+        path, _ = QFileDialog.getOpenFileName(
             parent,
-            QCoreApplication.translate("ImportExportManager", "Confirm Import"),
+            QCoreApplication.translate("ImportExportManager", "Import JSON Lines"),
+            "",
             QCoreApplication.translate(
-                "ImportExportManager",
-                "Do you wish to import data from external file? This may create duplicates of your existing headwords."
-            ),
-            QMessageBox.Yes | QMessageBox.No,
-            QMessageBox.No
+                "ImportExportManager", "JSON Lines files (*.jsonl *.jsonl.gz *.jsonl.xz);;All files (*.*)")
         )
-        if reply != QMessageBox.Yes:
+        if not path or not self.check_database(parent):
+            return
+        policy = self.confirm_import(parent)
+        if policy is None:
             return
 
-        try:
-            with open(path, "r", encoding='utf-8') as f:
-                data = json.load(f)
-
-            if not isinstance(data, list):
-                raise ValueError("Invalid JSON: top-level structure must be a list of entries.")
-
-            required_keys = {"headword", "variation", "part_of_speech", "notes", "meanings"}
-            for idx, item in enumerate(data):
-                if not isinstance(item, dict):
-                    raise ValueError(f"Entry {idx} is not an object.")
-                missing = required_keys - set(item.keys())
-                if missing:
-                    raise ValueError(f"Entry {idx} missing keys: {missing}")
-                if not isinstance(item["meanings"], list):
-                    raise ValueError(f"Entry {idx}: 'meanings' must be a list.")
-
-             
-                self.db_manager.cursor.execute(
-                    "INSERT INTO Entry (headword, variation, part_of_speech, notes) VALUES (?, ?, ?, ?)",
-                    (
-                        item["headword"].strip(),
-                        item["variation"].strip(),
-                        item["part_of_speech"].strip(),
-                        item["notes"].strip()
-                    )
-                )
-                eid = self.db_manager.cursor.lastrowid
-                for m in item["meanings"]:
-                    m = str(m).strip()
-                    if m:
-                        self.db_manager.cursor.execute(
-                            "INSERT INTO Senses (entry_id, meaning) VALUES (?, ?)",
-                            (eid, m)
-                        )
-
-            self.db_manager.conn.commit()
-            self.status_callback(QCoreApplication.translate("ImportExportManager", "JSON imported successfully"))
-
-        except Exception as e:
-            QMessageBox.critical(
-                parent,
-                QCoreApplication.translate("ImportExportManager", "Error"),
-                QCoreApplication.translate(
-                    "ImportExportManager",
-                    "JSON import failed: {error_message}"
-                ).format(error_message=e)
-            )
+        def on_succeeded(report):
+            self.import_finished(parent, report, QCoreApplication.translate(
+                "ImportExportManager",
+                "JSON Lines imported: {entries} entries in {seconds:.1f} s"
+            ).format(entries=report.entries, seconds=report.elapsed))
 
+        job = self.start_import(
+            parent, json_import_job(path, self.jsonl_import_function(path), policy=policy),
+            QCoreApplication.translate("ImportExportManager", "Importing JSON Lines..."),
+            QCoreApplication.translate("ImportExportManager", "JSON Lines import cancelled"),
+            QCoreApplication.translate("ImportExportManager", "JSON Lines import failed: {error_message}")
+        )
+        job.succeeded.connect(on_succeeded)
@@ -0,0 +1,214 @@
+import queue
+import sqlite3
+import logging
+import itertools
+from pathlib import Path
+from contextlib import nullcontext
+from PyQt5.QtCore import QObject, QThread, pyqtSignal
+
+from search import register_functions
+from db_profiles import DEFAULT_PROFILE, apply_profile, using_profile
+
+# Lower numbers run first; jobs of equal priority run in submission order.
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2
+
+# Queued ahead of every job so a stopping thread does not work off its backlog.
+_STOP_PRIORITY = -1
+
+_sequence = itertools.count()
+
+
+class JobCancelled(Exception):
+    pass
+
+
+class Job(QObject):
+    """One long database operation for JobQueue.
+
+    function(conn, job) runs on a queue thread with that thread's connection,
+    read-write for write jobs and read-only otherwise, and returns the result.
+    It reports progress through job.report(), which also raises JobCancelled
+    once the job was cancelled; cancel() additionally interrupts the statement
+    SQLite is running. Whatever the function leaves uncommitted is rolled back.
+
+    The signals are emitted on the queue thread and delivered to the GUI
+    thread; exactly one of succeeded, failed and cancelled is emitted, always
+    followed by finished.
+    """
+
+    progress = pyqtSignal(int, int, str)     # done, total, text
+    succeeded = pyqtSignal(object)           # what function returned
+    failed = pyqtSignal(str)
+    cancelled = pyqtSignal()
+    finished = pyqtSignal()
+
+    def __init__(self, name, function, write=False, priority=PRIORITY_NORMAL, profile=None):
+        super().__init__()
+        self.name = name
+        self.function = function
+        self.write = write
+        self.priority = priority
+        self.profile = profile        # db_profiles name applied while the job runs
+        self.db_path = None
+        self.is_cancelled = False
+        self._conn = None
+
+    def cancel(self):
+        self.is_cancelled = True
+        conn = self._conn
+        if conn is not None:
+            conn.interrupt()
+
+    def check_cancelled(self):
+        if self.is_cancelled:
+            raise JobCancelled()
+
+    def report(self, done, total, text=""):
+        self.check_cancelled()
+        self.progress.emit(done, total, text)
+
+
+class _JobThread(QThread):
+    """Takes jobs off a shared priority queue and runs them on its own connection."""
+
+    def __init__(self, jobs, read_only):
+        super().__init__()
+        self.jobs = jobs
+        self.read_only = read_only
+        self._conn = None
+        self._db_path = None
+
+    def _connection(self, db_path):
+        if self._conn is None or self._db_path != db_path:
+            self._close()
+            if self.read_only:
+                self._conn = sqlite3.connect(Path(db_path).as_uri() + "?mode=ro", uri=True)
+            else:
+                self._conn = sqlite3.connect(db_path)
+                apply_profile(self._conn, DEFAULT_PROFILE)
+            register_functions(self._conn)
+            self._db_path = db_path
+        return self._conn
+
+    def _close(self):
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except sqlite3.Error:
+                logging.exception("Failed to close job connection")
+            self._conn = None
+
+    def run(self):
+        try:
+            while True:
+                _, _, job = self.jobs.get()
+                try:
+                    if job is None:
+                        return
+                    self._run_job(job)
+                finally:
+                    self.jobs.task_done()
+        finally:
+            self._close()
+
+    def _run_job(self, job):
+        try:
+            if job.is_cancelled:
+                raise JobCancelled()
+            conn = self._connection(job.db_path)
+            job._conn = conn
+            try:
+                with using_profile(conn, job.profile) if job.profile else nullcontext():
+                    try:
+                        result = job.function(conn, job)
+                    finally:
+                        if conn.in_transaction:
+                            conn.rollback()
+            finally:
+                job._conn = None
+        except JobCancelled:
+            job.cancelled.emit()
+        except Exception as e:
+            if job.is_cancelled and isinstance(e, sqlite3.OperationalError):
+                # conn.interrupt() surfaces as "interrupted".
+                job.cancelled.emit()
+            else:
+                logging.exception("Job %r failed", job.name)
+                job.failed.emit(str(e))
+        else:
+            job.succeeded.emit(result)
+        job.finished.emit()
+
+
+class JobQueue(QObject):
+    """Runs Jobs off the GUI thread.
+
+    Write jobs run one at a time on a thread that owns the only read-write
+    connection besides the editor's; read jobs share a small pool of threads
+    with read-only connections, so exports or backups never wait for an
+    import. Threads are started with the first job and open their connection
+    for the database the job was submitted for.
+    """
+
+    def __init__(self, readers=2, parent=None):
+        super().__init__(parent)
+        self.readers = readers
+        self._writes = queue.PriorityQueue()
+        self._reads = queue.PriorityQueue()
+        self._threads = []
+        self._jobs = []          # submitted and not finished yet, in submission order
+
+    def _start(self):
+        if self._threads:
+            return
+        self._threads = [_JobThread(self._writes, read_only=False)]
+        self._threads += [_JobThread(self._reads, read_only=True) for _ in range(self.readers)]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, job, db_path):
+        self._start()
+        job.db_path = db_path
+        self._jobs.append(job)
+        job.finished.connect(lambda job=job: self._forget(job))
+        target = self._writes if job.write else self._reads
+        target.put((job.priority, next(_sequence), job))
+        return job
+
+    def _forget(self, job):
+        if job in self._jobs:
+            self._jobs.remove(job)
+
+    def jobs(self):
+        return list(self._jobs)
+
+    def has_write_job(self):
+        return any(job.write for job in self._jobs)
+
+    def cancel_all(self):
+        for job in self._jobs:
+            job.cancel()
+
+    def wait(self):
+        """Block until every job submitted so far has run, e.g. before the database is closed."""
+        self._writes.join()
+        self._reads.join()
+
+    def stop(self):
+        """Cancel everything and stop the threads; submit() starts them again."""
+        self.cancel_all()
+        for thread in self._threads:
+            target = self._reads if thread.read_only else self._writes
+            target.put((_STOP_PRIORITY, next(_sequence), None))
+        for thread in self._threads:
+            thread.wait()
+        self._threads = []
+        for jobs in (self._writes, self._reads):
+            while not jobs.empty():
+                _, _, job = jobs.get()
+                if job is not None:
+                    job.cancelled.emit()
+                    job.finished.emit()
+                jobs.task_done()
@@ -0,0 +1,133 @@
+import re
+import json
+import codecs
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+# Characters that must follow a decoded value or a decoding error before it is
+# certain the chunk end did not cut the value off; longer than any literal or
+# escape sequence, and numbers that long are not in dictionary exports.
+_LOOKAHEAD = 32
+
+
+class JsonStreamError(ValueError):
+    """The stream is not a well-formed JSON array; offset is the byte where that was noticed."""
+
+    def __init__(self, message, offset):
+        super().__init__(f"{message} (byte {offset})")
+        self.offset = offset
+
+
+class _Buffer:
+    """Decoded text of a binary file, read chunk by chunk, with byte offsets for any position."""
+
+    def __init__(self, f, chunk_size):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.decoder = codecs.getincrementaldecoder("utf-8")()
+        self.text = ""
+        self.pos = 0
+        self.eof = False
+        # Byte offset of text[self._mark], advanced as positions are asked for.
+        self._mark = 0
+        self._mark_offset = 0
+
+    def read(self):
+        """Append the next chunk; returns False at the end of the file."""
+        if self.eof:
+            return False
+        data = self.f.read(self.chunk_size)
+        if not data:
+            self.eof = True
+        text = self.decoder.decode(data, final=self.eof)
+        if self.pos >= self.chunk_size:
+            # Drop what was consumed so the buffer stays around one chunk.
+            self._mark_offset = self.offset(self.pos)
+            self.text = self.text[self.pos:]
+            self._mark = self.pos = 0
+        if text:
+            self.text += text
+        return bool(data)
+
+    def offset(self, index):
+        """Byte offset of text[index]; index must not go backwards between calls."""
+        if index > self._mark:
+            chunk = self.text[self._mark:index]
+            self._mark_offset += len(chunk) if chunk.isascii() else len(chunk.encode("utf-8"))
+            self._mark = index
+        return self._mark_offset
+
+    def skip_whitespace(self):
+        """Move pos to the next significant character; returns False at the end of the file."""
+        while True:
+            self.pos = _WHITESPACE.match(self.text, self.pos).end()
+            if self.pos < len(self.text):
+                return True
+            if not self.read():
+                return False
+
+    def error(self, message, index=None):
+        return JsonStreamError(message, self.offset(self.pos if index is None else index))
+
+
+def iter_json_array(f, chunk_size=1 << 20):
+    """Yield (byte offset, element) for each element of the JSON array in the binary file f.
+
+    Elements are decoded one at a time with JSONDecoder.raw_decode from a
+    buffer that is refilled chunk_size bytes at a time, so memory stays around
+    one chunk plus the largest element however big the file is. Malformed JSON
+    raises JsonStreamError with the byte offset of the problem.
+    """
+    decoder = json.JSONDecoder()
+    buffer = _Buffer(f, chunk_size)
+    if not buffer.skip_whitespace():
+        raise buffer.error("Expecting '[', found end of file")
+    if buffer.text.startswith("\ufeff", buffer.pos):
+        buffer.pos += 1
+        buffer.skip_whitespace()
+    if buffer.text[buffer.pos] != "[":
+        raise buffer.error("Expecting '['")
+    buffer.pos += 1
+    if not buffer.skip_whitespace():
+        raise buffer.error("Unterminated array")
+    if buffer.text[buffer.pos] == "]":
+        buffer.pos += 1
+    else:
+        while True:
+            if not buffer.skip_whitespace():
+                raise buffer.error("Unterminated array")
+            value, start, end = _decode(decoder, buffer)
+            yield buffer.offset(start), value
+            buffer.pos = end
+            if not buffer.skip_whitespace():
+                raise buffer.error("Unterminated array")
+            separator = buffer.text[buffer.pos]
+            buffer.pos += 1
+            if separator == "]":
+                break
+            if separator != ",":
+                raise buffer.error("Expecting ',' delimiter", buffer.pos - 1)
+    if buffer.skip_whitespace():
+        raise buffer.error("Extra data")
+
+
+def _decode(decoder, buffer):
+    """Decode the value at buffer.pos and return (value, start, end), reading more of the
+    file while the value may be cut off by the end of the buffer.
+    """
+    while True:
+        # Reading may drop consumed text, which moves pos.
+        start = buffer.pos
+        try:
+            value, end = decoder.raw_decode(buffer.text, start)
+        except json.JSONDecodeError as e:
+            # Near the end of the buffer an error may only mean that the value goes
+            # on in the next chunk; an unterminated string may go on for longer.
+            if (buffer.eof or (len(buffer.text) - e.pos > _LOOKAHEAD
+                               and not e.msg.startswith("Unterminated string"))):
+                raise buffer.error(e.msg, e.pos) from None
+            buffer.read()
+            continue
+        # A number close to the end of the buffer may continue in the next chunk.
+        if len(buffer.text) - end > _LOOKAHEAD or buffer.eof:
+            return value, start, end
+        buffer.read()
@@ -0,0 +1,249 @@
+import sys
+import json
+import mmap
+import struct
+from array import array
+from bisect import bisect_left
+
+from match_keys import match_key, strip_diacritics_setting
+from bulk_export import iter_export_rows, entry_json
+
+# A read-only headword -> entry file for tools that only look words up.
+#
+#   header     HEADER, all integers little-endian
+#   records    per entry: u32 length + the entry as UTF-8 JSON (JSON Lines fields)
+#   keys       per entry, sorted by headword key: u16 shared, u16 suffix length, suffix;
+#              shared is the length of the prefix taken over from the previous key,
+#              0 at every restart point
+#   restarts   u32 offset into keys of every RESTART_INTERVAL-th key
+#   offsets    u64 file offset of every record
+#
+# The n-th key belongs to the n-th record, so the offset table is indexed by key.
+LOOKUP_MAGIC = b"DMLK"
+LOOKUP_VERSION = 1
+LOOKUP_EXTENSION = ".dmlk"
+RESTART_INTERVAL = 16
+FLAG_STRIP_DIACRITICS = 1
+
+HEADER = struct.Struct("<4sHHIIQQQQ")   # magic, version, flags, entries, restart interval, 4 section offsets
+_LENGTH = struct.Struct("<I")
+_KEY = struct.Struct("<HH")
+
+# Every entry with a headword, ordered by key for the key block; the index on
+# headword_key returns them in this order without sorting.
+LOOKUP_QUERY = '''
+    SELECT Entry.id, Entry.headword, Entry.variation, Entry.part_of_speech, Entry.notes,
+           (SELECT json_group_array(meaning)
+            FROM (SELECT meaning FROM Senses WHERE entry_id = Entry.id ORDER BY id)),
+           Entry.headword_key
+    FROM Entry WHERE Entry.headword_key IS NOT NULL ORDER BY Entry.headword_key, Entry.id'''
+
+
+def _little_endian(values):
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values.tobytes()
+
+
+def _pad(f, position, alignment=8):
+    padding = -position % alignment
+    f.write(b"\0" * padding)
+    return position + padding
+
+
+def export_lookup_file(conn, f, progress=None, chunk_size=2000, restart_interval=RESTART_INTERVAL):
+    """Write a lookup file for every entry with a headword to the seekable binary file f.
+
+    Keys are the headword match keys (see match_keys), compared as UTF-8
+    bytes, which is also SQLite's order for them. Returns the entry count.
+    """
+    encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+    f.write(b"\0" * HEADER.size)
+    position = HEADER.size
+    keys = bytearray()
+    restarts = array("I")
+    offsets = array("Q")
+    previous = b""
+    count = 0
+    for row in iter_export_rows(conn, progress, chunk_size, LOOKUP_QUERY):
+        record = entry_json(encoder, *row[:6]).encode("utf-8")
+        offsets.append(position)
+        f.write(_LENGTH.pack(len(record)))
+        f.write(record)
+        position += _LENGTH.size + len(record)
+
+        key = row[6].encode("utf-8")
+        if len(key) > 0xFFFF:
+            key = key[:0xFFFF]
+        if count % restart_interval == 0:
+            restarts.append(len(keys))
+            shared = 0
+        else:
+            shared = 0
+            limit = min(len(key), len(previous))
+            while shared < limit and key[shared] == previous[shared]:
+                shared += 1
+        keys += _KEY.pack(shared, len(key) - shared)
+        keys += key[shared:]
+        previous = key
+        count += 1
+
+    keys_offset = position
+    f.write(keys)
+    restarts_offset = _pad(f, keys_offset + len(keys))
+    restarts = _little_endian(restarts)
+    f.write(restarts)
+    offsets_offset = _pad(f, restarts_offset + len(restarts))
+    f.write(_little_endian(offsets))
+    flags = FLAG_STRIP_DIACRITICS if strip_diacritics_setting(conn) else 0
+    f.seek(0)
+    f.write(HEADER.pack(LOOKUP_MAGIC, LOOKUP_VERSION, flags, count, restart_interval,
+                        HEADER.size, keys_offset, restarts_offset, offsets_offset))
+    return count
+
+
+class LookupFile:
+    """Reader for files written by export_lookup_file.
+
+    The file is memory-mapped and searched in place: a binary search over the
+    first keys of the restart blocks, then a scan of at most one block of
+    prefix-compressed keys. Only those first keys, one per RESTART_INTERVAL
+    entries, are copied out, on the first search. record() hands out
+    memoryviews into the mapping, so nothing else is copied until an entry is
+    decoded; release them before close().
+    """
+
+    def __init__(self, path):
+        self._file = open(path, "rb")
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except BaseException:
+            self._file.close()
+            raise
+        try:
+            (magic, version, flags, self.entries, self.restart_interval, _,
+             self._keys, restarts, offsets) = HEADER.unpack_from(self._mmap)
+            if magic != LOOKUP_MAGIC:
+                raise ValueError(f"{path} is not a lookup file")
+            if version > LOOKUP_VERSION:
+                raise ValueError(f"Unsupported lookup file version: {version}")
+        except BaseException:
+            self.close()
+            raise
+        self.strip_diacritics = bool(flags & FLAG_STRIP_DIACRITICS)
+        self._view = memoryview(self._mmap)
+        blocks = -(-self.entries // self.restart_interval)
+        self._restarts = self._table(restarts, blocks, "I")
+        self._offsets = self._table(offsets, self.entries, "Q")
+        self._first_keys = None
+
+    def _table(self, offset, count, typecode):
+        size = array(typecode).itemsize
+        table = self._view[offset:offset + count * size]
+        if sys.byteorder == "little":
+            return table.cast(typecode)
+        values = array(typecode, table)
+        values.byteswap()
+        return values
+
+    def close(self):
+        for name in ("_restarts", "_offsets", "_view"):
+            view = self.__dict__.pop(name, None)
+            if isinstance(view, memoryview):
+                view.release()
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return self.entries
+
+    def key(self, headword):
+        """The key headword is stored under."""
+        return match_key(headword, self.strip_diacritics).encode("utf-8")
+
+    def _block(self, target):
+        """The block to start looking for target in."""
+        if self._first_keys is None:
+            first_keys = []
+            for offset in self._restarts:
+                _, length = _KEY.unpack_from(self._mmap, self._keys + offset)
+                start = self._keys + offset + _KEY.size
+                first_keys.append(self._mmap[start:start + length])
+            self._first_keys = first_keys
+        # The last block whose first key is below target: keys equal to it may
+        # start in that block, after its first key.
+        return max(bisect_left(self._first_keys, target) - 1, 0)
+
+    def _scan(self, target):
+        """Yield (index, key) from the block that may hold target on."""
+        block = self._block(target)
+        index = block * self.restart_interval
+        position = self._keys + (self._restarts[block] if self._restarts else 0)
+        key = b""
+        while index < self.entries:
+            shared, length = _KEY.unpack_from(self._mmap, position)
+            position += _KEY.size
+            key = key[:shared] + self._mmap[position:position + length]
+            position += length
+            yield index, key
+            index += 1
+
+    def find(self, headword):
+        """Indexes of the records whose headword has the same key as headword."""
+        target = self.key(headword)
+        found = []
+        if not self.entries:
+            return found
+        index = self._block(target) * self.restart_interval
+        position = self._keys + self._restarts[index // self.restart_interval]
+        key = b""
+        unpack_from, mapped, size = _KEY.unpack_from, self._mmap, _KEY.size
+        # Same walk as _scan, inlined: this is the hot path of a lookup.
+        while index < self.entries:
+            shared, length = unpack_from(mapped, position)
+            position += size
+            key = key[:shared] + mapped[position:position + length]
+            position += length
+            if key == target:
+                found.append(index)
+            elif key > target:
+                break
+            index += 1
+        return found
+
+    def prefix(self, prefix, limit=None):
+        """Yield (headword key, index) in key order for keys that start with prefix's key."""
+        target = self.key(prefix)
+        found = 0
+        for index, key in self._scan(target):
+            if key.startswith(target):
+                yield key.decode("utf-8"), index
+                found += 1
+                if limit is not None and found >= limit:
+                    return
+            elif key > target:
+                return
+
+    def record(self, index):
+        """The UTF-8 JSON of record index, as a memoryview into the file."""
+        offset = self._offsets[index]
+        length, = _LENGTH.unpack_from(self._mmap, offset)
+        start = offset + _LENGTH.size
+        return self._view[start:start + length]
+
+    def entry(self, index):
+        """Record index decoded: a dict with the JSON Lines fields."""
+        with self.record(index) as record:
+            return json.loads(str(record, "utf-8"))
+
+    def lookup(self, headword):
+        """Decoded entries for headword, in id order."""
+        return [self.entry(index) for index in self.find(headword)]
@@ -1,9 +1,9 @@
-import sys, os, logging, difflib, json, math, datetime
+import sys, os, logging, json, math, datetime, multiprocessing
 from PyQt5.QtWidgets import (
-    QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QTextEdit, QListWidget, QProgressDialog, 
-    QPushButton, QMessageBox, QFileDialog, QInputDialog, QMenuBar, QMenu, QStatusBar, QFrame, QShortcut, QListWidgetItem,  QSplitter, QComboBox, QCheckBox, QToolBar, QAction, QUndoStack)
+    QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QTextEdit, QListView, QAbstractItemView,
+    QPushButton, QMessageBox, QFileDialog, QInputDialog, QMenuBar, QMenu, QStatusBar, QFrame, QShortcut, QSplitter, QComboBox, QCheckBox, QToolBar, QAction, QUndoStack)
 from PyQt5.QtGui import QIcon
-from PyQt5.QtCore import Qt, QEvent, QTimer, QSize, QTranslator, QSettings, QLibraryInfo
+from PyQt5.QtCore import Qt, QEvent, QTimer, QSize, QTranslator, QSettings, QLibraryInfo, QThread, pyqtSignal
 from settings import load_settings, save_settings
 from database import DatabaseManager
 from import_export import ImportExportManager
@@ -11,6 +11,10 @@ from duplicates import DuplicatesWindow
 from dict_help import DictionaryAidWindow
 from undo_commands import UpdateEntryCommand, DeleteEntryCommand
 from pdf_export_tool import PDFExporter 
+from search import SEARCH_CRITERIA
+from headword_model import HeadwordListModel
+from search_worker import SearchWorker, SearchRequest
+from entry_cache import EntryCache, PrefetchWorker, PrefetchRequest, load_entries
 
 MAX_RECENT_FILES = 5
 SETTINGS_ORG = "Uri"
@@ -26,6 +30,12 @@ def resource_path(relative_path):
     icon_path = os.path.join(base_dir, "icons", "app_icon.ico")
 
 class DictionaryApp(QMainWindow):
+    search_requested = pyqtSignal(object)
+    prefetch_requested = pyqtSignal(object)
+    SEARCH_DEBOUNCE_MS = 250
+    PREFETCH_NEIGHBORS = 25       # entries loaded ahead on each side of the selection
+    STATS_POS_LIMIT = 20          # parts of speech listed in Database Statistics
+
     def __init__(self):
         super().__init__()
         self.settings = QSettings(SETTINGS_ORG, SETTINGS_APP)
@@ -37,10 +47,38 @@ class DictionaryApp(QMainWindow):
         self.current_theme = "themes/default_style.qss"
         self.current_entry_id = None
         self.undoStack = QUndoStack(self)
-        self.undoStack.indexChanged.connect(self.refresh_headwords_panel)
+        self.undoStack.indexChanged.connect(self.on_undo_index_changed)
+        self.pushing_command = False
         self.db_manager = DatabaseManager(self.update_status)
+        self.db_manager.events.inserted.connect(self.on_entries_updated)
+        self.db_manager.events.updated.connect(self.on_entries_updated)
+        self.db_manager.events.deleted.connect(self.on_entries_deleted)
+        self.db_manager.events.reset.connect(self.populate_headwords)
+        self.applying_changes = False
+        self.entry_cache = EntryCache()
+        self.db_manager.events.reset.connect(self.entry_cache.clear)
+        self.prefetch_thread = QThread(self)
+        self.prefetch_worker = PrefetchWorker()
+        self.prefetch_worker.moveToThread(self.prefetch_thread)
+        self.prefetch_requested.connect(self.prefetch_worker.run)
+        self.prefetch_worker.loaded.connect(self.on_entries_prefetched)
+        self.prefetch_thread.start()
         self.import_export_manager = ImportExportManager(self.db_manager, self.update_status)
         self.duplicates_window = None
+        self.search_generation = 0
+        self.search_is_fuzzy = False
+        self.search_thread = QThread(self)
+        self.search_worker = SearchWorker()
+        self.search_worker.moveToThread(self.search_thread)
+        self.search_requested.connect(self.search_worker.run)
+        self.search_worker.batch_ready.connect(self.on_search_batch)
+        self.search_worker.finished.connect(self.on_search_finished)
+        self.search_worker.failed.connect(self.on_search_failed)
+        self.search_thread.start()
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(self.SEARCH_DEBOUNCE_MS)
+        self.search_timer.timeout.connect(self.search_filter)
         self.initUI()
         settings = load_settings()
         self.base_font_size = self.font().pointSize()
@@ -58,6 +96,11 @@ class DictionaryApp(QMainWindow):
         self.autosave_timer.timeout.connect(self.autosave)
         self.autosave_timer.start(self.autosave_interval * 1000)
 
+        self.backup_interval = min(max(settings.get("backup_interval", 60), 5), 1440)
+        self.backup_timer = QTimer(self)
+        self.backup_timer.timeout.connect(self.db_manager.backup_database)
+        self.backup_timer.start(self.backup_interval * 60 * 1000)
+
     def initUI(self):
         self.setWindowTitle(self.tr("Uri DictMaker"))
         self.setGeometry(100, 100, 1280, 800)
@@ -74,8 +117,16 @@ class DictionaryApp(QMainWindow):
         self.export_csv_action = self.file_menu.addAction(self.tr("Export CSV"), self.export_csv)
         self.import_json_action = self.file_menu.addAction(self.tr("Import JSON"), self.import_json)
         self.export_json_action = self.file_menu.addAction(self.tr("Export JSON"), self.export_json)
+        self.import_jsonl_action = self.file_menu.addAction(self.tr("Import JSON Lines"), self.import_jsonl)
+        self.export_jsonl_action = self.file_menu.addAction(self.tr("Export JSON Lines"), self.export_jsonl)
+        self.export_lookup_action = self.file_menu.addAction(self.tr("Export Lookup File"), self.export_lookup)
+        self.export_delta_action = self.file_menu.addAction(self.tr("Export Delta"), self.export_delta)
+        self.apply_delta_action = self.file_menu.addAction(self.tr("Apply Delta"), self.apply_delta)
         self.export_pdf_action = self.file_menu.addAction(self.tr("Publish PDF"), self.export_pdf)
         self.file_menu.addSeparator()
+        self.backup_now_action = self.file_menu.addAction(self.tr("Back Up Now"), self.backup_now)
+        self.restore_backup_action = self.file_menu.addAction(self.tr("Restore Backup"), self.restore_backup)
+        self.file_menu.addSeparator()
         self.exit_action = self.file_menu.addAction(self.tr("Exit"), self.exit_app)
         self.edit_menu = menubar.addMenu(self.tr("Edit"))
         self.undo_action = self.edit_menu.addAction(self.tr("Undo"), self.undoStack.undo)
@@ -95,6 +146,11 @@ class DictionaryApp(QMainWindow):
         self.dictionary_help_action = self.tools_menu.addAction(self.tr("Help with Dictionary making"), self.show_dictionary_aid)
         self.file_menu.addSeparator()
         self.database_stats_action = self.tools_menu.addAction(self.tr("Database Statistics"), self.show_db_statistics)
+        self.recompute_stats_action = self.tools_menu.addAction(self.tr("Recompute Statistics"), self.recompute_statistics)
+        self.substring_index_action = self.tools_menu.addAction(self.tr("Substring Search Index"), self.toggle_substring_index)
+        self.substring_index_action.setCheckable(True)
+        self.strip_diacritics_action = self.tools_menu.addAction(self.tr("Ignore Diacritics When Matching"), self.toggle_strip_diacritics)
+        self.strip_diacritics_action.setCheckable(True)
         self.preferences_menu = menubar.addMenu(self.tr("Preferences"))
         self.theme_menu = self.preferences_menu.addMenu(self.tr("Theme"))
         self.dark_theme_action = self.theme_menu.addAction(self.tr("Dark"), lambda: self.change_theme("themes/style_dark.qss"))
@@ -110,6 +166,17 @@ class DictionaryApp(QMainWindow):
         self.rajasthani_action = self.language_menu.addAction(self.tr("Rajasthani"), lambda: self.change_language("mrw"))
         self.telugu_action = self.language_menu.addAction(self.tr("Telugu"), lambda: self.change_language("te"))
         self.autosave_interval_action = self.preferences_menu.addAction(self.tr("Set Autosave Interval"), self.set_autosave_interval)
+        self.fuzzy_distance_action = self.preferences_menu.addAction(self.tr("Set Fuzzy Search Distance"), self.set_fuzzy_distance)
+        self.backup_interval_action = self.preferences_menu.addAction(self.tr("Set Backup Interval"), self.set_backup_interval)
+        self.backup_retention_action = self.preferences_menu.addAction(self.tr("Set Backups to Keep"), self.set_backup_retention)
+        self.compact_json_action = self.preferences_menu.addAction(self.tr("Compact JSON Export"), self.toggle_compact_json)
+        self.compact_json_action.setCheckable(True)
+        self.compact_json_action.setChecked(load_settings().get("json_export_compact", False))
+        self.db_profile_menu = self.preferences_menu.addMenu(self.tr("Database Profile"))
+        self.editing_profile_action = self.db_profile_menu.addAction(self.tr("Editing"), lambda: self.change_db_profile("editing"))
+        self.bulk_profile_action = self.db_profile_menu.addAction(self.tr("Bulk Import"), lambda: self.change_db_profile("bulk_import"))
+        self.editing_profile_action.setCheckable(True)
+        self.bulk_profile_action.setCheckable(True)
         self.help_menu = menubar.addMenu(self.tr("Help"))
         self.keyboard_shortcuts_action = self.help_menu.addAction(self.tr("Keyboard Shortcuts"), self.show_help)
         self.about_action = self.help_menu.addAction(self.tr("About"), self.show_about)
@@ -182,6 +249,16 @@ class DictionaryApp(QMainWindow):
         self.search_button.setIcon(QIcon(resource_path("icons/search.svg")))
         self.search_button.clicked.connect(self.search_filter)
         search_layout.addWidget(self.search_button)
+        self.instant_search_checkbox = QCheckBox(self.tr("Search as you type"))
+        self.instant_search_checkbox.setToolTip(self.tr("Update results while typing"))
+        self.instant_search_checkbox.setChecked(load_settings().get("search_as_you_type", True))
+        self.instant_search_checkbox.toggled.connect(self.set_instant_search)
+        search_layout.addWidget(self.instant_search_checkbox)
+        self.search_stats_label = QLabel()
+        search_layout.addWidget(self.search_stats_label)
+        self.entry_search.textChanged.connect(self.schedule_search)
+        self.search_criteria_combo.currentIndexChanged.connect(self.schedule_search)
+        self.fuzzy_search_checkbox.toggled.connect(self.schedule_search)
         main_layout.addWidget(search_frame)
 
         # Content area
@@ -200,13 +277,14 @@ class DictionaryApp(QMainWindow):
         list_layout.addWidget(self.alphabet_combo)
         self.entries_label = QLabel(self.tr("Entries"))
         list_layout.addWidget(self.entries_label)
-        self.listbox_headwords = QListWidget()
+        self.headword_model = HeadwordListModel(self)
+        self.listbox_headwords = QListView()
+        self.listbox_headwords.setModel(self.headword_model)
+        self.listbox_headwords.setUniformItemSizes(True)
         self.listbox_headwords.setFocusPolicy(Qt.StrongFocus)  
-        self.listbox_headwords.itemClicked.connect(self.display_entry)
-        list_layout.addWidget(self.listbox_headwords)
-        splitter.addWidget(list_frame)
-        self.listbox_headwords.setSelectionMode(QListWidget.ExtendedSelection)
-        self.listbox_headwords.itemClicked.connect(self.display_entry)
+        self.listbox_headwords.setSelectionMode(QAbstractItemView.ExtendedSelection)
+        self.listbox_headwords.clicked.connect(self.display_entry)
+        self.listbox_headwords.selectionModel().currentChanged.connect(self.on_current_headword_changed)
         list_layout.addWidget(self.listbox_headwords)
         splitter.addWidget(list_frame)
 
@@ -268,6 +346,8 @@ class DictionaryApp(QMainWindow):
         self.setStatusBar(self.status_bar)
         self.status_label = QLabel(self.tr("Total Headwords: 0"))
         self.status_bar.addPermanentWidget(self.status_label)
+        self.search_cache_label = QLabel()
+        self.status_bar.addPermanentWidget(self.search_cache_label)
 
         self.initialize_last_db()
 
@@ -286,6 +366,8 @@ class DictionaryApp(QMainWindow):
         self.add_shortcut(Qt.CTRL + Qt.SHIFT + Qt.Key_J, self.import_json)
         self.add_shortcut(Qt.CTRL + Qt.ALT + Qt.Key_C, self.export_csv)
         self.add_shortcut(Qt.CTRL + Qt.ALT + Qt.Key_J, self.export_json)
+        self.add_shortcut(Qt.CTRL + Qt.SHIFT + Qt.Key_L, self.import_jsonl)
+        self.add_shortcut(Qt.CTRL + Qt.ALT + Qt.Key_L, self.export_jsonl)
         self.add_shortcut(Qt.CTRL + Qt.ALT + Qt.Key_P, self.export_pdf)
         self.add_shortcut(Qt.CTRL + Qt.Key_BracketLeft, self.toggle_left_panel)
         self.add_shortcut(Qt.CTRL + Qt.Key_BracketRight, self.toggle_right_panel)
@@ -313,14 +395,12 @@ class DictionaryApp(QMainWindow):
         if not self.db_manager.conn:
             QMessageBox.information(self, title, no_db_message)
             return
-        self.db_manager.cursor.execute("SELECT COUNT(*) FROM Entry")
-        headword_count = self.db_manager.cursor.fetchone()[0]
-        self.db_manager.cursor.execute("SELECT COUNT(*) FROM Senses")
-        meaning_count = self.db_manager.cursor.fetchone()[0]
-        self.db_manager.cursor.execute(
-            "SELECT COUNT(*) FROM (SELECT headword FROM Entry GROUP BY headword HAVING COUNT(*) > 1)"
+        counts, pos_counts = self.db_manager.statistics()
+        pos_lines = "".join(
+            f"    {pos or self.tr('(none)')}: {count}\n" for pos, count in pos_counts[:self.STATS_POS_LIMIT]
         )
-        duplicate_count = self.db_manager.cursor.fetchone()[0]
+        if len(pos_counts) > self.STATS_POS_LIMIT:
+            pos_lines += "    " + self.tr("... and {count} more").format(count=len(pos_counts) - self.STATS_POS_LIMIT) + "\n"
 
         db_file = self.db_manager.load_last_db()
         if db_file and os.path.exists(db_file):
@@ -334,9 +414,10 @@ class DictionaryApp(QMainWindow):
             db_file = self.tr("Not Available")
         stats_message = (
             f"{self.tr('Database Statistics:')}\n\n"
-            f"{self.tr('Headwords')}: {headword_count}\n"
-            f"{self.tr('Meanings')}: {meaning_count}\n"
-            f"{self.tr('Duplicate Headwords')}: {duplicate_count}\n\n"
+            f"{self.tr('Headwords')}: {counts.get('entries', 0)}\n"
+            f"{self.tr('Meanings')}: {counts.get('senses', 0)}\n"
+            f"{self.tr('Duplicate Headwords')}: {counts.get('duplicate_groups', 0)}\n\n"
+            f"{self.tr('Parts of Speech')}:\n{pos_lines}\n"
             f"{self.tr('Database File')}: {db_file}\n"
             f"{self.tr('File Size')}: {db_size}\n"
             f"{self.tr('Last Modified')}: {last_modified}\n"
@@ -344,166 +425,268 @@ class DictionaryApp(QMainWindow):
 
         QMessageBox.information(self, title, stats_message)
 
+    def recompute_statistics(self):
+        if not self.db_manager.conn:
+            QMessageBox.warning(self, self.tr("Database Error"),
+                                self.tr("Please create or load a database first."))
+            return
+        if not self.check_not_writing():
+            return
+        # The job's reset reloads the counts shown in the window.
+        job = self.db_manager.recompute_statistics()
+        self.update_status(self.tr("Recomputing statistics..."))
+        job.succeeded.connect(lambda result: self.update_status(self.tr("Statistics recomputed")))
+        job.failed.connect(lambda message: QMessageBox.critical(
+            self, self.tr("Error"), self.tr("Recomputing statistics failed: {error}").format(error=message)))
+
+    def check_not_writing(self, quiet=False):
+        """False while a write job holds the database; edits would block on its lock until it ends."""
+        if not self.db_manager.writing():
+            return True
+        if not quiet:
+            QMessageBox.information(self, self.tr("Database Busy"),
+                                    self.tr("A long operation is still writing to the database. "
+                                            "Please try again once it has finished."))
+        return False
+
     def initialize_last_db(self):
         last_db = self.db_manager.load_last_db()
         if last_db and os.path.exists(last_db):
             self.db_manager.load_database(self, last_db)
             self.populate_headwords()
 
+    def change_db_profile(self, name):
+        if not self.db_manager.conn:
+            QMessageBox.warning(self, self.tr("Database Error"),
+                                self.tr("Please create or load a database first."))
+        else:
+            self.db_manager.set_profile(name)
+            self.update_status(self.tr("Database profile set to {profile}").format(profile=name))
+        self.update_profile_actions()
+
+    def update_profile_actions(self):
+        self.editing_profile_action.setChecked(self.db_manager.profile_name == "editing")
+        self.bulk_profile_action.setChecked(self.db_manager.profile_name == "bulk_import")
+        self.substring_index_action.setChecked(self.db_manager.has_substring_index())
+        self.strip_diacritics_action.setChecked(self.db_manager.strips_diacritics())
+
+    def toggle_substring_index(self):
+        if not self.db_manager.conn:
+            QMessageBox.warning(self, self.tr("Database Error"),
+                                self.tr("Please create or load a database first."))
+            self.update_profile_actions()
+            return
+        enable = not self.db_manager.has_substring_index()
+        if not self.check_not_writing():
+            self.update_profile_actions()
+            return
+
+        def on_succeeded(exists):
+            if exists:
+                self.update_status(self.tr("Substring search index built"))
+            elif enable:
+                QMessageBox.warning(self, self.tr("Not Supported"),
+                                    self.tr("This SQLite version has no trigram tokenizer."))
+            else:
+                self.update_status(self.tr("Substring search index removed"))
+
+        job = self.db_manager.set_substring_index(enable)
+        self.update_status(self.tr("Building substring search index...") if enable
+                           else self.tr("Removing substring search index..."))
+        job.succeeded.connect(on_succeeded)
+        job.failed.connect(lambda message: QMessageBox.critical(
+            self, self.tr("Error"), self.tr("Substring index update failed: {error}").format(error=message)))
+        job.finished.connect(self.update_profile_actions)
+
+    def toggle_strip_diacritics(self):
+        if not self.db_manager.conn:
+            QMessageBox.warning(self, self.tr("Database Error"),
+                                self.tr("Please create or load a database first."))
+            self.update_profile_actions()
+            return
+        enable = not self.db_manager.strips_diacritics()
+        if not self.check_not_writing():
+            self.update_profile_actions()
+            return
+
+        def on_succeeded(result):
+            if enable:
+                self.update_status(self.tr("Duplicate matching now ignores diacritics"))
+            else:
+                self.update_status(self.tr("Duplicate matching now respects diacritics"))
+
+        job = self.db_manager.set_strip_diacritics(enable)
+        self.update_status(self.tr("Updating match keys..."))
+        job.succeeded.connect(on_succeeded)
+        job.failed.connect(lambda message: QMessageBox.critical(
+            self, self.tr("Error"), self.tr("Updating match keys failed: {error}").format(error=message)))
+        job.finished.connect(self.update_profile_actions)
+
     def populate_headwords(self):
-        self.listbox_headwords.clear()
-        if self.db_manager.conn:
-            self.db_manager.cursor.execute("SELECT id, headword FROM Entry ORDER BY headword")
-            for row in self.db_manager.cursor.fetchall():
-                item = QListWidgetItem(row[1])  
-                item.setData(Qt.UserRole, row[0])  
-                self.listbox_headwords.addItem(item)
+        self.update_profile_actions()
+        self.headword_model.set_query(self.db_manager.conn)
         self.update_headword_count()
         self.populate_alphabet_combo()
+        self.alphabet_combo.blockSignals(True)
+        self.alphabet_combo.setCurrentIndex(0)
+        self.alphabet_combo.blockSignals(False)
 
-    def display_entry(self, item):
-        entry_id = item.data(Qt.UserRole)  
-        self.db_manager.cursor.execute('''
-        SELECT Entry.*, Senses.meaning 
-        FROM Entry LEFT JOIN Senses 
-        ON Entry.id = Senses.entry_id 
-        WHERE Entry.id=?''', (entry_id,))
-        result = self.db_manager.cursor.fetchone()
-        if result:
-            self.current_entry_id = result[0]
-            self.id_label.setText(self.tr("ID: {id}").format(id=self.current_entry_id))
-            self.entry_headword.setText(result[1])
-            self.entry_variation.setText(result[2])
-            self.entry_pos.setText(result[3])
-            self.entry_notes.setText(result[4])
-            self.entry_meaning.clear()
-            self.db_manager.cursor.execute("SELECT meaning FROM Senses WHERE entry_id=?", (self.current_entry_id,))
-            for row in self.db_manager.cursor.fetchall():
-                self.entry_meaning.append(row[0])
+    def display_entry(self, index):
+        self.load_entry(index.data(Qt.UserRole))
+        self.prefetch_around(index.row())
+
+    def on_current_headword_changed(self, current, previous):
+        # Follows keyboard navigation; rows moving because of a write are not a new choice.
+        if current.isValid() and not self.applying_changes:
+            self.display_entry(current)
+
+    def load_entry(self, entry_id):
+        """Show an entry in the editor; returns False if it does not exist."""
+        data = self.entry_cache.get(entry_id)
+        if data is None:
+            data = load_entries(self.db_manager.conn, [entry_id]).get(entry_id)
+            if data is None:
+                return False
+            self.entry_cache.update({entry_id: data})
+        self.current_entry_id = entry_id
+        self.id_label.setText(self.tr("ID: {id}").format(id=entry_id))
+        self.entry_headword.setText(data['headword'])
+        self.entry_variation.setText(data['variation'])
+        self.entry_pos.setText(data['pos'])
+        self.entry_notes.setText(data['notes'])
+        self.entry_meaning.setPlainText("\n".join(data['meanings']))
+        return True
+
+    def prefetch_around(self, row):
+        if not self.db_manager.db_path:
+            return
+        first = max(0, row - self.PREFETCH_NEIGHBORS)
+        last = min(self.headword_model.rowCount(), row + self.PREFETCH_NEIGHBORS + 1)
+        entry_ids = [self.headword_model.index(r).data(Qt.UserRole) for r in range(first, last)]
+        entry_ids = [entry_id for entry_id in entry_ids if entry_id not in self.entry_cache]
+        if entry_ids:
+            self.prefetch_requested.emit(
+                PrefetchRequest(self.db_manager.db_path, self.db_manager.data_version, entry_ids))
+
+    def on_entries_prefetched(self, data_version, entries):
+        if data_version == self.db_manager.data_version:
+            self.entry_cache.update(entries)
+
+    def schedule_search(self):
+        if self.instant_search_checkbox.isChecked():
+            self.search_timer.start()
+
+    def set_instant_search(self, enabled):
+        settings = load_settings()
+        settings["search_as_you_type"] = enabled
+        save_settings(settings)
+        if not enabled:
+            self.search_timer.stop()
 
     def search_filter(self):
+        self.search_timer.stop()
         search_term = self.entry_search.text().lower().strip()
-        criteria = self.search_criteria_combo.currentText()
+        criterion = SEARCH_CRITERIA[self.search_criteria_combo.currentIndex()]
         fuzzy = self.fuzzy_search_checkbox.isChecked()
-        self.listbox_headwords.clear()
-        if not search_term:
+        self.search_generation += 1
+        self.search_worker.cancel(self.search_generation)
+        self.headword_model.clear()
+        self.search_stats_label.clear()
+        if not search_term or not self.db_manager.conn:
             self.populate_headwords()
             return
 
-        try:
-            if fuzzy:
-              
-                self.db_manager.cursor.execute("SELECT id, headword, part_of_speech, variation FROM Entry")
-                rows = self.db_manager.cursor.fetchall()
-                matched = []
-                for row in rows:
-                    entry_id, headword, pos, variation = row[0], row[1], row[2], row[3]
-                    if criteria == self.tr("Headword"):
-                        field = (headword or "").lower()
-                        if difflib.get_close_matches(search_term, [field], cutoff=0.6):
-                            matched.append((headword, entry_id))
-                    elif criteria == self.tr("Part of Speech"):
-                        field = (pos or "").lower()
-                        if difflib.get_close_matches(search_term, [field], cutoff=0.6):
-                            matched.append((headword, entry_id))
-                    elif criteria == self.tr("Variation"):
-                        field = (variation or "").lower()
-                        if difflib.get_close_matches(search_term, [field], cutoff=0.6):
-                            matched.append((headword, entry_id))
-                    else:  
-                        fields = [
-                            (headword or "").lower(),
-                            (pos or "").lower(),
-                            (variation or "").lower()
-                        ]
-                        if any(difflib.get_close_matches(search_term, [f], cutoff=0.6) for f in fields):
-                            matched.append((headword, entry_id))
-                
-               
-                for head, entry_id in sorted(matched, key=lambda x: x[0]):
-                    item = QListWidgetItem(head)
-                    item.setData(Qt.UserRole, entry_id)
-                    self.listbox_headwords.addItem(item)
-            
-            else:  
-                if criteria == self.tr("Headword"):
-                    query = "SELECT id, headword FROM Entry WHERE LOWER(headword) LIKE ?"
-                    param = ('%' + search_term + '%',)
-                elif criteria == self.tr("Part of Speech"):
-                    query = "SELECT id, headword FROM Entry WHERE LOWER(part_of_speech) LIKE ?"
-                    param = ('%' + search_term + '%',)
-                elif criteria == self.tr("Variation"):
-                    query = "SELECT id, headword FROM Entry WHERE LOWER(variation) LIKE ?"
-                    param = ('%' + search_term + '%',)
-                elif criteria == self.tr("Meaning"):
-                    query = '''SELECT Entry.id, Entry.headword FROM Entry 
-                               WHERE id IN (
-                                   SELECT entry_id FROM Senses WHERE LOWER(meaning) LIKE ?
-                               )'''
-                    param = ('%' + search_term + '%',)
-                else: 
-                    query = '''SELECT Entry.id, Entry.headword FROM Entry
-                               WHERE LOWER(headword) LIKE ? 
-                               OR LOWER(part_of_speech) LIKE ? 
-                               OR LOWER(variation) LIKE ?
-                               OR id IN (
-                                   SELECT entry_id FROM Senses WHERE LOWER(meaning) LIKE ?
-                               )'''
-                    param = ('%' + search_term + '%', '%' + search_term + '%', 
-                             '%' + search_term + '%', '%' + search_term + '%')
-                
-                self.db_manager.cursor.execute(query, param)
-                rows = self.db_manager.cursor.fetchall()
-                
-             
-                for row in rows:
-                    entry_id, headword = row[0], row[1]
-                    item = QListWidgetItem(headword)
-                    item.setData(Qt.UserRole, entry_id)
-                    self.listbox_headwords.addItem(item)
-        
-        except Exception as e:
-            logging.exception("Error in search_filter")
-
-    def populate_alphabet_combo(self):
-        self.alphabet_combo.blockSignals(True)
-        self.alphabet_combo.clear()
-        self.alphabet_combo.addItem(self.tr("All"))
+        fuzzy_index = None
+        if fuzzy:
+            fuzzy_index = self.db_manager.fuzzy_index
+            if not fuzzy_index.is_ready():
+                self.update_status(self.tr("Fuzzy search index is still being built, please try again shortly"))
+                return
+        self.search_is_fuzzy = fuzzy
+        self.search_stats_label.setText(self.tr("Searching..."))
+        self.search_requested.emit(SearchRequest(
+            self.search_generation,
+            self.db_manager.db_path,
+            search_term,
+            criterion,
+            fuzzy_index,
+            load_settings().get("fuzzy_max_results", 200),
+            self.db_manager.data_version
+        ))
+
+    def on_search_batch(self, generation, rows):
+        if generation != self.search_generation:
+            return
+        if self.search_is_fuzzy:
+            rows = [(entry_id, headword, self.tr("Edit distance: {distance}").format(distance=distance))
+                    for entry_id, headword, distance in rows]
+        self.headword_model.append_rows(rows)
 
-        if not self.db_manager.conn:
-            self.alphabet_combo.blockSignals(False)
+    def on_search_finished(self, generation, hits, elapsed, cached):
+        if generation != self.search_generation:
             return
+        if cached:
+            text = self.tr("{count} hits in {ms} ms (cached)")
+        else:
+            text = self.tr("{count} hits in {ms} ms")
+        self.search_stats_label.setText(text.format(count=hits, ms=int(elapsed * 1000)))
+        cache = self.search_worker.cache
+        self.search_cache_label.setText(
+            self.tr("Search cache: {rate}% hits").format(rate=int(cache.hit_rate * 100)))
+        self.search_cache_label.setToolTip(
+            self.tr("Search cache: {hits} hits, {misses} misses ({rate}% hit rate)").format(
+                hits=cache.hits, misses=cache.misses, rate=int(cache.hit_rate * 100))
+        )
 
-   
-        self.db_manager.cursor.execute("SELECT headword FROM Entry")
-        first_chars = {
-            row[0][0] for row in self.db_manager.cursor.fetchall()
-            if row[0]  
-        }
-        for ch in sorted(first_chars):
-            self.alphabet_combo.addItem(ch)
+    def on_search_failed(self, generation, message):
+        if generation != self.search_generation:
+            return
+        self.search_stats_label.clear()
+        logging.error("Error in search_filter: %s", message)
+        self.update_status(self.tr("Search failed: {error}").format(error=message))
 
-        self.alphabet_combo.blockSignals(False)
+    def populate_alphabet_combo(self):
+        """Bring the letter items in line with the Initials table, keeping the selection.
+
+        Item 0 is "All"; the others mirror Initials in the same order, so the
+        combo is patched item by item rather than rebuilt.
+        """
+        combo = self.alphabet_combo
+        combo.blockSignals(True)
+        if combo.count() == 0:
+            combo.addItem(self.tr("All"))
+        selected = combo.currentData()
+        counts = self.db_manager.initial_counts() if self.db_manager.conn else []
+        index = 1
+        for initial, count in counts:
+            while index < combo.count() and combo.itemData(index) < initial:
+                combo.removeItem(index)
+            label = f"{initial} ({count})"
+            if index < combo.count() and combo.itemData(index) == initial:
+                if combo.itemText(index) != label:
+                    combo.setItemText(index, label)
+            else:
+                combo.insertItem(index, label, initial)
+            index += 1
+        while combo.count() > index:
+            combo.removeItem(index)
+        combo.blockSignals(False)
+        if selected is not None and combo.currentData() != selected:
+            # The filtered letter has no entries left.
+            self.populate_headwords()
 
     def filter_by_alphabet(self, index):
         """Show only headwords whose first letter matches the dropdown selection."""
-        letter = self.alphabet_combo.currentText()
-        self.listbox_headwords.clear()
+        initial = self.alphabet_combo.currentData()
 
-        if letter == self.tr("All"):
+        if initial is None:
             return self.populate_headwords()
 
         if not self.db_manager.conn:
+            self.headword_model.clear()
             return
 
-      
-        query = "SELECT id, headword FROM Entry WHERE headword LIKE ? ORDER BY headword"
-        self.db_manager.cursor.execute(query, (letter + '%',))
-        for entry_id, headword in self.db_manager.cursor.fetchall():
-            item = QListWidgetItem(headword)
-            item.setData(Qt.UserRole, entry_id)
-            self.listbox_headwords.addItem(item)
-
+        self.headword_model.set_query(self.db_manager.conn, "initial = ?", (initial,))
         self.update_headword_count()
 
     def save_entry(self, auto=False):
@@ -521,6 +704,9 @@ class DictionaryApp(QMainWindow):
             'meanings': [m.strip() for m in self.entry_meaning.toPlainText().strip().splitlines() if m.strip()]
         }
 
+        if not self.check_not_writing(quiet=auto):
+            return
+
         if auto:
             if not fields['headword'] or not fields['meanings']:
                 return
@@ -551,28 +737,22 @@ class DictionaryApp(QMainWindow):
 
                 new_data = fields
                 command = UpdateEntryCommand(self.db_manager, self.current_entry_id, old_data, new_data)
-                self.undoStack.push(command)
+                self.pushing_command = True
+                try:
+                    self.undoStack.push(command)
+                finally:
+                    self.pushing_command = False
             else:
-                self.db_manager.cursor.execute(
-                    "INSERT INTO Entry (headword, variation, part_of_speech, notes) VALUES (?, ?, ?, ?)",
-                    (fields['headword'], fields['variation'], fields['pos'], fields['notes'])
-                )
-                entry_id = self.db_manager.cursor.lastrowid
+                entry_id = self.db_manager.insert_entry(fields)
                 self.current_entry_id = entry_id 
-                for meaning in fields['meanings']:
-                    self.db_manager.cursor.execute("INSERT INTO Senses (entry_id, meaning) VALUES (?, ?)",
-                                                   (entry_id, meaning))
                 self.db_manager.conn.commit()
+                self.db_manager.entries_inserted([entry_id])
 
             if not self.current_entry_id or auto:
-                self.db_manager.conn.commit()
                 self.update_status(self.tr("Autosaved"))
-                self.populate_headwords()
             else:
-                self.db_manager.conn.commit()
                 self.update_status(self.tr("Entry saved successfully"))
                 self.clear_fields()
-                self.populate_headwords()
         except Exception as e:
             QMessageBox.critical(
                 self,
@@ -582,12 +762,12 @@ class DictionaryApp(QMainWindow):
 
 
     def delete_entry(self):
-        selected_items = self.listbox_headwords.selectedItems()
-        if not selected_items:
+        selected_indexes = self.listbox_headwords.selectionModel().selectedIndexes()
+        if not selected_indexes:
             return
 
       
-        entries_to_delete = [item.data(Qt.UserRole) for item in selected_items]
+        entries_to_delete = [index.data(Qt.UserRole) for index in selected_indexes]
 
        
         reply = QMessageBox.question(
@@ -598,16 +778,14 @@ class DictionaryApp(QMainWindow):
             QMessageBox.No
         )
 
-        if reply == QMessageBox.Yes:
+        if reply == QMessageBox.Yes and self.check_not_writing():
             try:
                
                 for entry_id in entries_to_delete:
                     self.db_manager.cursor.execute("DELETE FROM Senses WHERE entry_id=?", (entry_id,))
                     self.db_manager.cursor.execute("DELETE FROM Entry WHERE id=?", (entry_id,))
                 self.db_manager.conn.commit()
-
-                for item in selected_items:
-                    self.listbox_headwords.takeItem(self.listbox_headwords.row(item))
+                self.db_manager.entries_deleted(entries_to_delete)
 
                 self.update_status(self.tr("Deleted {} entries").format(len(entries_to_delete)))
                 self.clear_fields()
@@ -632,8 +810,7 @@ class DictionaryApp(QMainWindow):
 
     def update_headword_count(self):
         if self.db_manager.conn:
-            self.db_manager.cursor.execute("SELECT COUNT(*) FROM Entry")
-            total_count = self.db_manager.cursor.fetchone()[0]
+            total_count = self.db_manager.statistics()[0].get("entries", 0)
             self.status_label.setText(self.tr("Total Headwords: {count}").format(count=total_count))
 
 
@@ -655,8 +832,12 @@ class DictionaryApp(QMainWindow):
             )
             return
 
-        self.db_manager.cursor.execute("SELECT headword, COUNT(*) FROM Entry GROUP BY headword HAVING COUNT(*) > 1")
-        rows = self.db_manager.cursor.fetchall()
+        job = self.db_manager.find_duplicates()
+        job.succeeded.connect(self.on_duplicates_found)
+        job.failed.connect(lambda message: QMessageBox.critical(
+            self, self.tr("Error"), self.tr("Finding duplicates failed: {error}").format(error=message)))
+
+    def on_duplicates_found(self, rows):
         if rows:
             duplicates_text = ""
             for row in rows:
@@ -679,19 +860,49 @@ class DictionaryApp(QMainWindow):
 
 
     def create_database(self):
+        if not self.check_not_writing():
+            return
         db_name = self.db_manager.create_database(self)
         if db_name:
-            self.populate_headwords()
             self.add_to_recent_files(db_name)
 
 
     def load_database(self):
+        if not self.check_not_writing():
+            return
         db_name = self.db_manager.load_database(self)
         if db_name:
-            self.populate_headwords()
             self.add_to_recent_files(db_name)
 
 
+    def backup_now(self):
+        if not self.db_manager.conn:
+            QMessageBox.warning(self, self.tr("Database Error"),
+                                self.tr("Please create or load a database first."))
+            return
+        if self.db_manager.backup_database(force=True):
+            self.update_status(self.tr("Backing up..."))
+
+
+    def restore_backup(self):
+        if not self.db_manager.conn:
+            QMessageBox.warning(self, self.tr("Database Error"),
+                                self.tr("Please create or load a database first."))
+            return
+        if not self.check_not_writing():
+            return
+        job = self.db_manager.restore_database(self)
+        if job is None:
+            return
+
+        def on_succeeded(result):
+            self.undoStack.clear()
+            self.clear_fields()
+
+        self.update_status(self.tr("Restoring backup..."))
+        job.succeeded.connect(on_succeeded)
+
+
     def export_csv(self):
         self.import_export_manager.export_csv(self)
 
@@ -701,21 +912,35 @@ class DictionaryApp(QMainWindow):
 
 
     def import_csv(self):
-        progress = QProgressDialog(self.tr("Importing CSV..."), self.tr("Cancel"), 0, 100, self)
-        progress.setWindowModality(Qt.WindowModal)
-        progress.show()
-        self.import_export_manager.import_csv(self)
-        self.populate_headwords()
-        progress.close()
+        if self.check_not_writing():
+            self.import_export_manager.import_csv(self)
 
 
     def import_json(self):
-        progress = QProgressDialog(self.tr("Importing JSON..."), self.tr("Cancel"), 0, 100, self)
-        progress.setWindowModality(Qt.WindowModal)
-        progress.show()
-        self.import_export_manager.import_json(self)
-        self.populate_headwords()
-        progress.close()
+        if self.check_not_writing():
+            self.import_export_manager.import_json(self)
+
+
+    def export_jsonl(self):
+        self.import_export_manager.export_jsonl(self)
+
+
+    def import_jsonl(self):
+        if self.check_not_writing():
+            self.import_export_manager.import_jsonl(self)
+
+
+    def export_lookup(self):
+        self.import_export_manager.export_lookup(self)
+
+
+    def export_delta(self):
+        self.import_export_manager.export_delta(self)
+
+
+    def apply_delta(self):
+        if self.check_not_writing():
+            self.import_export_manager.apply_delta(self)
 
 
     def show_about(self):
@@ -742,6 +967,8 @@ class DictionaryApp(QMainWindow):
                               "CTRL+SHIFT+J  - Import JSON\n"
                               "CTRL+ALT+C    - Export CSV\n"
                               "CTRL+ALT+J    - Export JSON\n"
+                              "CTRL+SHIFT+L  - Import JSON Lines\n"
+                              "CTRL+ALT+L    - Export JSON Lines\n"
                               "CTRL+ALT+P    - Export PDF\n"
                               "CTRL+[        - Toggle Left Panel\n"
                               "CTRL+]        - Toggle Right Panel\n"
@@ -846,6 +1073,11 @@ class DictionaryApp(QMainWindow):
         self.export_csv_action.setText(self.tr("Export CSV"))
         self.import_json_action.setText(self.tr("Import JSON"))
         self.export_json_action.setText(self.tr("Export JSON"))
+        self.import_jsonl_action.setText(self.tr("Import JSON Lines"))
+        self.export_jsonl_action.setText(self.tr("Export JSON Lines"))
+        self.export_lookup_action.setText(self.tr("Export Lookup File"))
+        self.export_delta_action.setText(self.tr("Export Delta"))
+        self.apply_delta_action.setText(self.tr("Apply Delta"))
         self.export_pdf_action.setText(self.tr("Publish PDF"))
         self.undo_action.setText(self.tr("Undo"))
         self.redo_action.setText(self.tr("Redo"))
@@ -859,7 +1091,19 @@ class DictionaryApp(QMainWindow):
         self.fullscreen_action.setText(self.tr("Fullscreen"))
         self.dictionary_help_action.setText(self.tr("Help with Dictionary making"))
         self.database_stats_action.setText(self.tr("Database Statistics"))
+        self.recompute_stats_action.setText(self.tr("Recompute Statistics"))
+        self.substring_index_action.setText(self.tr("Substring Search Index"))
+        self.strip_diacritics_action.setText(self.tr("Ignore Diacritics When Matching"))
         self.autosave_interval_action.setText(self.tr("Set Autosave Interval"))
+        self.fuzzy_distance_action.setText(self.tr("Set Fuzzy Search Distance"))
+        self.backup_interval_action.setText(self.tr("Set Backup Interval"))
+        self.backup_retention_action.setText(self.tr("Set Backups to Keep"))
+        self.compact_json_action.setText(self.tr("Compact JSON Export"))
+        self.db_profile_menu.setTitle(self.tr("Database Profile"))
+        self.editing_profile_action.setText(self.tr("Editing"))
+        self.bulk_profile_action.setText(self.tr("Bulk Import"))
+        self.backup_now_action.setText(self.tr("Back Up Now"))
+        self.restore_backup_action.setText(self.tr("Restore Backup"))
         self.exit_action.setText(self.tr("Exit"))
         self.preferences_menu.setTitle(self.tr("Preferences"))
         self.theme_menu.setTitle(self.tr("Theme"))
@@ -880,6 +1124,8 @@ class DictionaryApp(QMainWindow):
         self.about_action.setText(self.tr("About"))
         self.fuzzy_search_checkbox.setText(self.tr("Fuzzy Search"))
         self.fuzzy_search_checkbox.setToolTip(self.tr("Check for approximate matches"))
+        self.instant_search_checkbox.setText(self.tr("Search as you type"))
+        self.instant_search_checkbox.setToolTip(self.tr("Update results while typing"))
         self.entry_search.setToolTip(self.tr("Enter search term"))
         self.search_label.setText(self.tr("Search:"))
         self.entries_label.setText(self.tr("Entries"))
@@ -916,8 +1162,8 @@ class DictionaryApp(QMainWindow):
         return super().eventFilter(obj, event)
 
     def delete_selected_entries(self):
-        selected_items = self.listbox_headwords.selectedItems()
-        if not selected_items:
+        selected_indexes = self.listbox_headwords.selectionModel().selectedIndexes()
+        if not selected_indexes:
             return
 
         reply = QMessageBox.question(
@@ -927,20 +1173,22 @@ class DictionaryApp(QMainWindow):
             QMessageBox.Yes | QMessageBox.No,
             QMessageBox.No
         )
-        if reply == QMessageBox.Yes:
+        if reply == QMessageBox.Yes and self.check_not_writing():
             try:
-                for item in selected_items:
-                    headword = item.text()
+                deleted_ids = []
+                for index in selected_indexes:
+                    headword = index.data(Qt.DisplayRole)
                     self.db_manager.cursor.execute("SELECT id FROM Entry WHERE headword=?", (headword,))
                     rows = self.db_manager.cursor.fetchall()
                     for row in rows:
                         entry_id = row[0]
                         self.db_manager.cursor.execute("DELETE FROM Senses WHERE entry_id=?", (entry_id,))
                         self.db_manager.cursor.execute("DELETE FROM Entry WHERE id=?", (entry_id,))
+                        deleted_ids.append(entry_id)
                 self.db_manager.conn.commit()
+                self.db_manager.entries_deleted(deleted_ids)
                 self.update_status(self.tr("Entry deleted"))
                 self.clear_fields()
-                self.populate_headwords()
             except Exception as e:
                 QMessageBox.critical(
                     self,
@@ -952,11 +1200,35 @@ class DictionaryApp(QMainWindow):
         if self.entry_headword.text().strip() and self.entry_meaning.toPlainText().strip():
             self.save_entry(auto=True)
 
-    def refresh_headwords_panel(self):
-        self.populate_headwords()
-        self.listbox_headwords.clearSelection()
-        self.clear_fields()
-        self.populate_headwords()
+    def on_entries_updated(self, entry_ids):
+        self.entry_cache.discard(entry_ids)
+        self.applying_changes = True
+        try:
+            self.headword_model.update_ids(entry_ids)
+        finally:
+            self.applying_changes = False
+        self.update_headword_count()
+        self.populate_alphabet_combo()
+
+    def on_entries_deleted(self, entry_ids):
+        self.entry_cache.discard(entry_ids)
+        self.applying_changes = True
+        try:
+            self.headword_model.remove_ids(entry_ids)
+        finally:
+            self.applying_changes = False
+        self.update_headword_count()
+        self.populate_alphabet_combo()
+        if self.current_entry_id in entry_ids:
+            self.clear_fields()
+
+    def on_undo_index_changed(self, index):
+        # Undo and redo rewrite entries behind the editor; show what is stored now.
+        # A save that pushes a command already shows its own data.
+        if self.pushing_command or not self.current_entry_id or not self.db_manager.conn:
+            return
+        if not self.load_entry(self.current_entry_id):
+            self.clear_fields()
 
     def set_autosave_interval(self):
         current_interval = self.autosave_interval
@@ -978,6 +1250,64 @@ class DictionaryApp(QMainWindow):
                 self.tr("Autosave interval set to {interval} seconds").format(interval=new_interval)
             )
 
+    def set_backup_interval(self):
+        new_interval, ok = QInputDialog.getInt(
+            self,
+            self.tr("Backups"),
+            self.tr("Back up the open dictionary every ... minutes (5-1440)"),
+            value=self.backup_interval,
+            min=5,
+            max=1440
+        )
+        if ok:
+            self.backup_interval = new_interval
+            settings = load_settings()
+            settings["backup_interval"] = new_interval
+            save_settings(settings)
+            self.backup_timer.start(new_interval * 60 * 1000)
+            self.update_status(
+                self.tr("Backup interval set to {interval} minutes").format(interval=new_interval)
+            )
+
+    def set_backup_retention(self):
+        retention = self.db_manager.backup_retention()
+        keep, ok = QInputDialog.getInt(
+            self,
+            self.tr("Backups"),
+            self.tr("Number of most recent backups to keep (hourly and daily backups are kept as well)"),
+            value=retention["keep"],
+            min=1,
+            max=1000
+        )
+        if ok:
+            settings = load_settings()
+            settings.setdefault("backup_retention", {})["keep"] = keep
+            save_settings(settings)
+            self.update_status(self.tr("Keeping the {count} most recent backups").format(count=keep))
+
+    def set_fuzzy_distance(self):
+        new_distance, ok = QInputDialog.getInt(
+            self,
+            self.tr("Fuzzy Search"),
+            self.tr("Maximum number of typos a fuzzy match may contain (1-3)"),
+            value=self.db_manager.fuzzy_index.max_distance,
+            min=1,
+            max=3
+        )
+        if ok:
+            settings = load_settings()
+            settings["fuzzy_max_distance"] = new_distance
+            save_settings(settings)
+            self.db_manager.set_fuzzy_distance(new_distance)
+            self.update_status(
+                self.tr("Fuzzy search distance set to {distance}").format(distance=new_distance)
+            )
+
+    def toggle_compact_json(self):
+        settings = load_settings()
+        settings["json_export_compact"] = self.compact_json_action.isChecked()
+        save_settings(settings)
+
     def copy_text(self):
         widget = QApplication.focusWidget()
         if widget is not None and hasattr(widget, 'copy'):
@@ -1020,6 +1350,16 @@ class DictionaryApp(QMainWindow):
                 event.accept()
             else:
                 event.ignore()
+                return
+        self.db_manager.jobs.stop()
+        self.search_worker.cancel(self.search_generation + 1)
+        self.search_thread.quit()
+        self.search_thread.wait()
+        self.search_worker.close()
+        self.prefetch_thread.quit()
+        self.prefetch_thread.wait()
+        self.prefetch_worker.close()
+        self.db_manager.close_db()
 
     def recent_files(self):
         return self.settings.value("recentFiles", [], type=list)
@@ -1059,6 +1399,8 @@ class DictionaryApp(QMainWindow):
             self.save_recent_files(paths)
             self.update_recent_menu()
             return
+        if not self.check_not_writing():
+            return
 
         self.db_manager.load_database(self, path)
         self.populate_headwords()
@@ -1066,6 +1408,8 @@ class DictionaryApp(QMainWindow):
         self.update_status(self.tr(f"Opened {path}"))
 
 if __name__ == "__main__":
+    # Import worker processes start this executable again when frozen.
+    multiprocessing.freeze_support()
     app = QApplication(sys.argv)
     window = DictionaryApp()
     window.show()
@@ -0,0 +1,92 @@
+import sqlite3
+import unicodedata
+
+# Canonical combining class of viramas. They are combining marks, but removing
+# one changes the consonant cluster of Indic words, so they are never stripped.
+_VIRAMA = 9
+_ZWJ, _ZWNJ = "\u200d", "\u200c"
+_MARKS = ("Mn", "Mc", "Me")
+
+# Columns written by backfill_keys, in the order entry_keys returns them.
+KEY_COLUMNS = ("headword_key", "variation_key", "initial")
+
+STRIP_DIACRITICS = "strip_diacritics"     # Meta key, "1" or "0"
+
+
+def match_key(text, strip_diacritics=False):
+    """Normalize text for equality matching: NFKC, casefold, single spaces.
+
+    With strip_diacritics, combining marks such as accents or Arabic harakat are
+    removed too, so "café" and "cafe" get the same key.
+    """
+    if text is None:
+        return None
+    text = unicodedata.normalize("NFKC", text).casefold()
+    if strip_diacritics:
+        text = unicodedata.normalize("NFC", "".join(
+            c for c in unicodedata.normalize("NFD", text)
+            if unicodedata.combining(c) in (0, _VIRAMA)
+        ))
+    return " ".join(text.split())
+
+
+def first_grapheme(text):
+    """Return the first user-perceived character of text, or None if it is empty.
+
+    A base character keeps the marks that follow it (vowel signs, accents,
+    joiners), and a virama joins it to the next letter, so "कि" or "क्ष"
+    stay whole instead of being cut after the first code point.
+    """
+    if not text:
+        return None
+    end = 1
+    while end < len(text):
+        char, previous = text[end], text[end - 1]
+        if (unicodedata.category(char) in _MARKS or char in (_ZWJ, _ZWNJ)
+                or previous == _ZWJ
+                or (unicodedata.combining(previous) == _VIRAMA and unicodedata.category(char) == "Lo")):
+            end += 1
+        else:
+            break
+    return text[:end]
+
+
+def entry_keys(headword, variation, strip_diacritics=False):
+    """Return (headword_key, variation_key, initial) for an entry.
+
+    The initial is the first grapheme of the headword key, so the alphabet
+    filter ignores case (and diacritics, when they are stripped).
+    """
+    headword_key = match_key(headword, strip_diacritics)
+    return headword_key, match_key(variation, strip_diacritics), first_grapheme(headword_key)
+
+
+def strip_diacritics_setting(conn):
+    """Whether this database's keys are built with diacritics stripped."""
+    try:
+        row = conn.execute("SELECT value FROM Meta WHERE key = ?", (STRIP_DIACRITICS,)).fetchone()
+    except sqlite3.OperationalError:
+        return False
+    return bool(row) and row[0] == "1"
+
+
+def backfill_keys(cursor, strip_diacritics=False, batch_size=5000, columns=KEY_COLUMNS):
+    """Recompute the key columns of every entry, a batch of ids at a time.
+
+    columns is a prefix of KEY_COLUMNS; migrations that predate a column pass
+    a shorter one.
+    """
+    assignments = ", ".join(f"{column} = ?" for column in columns)
+    last_id = -1
+    while True:
+        cursor.execute(
+            "SELECT id, headword, variation FROM Entry WHERE id > ? ORDER BY id LIMIT ?",
+            (last_id, batch_size))
+        rows = cursor.fetchall()
+        if not rows:
+            return
+        cursor.executemany(
+            f"UPDATE Entry SET {assignments} WHERE id = ?",
+            [entry_keys(headword, variation, strip_diacritics)[:len(columns)] + (entry_id,)
+             for entry_id, headword, variation in rows])
+        last_id = rows[-1][0]
@@ -0,0 +1,411 @@
+import sqlite3
+import logging
+
+from match_keys import backfill_keys, strip_diacritics_setting, KEY_COLUMNS
+
+
+class MigrationError(Exception):
+    pass
+
+
+def _create_base_tables(cursor):
+    cursor.execute('''CREATE TABLE IF NOT EXISTS Entry (
+        id INTEGER PRIMARY KEY,
+        headword TEXT,
+        variation TEXT,
+        part_of_speech TEXT,
+        notes TEXT)''')
+    cursor.execute('''CREATE TABLE IF NOT EXISTS Senses (
+        id INTEGER PRIMARY KEY,
+        entry_id INTEGER,
+        meaning TEXT,
+        FOREIGN KEY(entry_id) REFERENCES Entry(id))''')
+
+
+def _add_lookup_indexes(cursor):
+    # Senses(entry_id) serves every "meanings of this entry" lookup, Entry(headword)
+    # serves the sorted headword list and the normalized index serves duplicate matching.
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_senses_entry_id ON Senses(entry_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_entry_headword ON Entry(headword)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_entry_headword_norm ON Entry(LOWER(TRIM(headword)))")
+
+
+def fts5_available(conn):
+    try:
+        conn.execute("CREATE VIRTUAL TABLE temp.fts5_probe USING fts5(x)")
+        conn.execute("DROP TABLE temp.fts5_probe")
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+
+def _table_exists(cursor, name):
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE name=?", (name,))
+    return cursor.fetchone() is not None
+
+
+SEARCH_INDEX_ROW = '''
+    SELECT Entry.id, Entry.headword, Entry.variation, Entry.part_of_speech, Entry.notes,
+           (SELECT group_concat(meaning, char(10)) FROM Senses WHERE entry_id = Entry.id)
+    FROM Entry'''
+
+
+_SEARCH_REFRESH_ROW = f'''
+            INSERT INTO EntrySearch (rowid, headword, variation, part_of_speech, notes, meanings)
+            {SEARCH_INDEX_ROW} WHERE Entry.id = {{id}};'''
+
+
+def ensure_search_index(cursor):
+    """Create and fill the EntrySearch FTS5 table if this SQLite build supports it.
+
+    EntrySearch keeps one row per Entry (rowid = Entry.id) with all meanings joined
+    by newlines. Triggers keep it in step with every write to Entry and Senses.
+    """
+    if _table_exists(cursor, "EntrySearch"):
+        return True
+    if not fts5_available(cursor.connection):
+        logging.warning("SQLite was built without FTS5; full-text search is disabled")
+        return False
+    cursor.execute('''CREATE VIRTUAL TABLE EntrySearch USING fts5(
+        headword, variation, part_of_speech, notes, meanings,
+        tokenize = 'unicode61 remove_diacritics 2')''')
+    refresh_meanings = '''
+            UPDATE EntrySearch SET meanings =
+                (SELECT group_concat(meaning, char(10)) FROM Senses WHERE entry_id = {id})
+            WHERE rowid = {id};'''
+    triggers = [
+        ("EntrySearch_entry_insert", "AFTER INSERT ON Entry", _SEARCH_REFRESH_ROW.format(id="NEW.id")),
+        ("EntrySearch_entry_update", "AFTER UPDATE ON Entry",
+         "DELETE FROM EntrySearch WHERE rowid = OLD.id;" + _SEARCH_REFRESH_ROW.format(id="NEW.id")),
+        ("EntrySearch_entry_delete", "AFTER DELETE ON Entry", "DELETE FROM EntrySearch WHERE rowid = OLD.id;"),
+        ("EntrySearch_sense_insert", "AFTER INSERT ON Senses", refresh_meanings.format(id="NEW.entry_id")),
+        ("EntrySearch_sense_update", "AFTER UPDATE ON Senses",
+         refresh_meanings.format(id="OLD.entry_id") + refresh_meanings.format(id="NEW.entry_id")),
+        ("EntrySearch_sense_delete", "AFTER DELETE ON Senses", refresh_meanings.format(id="OLD.entry_id")),
+    ]
+    # One statement per execute(): executescript() would commit the migration's transaction.
+    for name, event, body in triggers:
+        cursor.execute(f"CREATE TRIGGER {name} {event} BEGIN {body} END")
+    cursor.execute(f'''
+        INSERT INTO EntrySearch (rowid, headword, variation, part_of_speech, notes, meanings)
+        {SEARCH_INDEX_ROW}''')
+    return True
+
+
+# Combining marks (M*) are word characters too: unicode61's default categories
+# split Indic words at every vowel sign and virama.
+SEARCH_TOKENIZE = "unicode61 remove_diacritics 2 categories 'L* N* Co M*'"
+
+
+def _index_combining_marks(cursor):
+    """Rebuild EntrySearch with SEARCH_TOKENIZE; its triggers are on Entry and Senses and stay."""
+    if not _table_exists(cursor, "EntrySearch"):
+        return
+    cursor.execute("DROP TABLE EntrySearch")
+    tokenize = SEARCH_TOKENIZE.replace("'", "''")
+    cursor.execute(f'''CREATE VIRTUAL TABLE EntrySearch USING fts5(
+        headword, variation, part_of_speech, notes, meanings,
+        tokenize = '{tokenize}')''')
+    cursor.execute(f'''
+        INSERT INTO EntrySearch (rowid, headword, variation, part_of_speech, notes, meanings)
+        {SEARCH_INDEX_ROW}''')
+
+
+def trigram_available(conn):
+    try:
+        conn.execute("CREATE VIRTUAL TABLE temp.trigram_probe USING fts5(x, tokenize='trigram')")
+        conn.execute("DROP TABLE temp.trigram_probe")
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+
+TRIGRAM_TRIGGERS = ("EntryTrigram_insert", "EntryTrigram_update", "EntryTrigram_delete")
+
+
+def ensure_trigram_index(cursor):
+    """Create the optional EntryTrigram substring index over headword, variation and part of speech.
+
+    It is an external-content FTS5 table on Entry, so it stores only the trigram
+    index itself; case folding is Unicode-aware, unlike SQLite's LOWER().
+    """
+    if _table_exists(cursor, "EntryTrigram"):
+        return True
+    if not trigram_available(cursor.connection):
+        logging.warning("SQLite has no trigram tokenizer; substring search will scan the table")
+        return False
+    cursor.execute('''CREATE VIRTUAL TABLE EntryTrigram USING fts5(
+        headword, variation, part_of_speech,
+        content = 'Entry', content_rowid = 'id', tokenize = 'trigram')''')
+    insert_new = '''INSERT INTO EntryTrigram (rowid, headword, variation, part_of_speech)
+        VALUES (NEW.id, NEW.headword, NEW.variation, NEW.part_of_speech);'''
+    delete_old = '''INSERT INTO EntryTrigram (EntryTrigram, rowid, headword, variation, part_of_speech)
+        VALUES ('delete', OLD.id, OLD.headword, OLD.variation, OLD.part_of_speech);'''
+    cursor.execute(f"CREATE TRIGGER EntryTrigram_insert AFTER INSERT ON Entry BEGIN {insert_new} END")
+    cursor.execute(f'''CREATE TRIGGER EntryTrigram_update
+        AFTER UPDATE OF headword, variation, part_of_speech ON Entry BEGIN {delete_old} {insert_new} END''')
+    cursor.execute(f"CREATE TRIGGER EntryTrigram_delete AFTER DELETE ON Entry BEGIN {delete_old} END")
+    cursor.execute("INSERT INTO EntryTrigram (EntryTrigram) VALUES ('rebuild')")
+    return True
+
+
+def _trigram_index_on_request(cursor):
+    """Nothing to build: EntryTrigram costs a full pass over Entry and a trigger on
+    every write, so it is only created when the user enables it (Tools >
+    Substring Search Index). Without it substring searches scan with casefold().
+    """
+
+
+def drop_trigram_index(cursor):
+    for trigger in TRIGRAM_TRIGGERS:
+        cursor.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    cursor.execute("DROP TABLE IF EXISTS EntryTrigram")
+
+
+def _add_match_keys(cursor):
+    """Add the Unicode-normalized headword_key and variation_key columns (see match_keys)."""
+    cursor.execute("CREATE TABLE IF NOT EXISTS Meta (key TEXT PRIMARY KEY, value TEXT)")
+    cursor.execute("ALTER TABLE Entry ADD COLUMN headword_key TEXT")
+    cursor.execute("ALTER TABLE Entry ADD COLUMN variation_key TEXT")
+    if _table_exists(cursor, "EntrySearch"):
+        # Rewrite the search row only when an indexed column changes, not for key updates.
+        cursor.execute("DROP TRIGGER IF EXISTS EntrySearch_entry_update")
+        cursor.execute(f'''CREATE TRIGGER EntrySearch_entry_update
+            AFTER UPDATE OF headword, variation, part_of_speech, notes ON Entry BEGIN
+            DELETE FROM EntrySearch WHERE rowid = OLD.id; {_SEARCH_REFRESH_ROW.format(id="NEW.id")} END''')
+    backfill_keys(cursor, columns=KEY_COLUMNS[:2])
+    cursor.execute("CREATE INDEX idx_entry_headword_key ON Entry(headword_key)")
+    cursor.execute("CREATE INDEX idx_entry_variation_key ON Entry(variation_key)")
+    # Duplicate matching uses headword_key now.
+    cursor.execute("DROP INDEX IF EXISTS idx_entry_headword_norm")
+
+
+# Count an entry's initial in or out of Initials; {row} is NEW or OLD.
+_INITIALS_COUNT_UP = '''
+            INSERT INTO Initials (initial, count) SELECT {row}.initial, 1 WHERE {row}.initial IS NOT NULL
+            ON CONFLICT (initial) DO UPDATE SET count = count + 1;'''
+_INITIALS_COUNT_DOWN = '''
+            UPDATE Initials SET count = count - 1 WHERE initial = {row}.initial;
+            DELETE FROM Initials WHERE initial = {row}.initial AND count <= 0;'''
+
+
+def _add_initials(cursor):
+    """Add Entry.initial (the first grapheme of headword_key) and the Initials count table.
+
+    Initials holds one row per initial with its number of entries, kept current
+    by triggers, so the alphabet filter lists letters and counts without
+    scanning Entry; idx_entry_initial serves the filtered headword list.
+    """
+    cursor.execute("ALTER TABLE Entry ADD COLUMN initial TEXT")
+    backfill_keys(cursor, strip_diacritics_setting(cursor.connection))
+    cursor.execute("CREATE INDEX idx_entry_initial ON Entry(initial, headword)")
+    cursor.execute('''CREATE TABLE Initials (
+        initial TEXT PRIMARY KEY,
+        count INTEGER NOT NULL) WITHOUT ROWID''')
+    cursor.execute('''
+        INSERT INTO Initials (initial, count)
+        SELECT initial, COUNT(*) FROM Entry WHERE initial IS NOT NULL GROUP BY initial''')
+    cursor.execute(f'''CREATE TRIGGER Initials_insert AFTER INSERT ON Entry BEGIN
+        {_INITIALS_COUNT_UP.format(row="NEW")} END''')
+    cursor.execute(f'''CREATE TRIGGER Initials_update AFTER UPDATE OF initial ON Entry
+        WHEN OLD.initial IS NOT NEW.initial BEGIN
+        {_INITIALS_COUNT_UP.format(row="NEW")} {_INITIALS_COUNT_DOWN.format(row="OLD")} END''')
+    cursor.execute(f'''CREATE TRIGGER Initials_delete AFTER DELETE ON Entry BEGIN
+        {_INITIALS_COUNT_DOWN.format(row="OLD")} END''')
+
+
+# Whether the headword key {key} is shared by exactly {n} entries; LIMIT keeps it
+# to a couple of index probes however large the group is.
+_KEY_COUNT_IS = "(SELECT COUNT(*) FROM (SELECT 1 FROM Entry WHERE headword_key = {key} LIMIT 3)) = {n}"
+
+_POS_COUNT_UP = '''
+            INSERT INTO PosCounts (part_of_speech, count) VALUES (COALESCE({row}.part_of_speech, ''), 1)
+            ON CONFLICT (part_of_speech) DO UPDATE SET count = count + 1;'''
+_POS_COUNT_DOWN = '''
+            UPDATE PosCounts SET count = count - 1 WHERE part_of_speech = COALESCE({row}.part_of_speech, '');
+            DELETE FROM PosCounts WHERE part_of_speech = COALESCE({row}.part_of_speech, '') AND count <= 0;'''
+
+
+def rebuild_counts(cursor):
+    """Recompute Stats, PosCounts and Initials from Entry and Senses in bulk."""
+    cursor.execute("DELETE FROM Stats")
+    cursor.execute("INSERT INTO Stats (name, value) SELECT 'entries', COUNT(*) FROM Entry")
+    cursor.execute("INSERT INTO Stats (name, value) SELECT 'senses', COUNT(*) FROM Senses")
+    cursor.execute('''
+        INSERT INTO Stats (name, value) SELECT 'duplicate_groups', COUNT(*) FROM (
+            SELECT 1 FROM Entry WHERE headword_key IS NOT NULL
+            GROUP BY headword_key HAVING COUNT(*) > 1)''')
+    cursor.execute("DELETE FROM PosCounts")
+    cursor.execute('''
+        INSERT INTO PosCounts (part_of_speech, count)
+        SELECT COALESCE(part_of_speech, ''), COUNT(*) FROM Entry GROUP BY 1''')
+    cursor.execute("DELETE FROM Initials")
+    cursor.execute('''
+        INSERT INTO Initials (initial, count)
+        SELECT initial, COUNT(*) FROM Entry WHERE initial IS NOT NULL GROUP BY initial''')
+
+
+def _add_stats(cursor):
+    """Add the Stats and PosCounts tables, kept current by triggers.
+
+    Stats holds the entry and sense totals and the number of duplicate groups
+    (headword keys shared by more than one entry); PosCounts holds the number
+    of entries per part of speech. Reading them is O(1) however large the
+    dictionary grows.
+    """
+    cursor.execute("CREATE TABLE Stats (name TEXT PRIMARY KEY, value INTEGER NOT NULL) WITHOUT ROWID")
+    cursor.execute('''CREATE TABLE PosCounts (
+        part_of_speech TEXT PRIMARY KEY,
+        count INTEGER NOT NULL) WITHOUT ROWID''')
+    rebuild_counts(cursor)
+    triggers = [
+        ("Stats_entry_insert", "AFTER INSERT ON Entry", f'''
+            UPDATE Stats SET value = value + 1 WHERE name = 'entries';
+            UPDATE Stats SET value = value + 1
+            WHERE name = 'duplicate_groups' AND {_KEY_COUNT_IS.format(key="NEW.headword_key", n=2)};
+            {_POS_COUNT_UP.format(row="NEW")}'''),
+        ("Stats_entry_delete", "AFTER DELETE ON Entry", f'''
+            UPDATE Stats SET value = value - 1 WHERE name = 'entries';
+            UPDATE Stats SET value = value - 1
+            WHERE name = 'duplicate_groups' AND {_KEY_COUNT_IS.format(key="OLD.headword_key", n=1)};
+            {_POS_COUNT_DOWN.format(row="OLD")}'''),
+        ("Stats_key_update",
+         "AFTER UPDATE OF headword_key ON Entry WHEN OLD.headword_key IS NOT NEW.headword_key", f'''
+            UPDATE Stats SET value = value + 1
+            WHERE name = 'duplicate_groups' AND {_KEY_COUNT_IS.format(key="NEW.headword_key", n=2)};
+            UPDATE Stats SET value = value - 1
+            WHERE name = 'duplicate_groups' AND {_KEY_COUNT_IS.format(key="OLD.headword_key", n=1)};'''),
+        ("Stats_pos_update",
+         "AFTER UPDATE OF part_of_speech ON Entry "
+         "WHEN COALESCE(OLD.part_of_speech, '') != COALESCE(NEW.part_of_speech, '')",
+         _POS_COUNT_UP.format(row="NEW") + _POS_COUNT_DOWN.format(row="OLD")),
+        ("Stats_sense_insert", "AFTER INSERT ON Senses", "UPDATE Stats SET value = value + 1 WHERE name = 'senses';"),
+        ("Stats_sense_delete", "AFTER DELETE ON Senses", "UPDATE Stats SET value = value - 1 WHERE name = 'senses';"),
+    ]
+    for name, event, body in triggers:
+        cursor.execute(f"CREATE TRIGGER {name} {event} BEGIN {body} END")
+
+
+def suspend_triggers(cursor, names):
+    """Drop whichever of the named triggers exist and return their (name, sql) rows.
+
+    Bulk writers use this to replace per-row index maintenance with a few
+    set-based statements. It must run inside the caller's transaction, so a
+    rollback brings the triggers back; call restore_triggers() before commit.
+    """
+    cursor.execute(
+        "SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND name IN (%s)"
+        % ",".join("?" * len(names)), tuple(names))
+    saved = cursor.fetchall()
+    for name, _ in saved:
+        cursor.execute(f"DROP TRIGGER {name}")
+    return saved
+
+
+def restore_triggers(cursor, saved):
+    for _, sql in saved:
+        cursor.execute(sql)
+
+
+# Upsert of an entry's EntryChanges row with the next change sequence number.
+RECORD_CHANGE = '''
+            INSERT INTO EntryChanges (entry_id, seq, deleted)
+            VALUES ({id}, (SELECT COALESCE(MAX(seq), 0) + 1 FROM EntryChanges), {deleted})
+            ON CONFLICT (entry_id) DO UPDATE SET seq = excluded.seq, deleted = excluded.deleted;'''
+
+# The same for every Entry id the query {ids} returns, numbered in id order.
+RECORD_CHANGES = '''
+    INSERT INTO EntryChanges (entry_id, seq, deleted)
+    SELECT id, (SELECT COALESCE(MAX(seq), 0) FROM EntryChanges) + ROW_NUMBER() OVER (ORDER BY id), 0
+    FROM Entry WHERE id IN ({ids})
+    ON CONFLICT (entry_id) DO UPDATE SET seq = excluded.seq, deleted = excluded.deleted'''
+
+
+def _add_change_tracking(cursor):
+    """Add EntryChanges, which numbers every change to an entry or its senses.
+
+    Each entry has one row holding the sequence number of its latest change
+    and whether that change deleted it, so deleted entries leave a tombstone.
+    Triggers keep it current on every write path; a delta export writes the
+    rows above a sequence number. Existing entries are numbered in id order.
+    Changes to the match keys alone are not recorded: they are derived data.
+    """
+    cursor.execute('''CREATE TABLE EntryChanges (
+        entry_id INTEGER PRIMARY KEY,
+        seq INTEGER NOT NULL,
+        deleted INTEGER NOT NULL DEFAULT 0)''')
+    cursor.execute("CREATE UNIQUE INDEX idx_entry_changes_seq ON EntryChanges(seq)")
+    cursor.execute("INSERT INTO EntryChanges (entry_id, seq) SELECT id, ROW_NUMBER() OVER (ORDER BY id) FROM Entry")
+    # A sense written after its entry was deleted must not revive the tombstone.
+    sense_deleted = "NOT EXISTS (SELECT 1 FROM Entry WHERE id = {id})"
+    triggers = [
+        ("EntryChanges_entry_insert", "AFTER INSERT ON Entry", RECORD_CHANGE.format(id="NEW.id", deleted=0)),
+        ("EntryChanges_entry_update", "AFTER UPDATE OF headword, variation, part_of_speech, notes ON Entry",
+         RECORD_CHANGE.format(id="NEW.id", deleted=0)),
+        ("EntryChanges_entry_delete", "AFTER DELETE ON Entry", RECORD_CHANGE.format(id="OLD.id", deleted=1)),
+        ("EntryChanges_sense_insert", "AFTER INSERT ON Senses",
+         RECORD_CHANGE.format(id="NEW.entry_id", deleted=sense_deleted.format(id="NEW.entry_id"))),
+        ("EntryChanges_sense_update", "AFTER UPDATE ON Senses",
+         RECORD_CHANGE.format(id="OLD.entry_id", deleted=sense_deleted.format(id="OLD.entry_id"))
+         + RECORD_CHANGE.format(id="NEW.entry_id", deleted=sense_deleted.format(id="NEW.entry_id"))),
+        ("EntryChanges_sense_delete", "AFTER DELETE ON Senses",
+         RECORD_CHANGE.format(id="OLD.entry_id", deleted=sense_deleted.format(id="OLD.entry_id"))),
+    ]
+    for name, event, body in triggers:
+        cursor.execute(f"CREATE TRIGGER {name} {event} BEGIN {body} END")
+
+
+def last_change(conn):
+    """The highest change sequence number in conn, 0 if nothing was recorded."""
+    return conn.execute("SELECT COALESCE(MAX(seq), 0) FROM EntryChanges").fetchone()[0]
+
+
+# Ordered (version, description, step) list. Each step runs inside its own
+# transaction and the database's PRAGMA user_version is bumped with it, so a
+# file is never left half-upgraded. Append new steps; never reorder or edit old ones.
+MIGRATIONS = [
+    (1, "base tables", _create_base_tables),
+    (2, "lookup indexes", _add_lookup_indexes),
+    (3, "full-text search index", ensure_search_index),
+    (4, "trigram substring index (built on request)", _trigram_index_on_request),
+    (5, "normalized match keys", _add_match_keys),
+    (6, "initial letter index", _add_initials),
+    (7, "statistics tables", _add_stats),
+    (8, "change tracking", _add_change_tracking),
+    (9, "full-text search of combining marks", _index_combining_marks),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def get_schema_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn):
+    """Upgrade conn to SCHEMA_VERSION and return the list of applied versions."""
+    current = get_schema_version(conn)
+    if current > SCHEMA_VERSION:
+        raise MigrationError(
+            f"Database schema version {current} is newer than supported version {SCHEMA_VERSION}"
+        )
+    if conn.in_transaction:
+        conn.commit()
+    applied = []
+    cursor = conn.cursor()
+    for version, description, step in MIGRATIONS:
+        if version <= current:
+            continue
+        try:
+            cursor.execute("BEGIN")
+            step(cursor)
+            cursor.execute(f"PRAGMA user_version = {int(version)}")
+            conn.commit()
+        except sqlite3.Error:
+            conn.rollback()
+            logging.exception("Migration %s (%s) failed", version, description)
+            raise
+        logging.info("Applied migration %s: %s", version, description)
+        applied.append(version)
+    cursor.close()
+    return applied
@@ -0,0 +1,131 @@
+import io
+import os
+import logging
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from bulk_import import ImportReport, IMPORT_APPEND, import_writer, iter_csv_rows, iter_jsonl_rows
+from match_keys import entry_keys, strip_diacritics_setting
+
+# Bytes of the file handed to a worker at a time, extended to the next record boundary.
+BLOCK_SIZE = 1 << 20
+# Below this size starting the worker processes costs more than it saves.
+PARALLEL_MIN_BYTES = 8 << 20
+MAX_WORKERS = 8
+
+
+def default_workers():
+    """Parser processes to use: one core is left to the writer."""
+    return max(1, min(MAX_WORKERS, (os.cpu_count() or 1) - 1))
+
+
+def _record_end(data, quoted):
+    """Index just past the last complete record in data, or 0 if there is none.
+
+    With quoted (CSV), a newline only ends a record outside double quotes,
+    which is where it has an even number of quotes before it; csv.writer
+    quotes every field that contains a quote, so that holds for exports.
+    """
+    end = data.rfind(b"\n")
+    if quoted:
+        while end >= 0 and data.count(b'"', 0, end) % 2:
+            end = data.rfind(b"\n", 0, end)
+    return end + 1
+
+
+def split_records(f, first_line=2, block_size=BLOCK_SIZE, quoted=False):
+    """Yield (first line number, bytes) for blocks of whole records read from the binary file f."""
+    rest = b""
+    while True:
+        data = f.read(block_size)
+        if not data:
+            if rest.strip():
+                yield first_line, rest
+            return
+        data = rest + data
+        end = _record_end(data, quoted)
+        if not end:
+            rest = data
+            continue
+        block, rest = data[:end], data[end:]
+        yield first_line, block
+        first_line += block.count(b"\n")
+
+
+def parse_block(kind, header, block, first_line, strip_diacritics):
+    """Parse one block of a "csv" or "jsonl" file in a worker process.
+
+    The header line is parsed again in front of the block so the readers from
+    bulk_import can be used as they are. Returns (rows, row count, errors)
+    with the rows ready for EntryWriter.add, match keys included, and with
+    line numbers counted from the start of the file.
+    """
+    report = ImportReport()
+    if kind == "csv":
+        rows = iter_csv_rows(io.StringIO((header + block).decode("utf-8"), newline=""), report)
+    else:
+        rows = iter_jsonl_rows(io.BytesIO(header + block), report)
+    shift = first_line - 2
+    rows = [(row[0] + shift,) + row[1:] + (entry_keys(row[1], row[2], strip_diacritics),) for row in rows]
+    return rows, report.rows, [(position + shift, message) for position, message in report.errors]
+
+
+def import_parallel(conn, f, kind, workers=None, progress=None, chunk_size=5000, block_size=BLOCK_SIZE,
+                    policy=IMPORT_APPEND):
+    """Import the "csv" or "jsonl" file f, opened in binary mode, with a pool of parser processes.
+
+    The file is split into blocks on record boundaries; workers parse,
+    validate and normalize them while this thread writes the results in file
+    order through the writer for policy (see bulk_import.import_rows). At
+    most two blocks per worker are in flight, so reading waits for the writer
+    instead of filling memory.
+    Returns an ImportReport; progress(report) is called after every block and
+    may raise to roll the whole import back.
+    """
+    workers = workers or default_workers()
+    report = ImportReport(positions="rows" if kind == "csv" else "lines")
+    header = f.readline()
+    strip_diacritics = strip_diacritics_setting(conn)
+    # Fails on a bad header before any process is started.
+    parse_block(kind, header, b"", 2, strip_diacritics)
+    writer = import_writer(conn, report, chunk_size, policy)
+    # Forking a process with Qt and SQLite threads running is not safe.
+    executor = ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"))
+    pending = deque()
+
+    def write_next():
+        rows, row_count, errors = pending.popleft().result()
+        report.rows += row_count
+        report.errors.extend(errors)
+        for row in rows:
+            writer.add(*row)
+        if progress:
+            progress(report)
+
+    try:
+        for first_line, block in split_records(f, block_size=block_size, quoted=kind == "csv"):
+            if len(pending) >= 2 * workers:
+                write_next()
+            pending.append(executor.submit(parse_block, kind, header, block, first_line, strip_diacritics))
+        while pending:
+            write_next()
+        writer.commit()
+    except BaseException:
+        writer.rollback()
+        raise
+    finally:
+        executor.shutdown(cancel_futures=True)
+    if report.errors:
+        logging.warning("Import skipped %d entries", len(report.errors))
+    return report
+
+
+def import_csv_parallel(conn, f, progress=None, workers=None, chunk_size=5000, policy=IMPORT_APPEND):
+    """import_csv_file for a CSV file opened in binary mode, parsed by worker processes."""
+    return import_parallel(conn, f, "csv", workers, progress, chunk_size, policy=policy)
+
+
+def import_jsonl_parallel(conn, f, progress=None, workers=None, chunk_size=5000, policy=IMPORT_APPEND):
+    """import_jsonl_file with the lines parsed by worker processes."""
+    return import_parallel(conn, f, "jsonl", workers, progress, chunk_size, policy=policy)
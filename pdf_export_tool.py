@@ -12,6 +12,9 @@ from PyQt5.QtPrintSupport import QPrinter
 from PyQt5.QtGui import QTextDocument, QFont, QIcon
 from PyQt5.QtCore import QCoreApplication
 
+from json_stream import iter_json_array
+from bulk_import import ImportReport, iter_jsonl_rows
+
 logging.basicConfig(level=logging.DEBUG)
 
 
@@ -294,6 +297,9 @@ class PDFExporter(QMainWindow):
         loadJSONAction = QAction(self.tr("Load JSON"), self)
         loadJSONAction.triggered.connect(self.load_json)
         fileMenu.addAction(loadJSONAction)
+        loadJSONLAction = QAction(self.tr("Load JSON Lines"), self)
+        loadJSONLAction.triggered.connect(self.load_jsonl)
+        fileMenu.addAction(loadJSONLAction)
         exportPDFAction = QAction(self.tr("Export PDF"), self)
         exportPDFAction.triggered.connect(self.export_pdf)
         fileMenu.addAction(exportPDFAction)
@@ -356,13 +362,32 @@ class PDFExporter(QMainWindow):
         if not path:
             return
         try:
-            with open(path, 'r', encoding='utf-8') as file:
-                self.data = json.load(file)
+            with open(path, 'rb') as file:
+                self.data = [item for _, item in iter_json_array(file)]
             self.display_data()
         except Exception as e:
             QMessageBox.critical(self, self.tr("Error"),
                                  self.tr("Failed to load JSON:") + " " + str(e))
 
+    def load_jsonl(self):
+        path, _ = QFileDialog.getOpenFileName(self, self.tr("Open JSON Lines"), "", "JSON Lines Files (*.jsonl)")
+        if not path:
+            return
+        try:
+            report = ImportReport(positions="lines")
+            with open(path, 'rb') as file:
+                self.data = [
+                    {'headword': headword, 'variation': variation, 'part_of_speech': part_of_speech,
+                     'notes': notes, 'meanings': meanings}
+                    for _, headword, variation, part_of_speech, notes, meanings in iter_jsonl_rows(file, report)
+                ]
+            if report.errors:
+                logging.warning("Skipped %d invalid lines in %s", len(report.errors), path)
+            self.display_data()
+        except Exception as e:
+            QMessageBox.critical(self, self.tr("Error"),
+                                 self.tr("Failed to load JSON Lines:") + " " + str(e))
+
     def generate_css(self):
         css = "<style>\n"
         css += "body { font-family: Arial, sans-serif; margin: 0; }\n"  # Remove body margin
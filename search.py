@@ -0,0 +1,141 @@
+import re
+import html
+
+from match_keys import match_key, strip_diacritics_setting
+
+# Keys for the entries of DictionaryApp.search_criteria_combo, in combo order.
+SEARCH_CRITERIA = ("all", "headword", "part_of_speech", "variation", "meaning")
+
+_FTS_COLUMNS = {"all": None, "meaning": "meanings"}
+_ENTRY_COLUMNS = {"headword": "headword", "part_of_speech": "part_of_speech", "variation": "variation"}
+_KEY_COLUMNS = {"headword": "headword_key", "variation": "variation_key"}
+
+# The trigram tokenizer needs at least three characters to use its index.
+TRIGRAM_MIN_LENGTH = 3
+
+_HIGHLIGHT_OPEN = "\x02"
+_HIGHLIGHT_CLOSE = "\x03"
+
+
+def _casefold(value):
+    return value.casefold() if isinstance(value, str) else value
+
+
+def register_functions(conn):
+    """Add the Unicode-aware SQL helpers the fallback search paths rely on."""
+    conn.create_function("casefold", 1, _casefold, deterministic=True)
+
+
+def has_table(conn, name):
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE name=?", (name,)).fetchone() is not None
+
+
+def fts_match_expression(term, column=None):
+    """Turn free text into an FTS5 query: every word must match as a prefix."""
+    tokens = [t for t in re.split(r"\s+", term.strip()) if t]
+    expression = " AND ".join('"' + t.replace('"', '""') + '"*' for t in tokens)
+    if column and expression:
+        return f"{column} : ({expression})"
+    return expression
+
+
+def snippet_html(snippet):
+    if not snippet:
+        return None
+    return (html.escape(snippet)
+            .replace(_HIGHLIGHT_OPEN, "<b>")
+            .replace(_HIGHLIGHT_CLOSE, "</b>")
+            .replace("\n", " "))
+
+
+def _fts_search(conn, term, criterion):
+    expression = fts_match_expression(term, _FTS_COLUMNS[criterion])
+    if not expression:
+        return
+    # Headword hits outrank variation hits, which outrank meaning/notes hits.
+    rows = conn.execute(f'''
+        SELECT rowid, headword,
+               snippet(EntrySearch, -1, '{_HIGHLIGHT_OPEN}', '{_HIGHLIGHT_CLOSE}', '…', 10)
+        FROM EntrySearch
+        WHERE EntrySearch MATCH ?
+        ORDER BY bm25(EntrySearch, 10.0, 5.0, 1.0, 1.0, 2.0)''', (expression,))
+    for entry_id, headword, snippet in rows:
+        yield entry_id, headword, snippet_html(snippet)
+
+
+def _trigram_search(conn, term, criterion):
+    expression = '%s : "%s"' % (_ENTRY_COLUMNS[criterion], term.replace('"', '""'))
+    rows = conn.execute(
+        "SELECT rowid, headword FROM EntryTrigram WHERE EntryTrigram MATCH ?", (expression,))
+    for entry_id, headword in rows:
+        yield entry_id, headword, None
+
+
+def _like_search(conn, term, criterion):
+    # instr() on casefolded text: a substring test without LIKE's wildcards and
+    # without LOWER()'s ASCII-only folding. Needs register_functions(conn).
+    term = term.casefold()
+    if criterion in _ENTRY_COLUMNS:
+        query = f"SELECT id, headword FROM Entry WHERE instr(casefold({_ENTRY_COLUMNS[criterion]}), ?) > 0"
+        params = (term,)
+    elif criterion == "meaning":
+        query = '''SELECT Entry.id, Entry.headword FROM Entry
+                   WHERE id IN (
+                       SELECT entry_id FROM Senses WHERE instr(casefold(meaning), ?) > 0
+                   )'''
+        params = (term,)
+    else:
+        query = '''SELECT Entry.id, Entry.headword FROM Entry
+                   WHERE instr(casefold(headword), ?) > 0
+                   OR instr(casefold(part_of_speech), ?) > 0
+                   OR instr(casefold(variation), ?) > 0
+                   OR id IN (
+                       SELECT entry_id FROM Senses WHERE instr(casefold(meaning), ?) > 0
+                   )'''
+        params = (term,) * 4
+    for entry_id, headword in conn.execute(query, params):
+        yield entry_id, headword, None
+
+
+def _exact_first(conn, term, criterion, rows):
+    # Entries whose normalized headword (or variation) equals the term come first,
+    # straight from idx_entry_headword_key; the substring hits follow.
+    key = match_key(term, strip_diacritics_setting(conn))
+    exact = conn.execute(
+        f"SELECT id, headword FROM Entry WHERE {_KEY_COLUMNS[criterion]} = ? ORDER BY id", (key,)
+    ).fetchall()
+    seen = set()
+    for entry_id, headword in exact:
+        seen.add(entry_id)
+        yield entry_id, headword, None
+    for row in rows:
+        if row[0] not in seen:
+            yield row
+
+
+def iter_search_entries(conn, term, criterion):
+    """Yield (entry_id, headword, snippet_html) rows matching term as SQLite produces them.
+
+    Meaning and All searches use the EntrySearch full-text index, ranked by
+    relevance; Headword, Variation and Part of Speech "contains" searches use the
+    EntryTrigram index, with exact matches of the normalized key listed first.
+    Without those indexes (or for terms too short for trigrams) the search falls
+    back to a full scan.
+    """
+    term = term.lower().strip()
+    if not term:
+        return iter(())
+    if criterion in _FTS_COLUMNS and has_table(conn, "EntrySearch"):
+        return _fts_search(conn, term, criterion)
+    if (criterion in _ENTRY_COLUMNS and len(term) >= TRIGRAM_MIN_LENGTH
+            and has_table(conn, "EntryTrigram")):
+        rows = _trigram_search(conn, term, criterion)
+    else:
+        rows = _like_search(conn, term, criterion)
+    if criterion in _KEY_COLUMNS:
+        return _exact_first(conn, term, criterion, rows)
+    return rows
+
+
+def search_entries(conn, term, criterion):
+    return list(iter_search_entries(conn, term, criterion))
@@ -0,0 +1,161 @@
+import time
+import sqlite3
+import logging
+from collections import OrderedDict
+from pathlib import Path
+from PyQt5.QtCore import QObject, pyqtSignal, pyqtSlot
+
+from search import iter_search_entries, register_functions
+
+
+class SearchRequest:
+    def __init__(self, generation, db_path, term, criterion, fuzzy_index=None, limit=200, data_version=0):
+        self.generation = generation
+        self.db_path = db_path
+        self.term = term
+        self.criterion = criterion
+        self.fuzzy_index = fuzzy_index
+        self.limit = limit
+        self.data_version = data_version     # DatabaseManager.data_version when the search was started
+
+    def cache_key(self):
+        if self.fuzzy_index is None:
+            return (self.term, self.criterion, None)
+        return (self.term, self.criterion, (self.fuzzy_index.max_distance, self.limit))
+
+
+class SearchCache:
+    """Bounded LRU cache of complete search results.
+
+    Each result is stored with the data version it was computed at: the
+    application's write counter plus the reading connection's PRAGMA
+    data_version, which moves whenever any other connection commits. A lookup
+    at a different version is a miss, so results never outlive a write.
+    """
+
+    def __init__(self, max_entries=64, max_rows=10000):
+        self.max_entries = max_entries
+        self.max_rows = max_rows           # larger results are not kept
+        self.hits = 0
+        self.misses = 0
+        self._results = OrderedDict()      # key -> (version, rows)
+
+    def get(self, key, version):
+        cached = self._results.get(key)
+        if cached is None or cached[0] != version:
+            self.misses += 1
+            return None
+        self._results.move_to_end(key)
+        self.hits += 1
+        return cached[1]
+
+    def put(self, key, version, rows):
+        self._results[key] = (version, rows)
+        self._results.move_to_end(key)
+        while len(self._results) > self.max_entries:
+            self._results.popitem(last=False)
+
+    def clear(self):
+        self._results.clear()
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class SearchWorker(QObject):
+    """Runs searches on its own thread and read connection.
+
+    Every request carries a generation number. cancel() bumps the newest
+    generation and interrupts the running SQLite statement, so a query the
+    user has already typed past stops immediately and its results are dropped.
+    """
+
+    BATCH_SIZE = 200
+
+    batch_ready = pyqtSignal(int, list)          # generation, [(entry_id, headword, snippet or distance)]
+    finished = pyqtSignal(int, int, float, bool) # generation, hit count, elapsed seconds, from cache
+    failed = pyqtSignal(int, str)
+
+    def __init__(self):
+        super().__init__()
+        self.latest_generation = 0
+        self._conn = None
+        self._db_path = None
+        self.cache = SearchCache()
+
+    def cancel(self, generation):
+        """Called from the GUI thread: everything older than generation is obsolete."""
+        self.latest_generation = generation
+        conn = self._conn
+        if conn is not None:
+            conn.interrupt()
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _connection(self, db_path):
+        if self._conn is None or self._db_path != db_path:
+            self.close()
+            # check_same_thread=False only so close() can run once the thread has stopped.
+            self._conn = sqlite3.connect(Path(db_path).as_uri() + "?mode=ro", uri=True,
+                                         check_same_thread=False)
+            register_functions(self._conn)
+            self._db_path = db_path
+            self.cache.clear()
+        return self._conn
+
+    def _stale(self, request):
+        return request.generation != self.latest_generation
+
+    @pyqtSlot(object)
+    def run(self, request):
+        if self._stale(request):
+            return
+        start = time.perf_counter()
+        hits = 0
+        try:
+            conn = self._connection(request.db_path)
+            key = request.cache_key()
+            version = (request.data_version, conn.execute("PRAGMA data_version").fetchone()[0])
+            rows = self.cache.get(key, version)
+            cached = rows is not None
+            if cached:
+                found = None
+            else:
+                if request.fuzzy_index is not None:
+                    rows = request.fuzzy_index.search(request.term, request.criterion, limit=request.limit)
+                else:
+                    rows = iter_search_entries(conn, request.term, request.criterion)
+                found = []
+            batch = []
+            for row in rows:
+                batch.append(row)
+                if found is not None:
+                    found.append(row)
+                    if len(found) > self.cache.max_rows:
+                        found = None
+                if len(batch) >= self.BATCH_SIZE:
+                    if self._stale(request):
+                        return
+                    hits += len(batch)
+                    self.batch_ready.emit(request.generation, batch)
+                    batch = []
+            if self._stale(request):
+                return
+            hits += len(batch)
+            if batch:
+                self.batch_ready.emit(request.generation, batch)
+            if found is not None:
+                self.cache.put(key, version, found)
+            self.finished.emit(request.generation, hits, time.perf_counter() - start, cached)
+        except sqlite3.OperationalError as e:
+            if not self._stale(request):
+                logging.exception("Search failed")
+                self.failed.emit(request.generation, str(e))
+        except Exception as e:
+            logging.exception("Search failed")
+            self.failed.emit(request.generation, str(e))
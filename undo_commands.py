@@ -12,32 +12,14 @@ class UpdateEntryCommand(QUndoCommand):
         self.new_data = new_data
 
     def undo(self):
-        self.db_manager.cursor.execute(
-            "UPDATE Entry SET headword=?, variation=?, part_of_speech=?, notes=? WHERE id=?",
-            (self.old_data['headword'], self.old_data['variation'],
-             self.old_data['pos'], self.old_data['notes'], self.entry_id)
-        )
-        self.db_manager.cursor.execute("DELETE FROM Senses WHERE entry_id=?", (self.entry_id,))
-        for meaning in self.old_data['meanings']:
-            self.db_manager.cursor.execute(
-                "INSERT INTO Senses (entry_id, meaning) VALUES (?, ?)",
-                (self.entry_id, meaning)
-            )
+        self.db_manager.update_entry(self.entry_id, self.old_data)
         self.db_manager.conn.commit()
+        self.db_manager.entries_changed([self.entry_id])
 
     def redo(self):
-        self.db_manager.cursor.execute(
-            "UPDATE Entry SET headword=?, variation=?, part_of_speech=?, notes=? WHERE id=?",
-            (self.new_data['headword'], self.new_data['variation'],
-             self.new_data['pos'], self.new_data['notes'], self.entry_id)
-        )
-        self.db_manager.cursor.execute("DELETE FROM Senses WHERE entry_id=?", (self.entry_id,))
-        for meaning in self.new_data['meanings']:
-            self.db_manager.cursor.execute(
-                "INSERT INTO Senses (entry_id, meaning) VALUES (?, ?)",
-                (self.entry_id, meaning)
-            )
+        self.db_manager.update_entry(self.entry_id, self.new_data)
         self.db_manager.conn.commit()
+        self.db_manager.entries_changed([self.entry_id])
 
 
 class DeleteEntryCommand(QUndoCommand):
@@ -50,19 +32,12 @@ class DeleteEntryCommand(QUndoCommand):
         self.entry_data = entry_data  
 
     def undo(self):
-        self.db_manager.cursor.execute(
-            "INSERT INTO Entry (id, headword, variation, part_of_speech, notes) VALUES (?, ?, ?, ?, ?)",
-            (self.entry_id, self.entry_data['headword'], self.entry_data['variation'],
-             self.entry_data['pos'], self.entry_data['notes'])
-        )
-        for meaning in self.entry_data['meanings']:
-            self.db_manager.cursor.execute(
-                "INSERT INTO Senses (entry_id, meaning) VALUES (?, ?)",
-                (self.entry_id, meaning)
-            )
+        self.db_manager.insert_entry(self.entry_data, self.entry_id)
         self.db_manager.conn.commit()
+        self.db_manager.entries_inserted([self.entry_id])
 
     def redo(self):
         self.db_manager.cursor.execute("DELETE FROM Senses WHERE entry_id=?", (self.entry_id,))
         self.db_manager.cursor.execute("DELETE FROM Entry WHERE id=?", (self.entry_id,))
         self.db_manager.conn.commit()
+        self.db_manager.entries_deleted([self.entry_id])